@@ -1,13 +1,17 @@
 from tnfsh_class_table.interface import main_process
-from tnfsh_timetable_core.timetable.cache import preload_all
+from tnfsh_class_table.backend import TNFSHClassTableIndex
+from tnfsh_class_table.new_backend.snapshot import install_snapshot
 from cache_updater import start_cache_updater
-import asyncio
 
-# 預載入所有課表資料
-asyncio.run(preload_all(only_missing=False, max_concurrent=5, delay=0.01))
+# 以 mmap 開啟上次寫入的課表快照，不需等待網路
+snapshot = install_snapshot()
 
-# 啟動快取更新器
-cache_updater_thread = start_cache_updater()
+# 沒有快照時由磁碟上的索引啟動，並定期在背景重新驗證索引
+TNFSHClassTableIndex.get_instance()
+TNFSHClassTableIndex.start_revalidation()
+
+# 啟動快取更新器，沒有快照時立即在背景更新一次，否則在背景由快照載入排課使用的課表
+cache_updater_thread = start_cache_updater(run_immediately=snapshot is None)
 
 # 啟動主程序
 main_process()
@@ -0,0 +1,81 @@
+"""比較逐列寫入與 new_backend.columnar 向量化寫入全校長格式課表的時間
+
+以 bench_snapshot 的方式建立約 250 份課表的快照：
+- 逐列: 逐份以 TNFSHClassTable.from_cached 建立課表，逐格以 csv.DictWriter 寫出
+- 向量化: export_columnar() 以 numpy 展開快照後由 pandas 寫出 CSV（有 pyarrow 時另外測 Parquet）
+
+使用方式:
+    python benchmarks/bench_columnar.py
+"""
+import csv
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_snapshot import _fill
+from tnfsh_class_table.backend import TNFSHClassTable
+from tnfsh_class_table.new_backend.cache import TieredPageCache
+from tnfsh_class_table.new_backend.columnar import COLUMNS, HAS_PYARROW, export_columnar
+from tnfsh_class_table.new_backend.snapshot import TimetableSnapshot, install_snapshot
+
+
+def _row_by_row(snapshot: TimetableSnapshot) -> int:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS)
+    writer.writeheader()
+    rows = 0
+    for target in snapshot.targets():
+        table = TNFSHClassTable.from_cached(target, snapshot)
+        times = list(table.lessons.values())
+        for period in range(table.grid.periods):
+            for weekday in range(table.grid.weekdays):
+                subject, counterparts = table.grid.course(period, weekday)
+                if subject == "":
+                    continue
+                start, end = times[period] if period < len(times) else ("", "")
+                for counterpart in counterparts or [""]:
+                    writer.writerow({
+                        "target": target, "type": table.type, "weekday": weekday + 1, "period": period + 1,
+                        "subject": subject, "counterpart": counterpart, "start": start, "end": end,
+                    })
+                    rows += 1
+    buffer.getvalue().encode("utf-8-sig")
+    return rows
+
+
+def _timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main(repeat: int = 3) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        root = Path(root)
+        _fill(TieredPageCache(root))
+        snapshot = install_snapshot(TimetableSnapshot.open(
+            TimetableSnapshot.write_from_page_cache(TieredPageCache(root), root / "timetables.snapshot")
+        ))
+        rows = _row_by_row(snapshot)
+        assert export_columnar(io.BytesIO(), format="csv", snapshot=snapshot) == rows
+
+        results = [("逐列 CSV", min(_timed(_row_by_row, snapshot) for _ in range(repeat)))]
+        results.append(("向量化 CSV", min(_timed(export_columnar, io.BytesIO(), "csv", snapshot) for _ in range(repeat))))
+        if HAS_PYARROW:
+            results.append(("向量化 Parquet", min(_timed(export_columnar, io.BytesIO(), "parquet", snapshot) for _ in range(repeat))))
+
+    print(f"課表數: {len(snapshot)}，資料列: {rows}")
+    print(f"{'方式':<14} {'全校 (ms)':>10}")
+    for name, elapsed in results:
+        print(f"{name:<14} {elapsed * 1000:10.1f}")
+    print(f"加速: {results[0][1] / results[1][1]:.1f} 倍")
+    if not HAS_PYARROW:
+        print("未安裝 pyarrow，略過 Parquet")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""比較逐頁 requests.get 與 CourseSiteCrawler 抓取整個課表網站的時間
+
+以本機 HTTP 伺服器模擬課表網站：每一頁都回傳 assests/班級課表.html，並加上固定的回應延遲。
+
+使用方式:
+    python benchmarks/bench_crawler.py
+"""
+import asyncio
+import http.server
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests
+from tnfsh_class_table.new_backend.crawler import INDEX_PAGES, CourseSiteCrawler
+
+PAGE = (Path(__file__).resolve().parent.parent / "assests" / "班級課表.html").read_bytes()
+CLASSES = {f"{grade}{number:02d}": f"C101{grade}{number:02d}.html" for grade in (1, 2, 3) for number in range(1, 20)}
+TEACHERS = {f"T{index:03d} 老師{chr(0x4e00 + index)}": f"T{index:03d}.html" for index in range(150)}
+LATENCY = 0.02
+
+
+def _index_page(category: str, links: dict) -> bytes:
+    cells = "".join(f'<td><a href="{href}">{text}</a></td>' for text, href in links.items())
+    return f"<table><tr><td><span>{category}</span></td></tr><tr>{cells}</tr></table>".encode("utf-8")
+
+
+class _CourseSite(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    pages = {
+        INDEX_PAGES["class"]: _index_page("高一", CLASSES),
+        INDEX_PAGES["teacher"]: _index_page("國文科", TEACHERS),
+    }
+
+    def do_GET(self) -> None:
+        time.sleep(LATENCY)
+        body = self.pages.get(self.path.rsplit("/", 1)[-1], PAGE)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def sequential(base_url: str, urls: list) -> float:
+    """原本 backend 的做法：每一頁各自呼叫一次 requests.get"""
+    start = time.perf_counter()
+    for url in urls:
+        requests.get(base_url + url, timeout=10).raise_for_status()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _CourseSite)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/course/"
+
+    result = asyncio.run(CourseSiteCrawler(base_url, concurrency=8, delay=0).crawl())
+    urls = list(result.pages)
+    legacy = sequential(base_url, urls)
+
+    print(f"頁面數: {len(urls)}，模擬回應延遲 {LATENCY * 1000:.0f} ms")
+    print(f"逐頁 requests.get : {legacy:6.2f} 秒 ({len(urls) / legacy:7.1f} 頁/秒)")
+    print(f"CourseSiteCrawler : {result.elapsed:6.2f} 秒 ({result.pages_per_second:7.1f} 頁/秒)")
+    print(f"加速倍數          : {legacy / result.elapsed:6.2f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""量測每份課表以巢狀 dict 與 TimetableGrid 儲存時的記憶體用量，以及 intern 表在多次更新後的成長
+
+- 巢狀 dict: [[{科目: {教師: 連結}}]]，每份課表各自持有字串與 dict
+- TimetableGrid: 一個 array('I')，字串與課程格存在全程序共用的 intern 表
+- intern 表成長: 模擬多次更新，每次每份課表有一格換了老師
+
+使用方式:
+    python benchmarks/bench_grid_memory.py
+"""
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tnfsh_class_table.backend import TimetableExtractor, TimetableGrid
+
+PAGE = Path(__file__).resolve().parent.parent / "assests" / "班級課表.html"
+TABLES = 250
+
+
+def _measure(build) -> float:
+    """以 tracemalloc 量測 build() 建立的物件所佔的位元組數"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return after - before
+
+
+def main() -> None:
+    _, table, _ = TimetableExtractor.extract(PAGE.read_bytes())
+    text = json.dumps(table, ensure_ascii=False)
+    TimetableGrid.from_nested(table)  # 先放入 intern 表，只量測每份課表本身
+
+    # 每份課表各自解析一次，與從網頁解析時相同，不共用字串物件
+    nested = _measure(lambda: [json.loads(text) for _ in range(TABLES)]) / TABLES
+    grid = _measure(lambda: [TimetableGrid.from_nested(json.loads(text)) for _ in range(TABLES)]) / TABLES
+    # 建立 grid 時暫時解析的 dict 會被釋放，量到的只有 grid 本身
+    print(f"課表: {len(table)} 節 × 5 天，共 {TABLES} 份")
+    print(f"巢狀 dict     : {nested:8.0f} B/份")
+    print(f"TimetableGrid : {grid:8.0f} B/份 ({nested / grid:.0f}x)")
+
+    start = TimetableGrid.intern_stats()
+    for refresh in range(10):
+        for index in range(TABLES):
+            changed = json.loads(text)
+            changed[0][0] = {"代課": {f"老師{refresh}-{index % 50}": f"T{refresh}{index % 50}.html"}}
+            TimetableGrid.from_nested(changed)
+    end = TimetableGrid.intern_stats()
+    print(f"intern 表: 字串 {start['strings']} → {end['strings']}，課程格 {start['course_cells']} → {end['course_cells']}"
+          f"（10 次更新，每次 50 位新老師）")
+
+
+if __name__ == "__main__":
+    main()
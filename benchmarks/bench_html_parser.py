@@ -0,0 +1,34 @@
+"""比較各 HTML 解析器後端在課表網頁上的解析時間
+
+使用方式:
+    python benchmarks/bench_html_parser.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tnfsh_class_table.backend import TimetableExtractor
+from tnfsh_class_table.utils.html_parser import SOUP_BACKENDS, available_backends, make_soup
+
+PAGE = Path(__file__).resolve().parent.parent / "assests" / "班級課表.html"
+
+
+def _measure(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1000
+
+
+def main(number: int = 50) -> None:
+    content = PAGE.read_bytes()
+    print(f"頁面: {PAGE.name} ({len(content)} bytes)")
+    print(f"{'後端':<12} {'make_soup (ms)':>15} {'TimetableExtractor (ms)':>25}")
+    for backend in available_backends():
+        soup_time = _measure(lambda: make_soup(content, backend), number) if backend in SOUP_BACKENDS else None
+        extract_time = _measure(lambda: TimetableExtractor.extract(content, backend), number)
+        soup_text = f"{soup_time:15.2f}" if soup_time is not None else f"{'-':>15}"
+        print(f"{backend:<12} {soup_text} {extract_time:25.2f}")
+
+
+if __name__ == "__main__":
+    main()
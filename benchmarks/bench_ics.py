@@ -0,0 +1,54 @@
+"""比較 icalendar 與 new_backend.ics 範本序列化匯出全校課表 ICS 的時間
+
+以 bench_snapshot 的方式建立約 250 份課表的快照，逐一以兩種方式匯出 ICS，
+事件描述由 event_descriptions 快取，兩者相同，只比較序列化的部分。
+
+使用方式:
+    python benchmarks/bench_ics.py
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_snapshot import _fill
+from tnfsh_class_table.backend import NewWikiTeacherIndex, TNFSHClassTable
+from tnfsh_class_table.new_backend.cache import TieredPageCache
+from tnfsh_class_table.new_backend.snapshot import TimetableSnapshot, install_snapshot
+
+
+def _timed(tables, render) -> float:
+    start = time.perf_counter()
+    for table in tables:
+        render(table)
+    return time.perf_counter() - start
+
+
+def main(repeat: int = 3) -> None:
+    # 不連線到竹園 Wiki
+    NewWikiTeacherIndex._instance = SimpleNamespace(version=1, reverse_index={})
+    with tempfile.TemporaryDirectory() as root:
+        root = Path(root)
+        _fill(TieredPageCache(root))
+        snapshot = install_snapshot(TimetableSnapshot.open(
+            TimetableSnapshot.write_from_page_cache(TieredPageCache(root), root / "timetables.snapshot")
+        ))
+        tables = [TNFSHClassTable.from_cached(target, snapshot) for target in snapshot.targets()]
+        for table in tables:
+            assert table._render_ics() == table._render_ics_with_icalendar()
+
+        icalendar_time = min(_timed(tables, TNFSHClassTable._render_ics_with_icalendar) for _ in range(repeat))
+        template_time = min(_timed(tables, TNFSHClassTable._render_ics) for _ in range(repeat))
+
+    print(f"課表數: {len(tables)}（輸出逐位元組相同）")
+    print(f"{'方式':<12} {'全校 (ms)':>10} {'每份 (µs)':>10}")
+    print(f"{'icalendar':<12} {icalendar_time * 1000:10.1f} {icalendar_time / len(tables) * 1e6:10.0f}")
+    print(f"{'範本':<12} {template_time * 1000:10.1f} {template_time / len(tables) * 1e6:10.0f}")
+    print(f"加速: {icalendar_time / template_time:.1f} 倍")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""比較精簡模型與 pydantic 模型的建立時間與每個物件的記憶體用量
+
+使用方式:
+    python benchmarks/bench_models.py
+"""
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tnfsh_timetable_core.scheduling.models import CourseNode as CoreCourseNode
+from tnfsh_timetable_core.timetable_slot_log_dict.models import StreakTime
+from tnfsh_class_table.model.node import CourseNode
+from tnfsh_class_table.models import TeacherClassInfo, URLMap
+from tnfsh_class_table.new_backend.models import TimeSlot
+
+TEACHER = ("王小明", "TA01.html")
+CLASS = ("307", "C101307.html")
+TIME = TimeSlot(3, 2, 1)
+
+CASES = [
+    (
+        "時段",
+        lambda: StreakTime(weekday=3, period=2, streak=1),
+        lambda: TimeSlot(3, 2, 1),
+    ),
+    (
+        "課程節點",
+        lambda: TeacherClassInfo(
+            teacher=[URLMap(name=TEACHER[0], url="")], class_=[URLMap(name=CLASS[0], url="")],
+            subject="國文", weekday=3, period=2, streak=1,
+        ),
+        lambda: CourseNode(TIME, (TEACHER[0],), (CLASS[0],), False, "國文"),
+    ),
+    (
+        "排課圖節點",
+        lambda: CoreCourseNode(time=StreakTime(weekday=3, period=2, streak=1), subject="國文", teachers={}, classes={}),
+        lambda: CourseNode(TIME, (), (), False, "國文"),
+    ),
+]
+
+
+def construction_time(factory, number: int) -> float:
+    """每個物件的建立時間（微秒）"""
+    return min(timeit.repeat(factory, number=number, repeat=3)) / number * 1e6
+
+
+def memory_per_object(factory, count: int) -> float:
+    """每個物件的記憶體用量（bytes），字串常數由所有物件共用，不計入"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def main(number: int = 20000, count: int = 20000) -> None:
+    print(f"{'模型':<10} {'pydantic (µs)':>14} {'精簡 (µs)':>10} {'pydantic (B)':>13} {'精簡 (B)':>9}")
+    for name, pydantic_factory, compact_factory in CASES:
+        print(
+            f"{name:<10} "
+            f"{construction_time(pydantic_factory, number):14.2f} "
+            f"{construction_time(compact_factory, number):10.2f} "
+            f"{memory_per_object(pydantic_factory, count):13.0f} "
+            f"{memory_per_object(compact_factory, count):9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""比較線性掃描與 new_backend.names.NameIndex 查詢教師名稱的時間
+
+以約 3000 個隨機的二到四字名稱模擬 Wiki 與官網的教師反查表：
+- 線性掃描: `[name for name in names if query in name]`
+- NameIndex: 建立一次倒排表後以 contains() / similar() 查詢
+
+使用方式:
+    python benchmarks/bench_names.py
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tnfsh_class_table.new_backend.names import NameIndex
+
+CHARS = "王陳林黃張李吳劉蔡楊許鄭謝郭洪曾邱廖賴周徐蘇葉莊呂江何蕭羅高潘簡朱鍾彭游詹胡施沈余盧梁趙顏柯翁魏孫戴范方宋鄧杜傅侯曹薛丁卓阮馬董文明進永華美玲志偉淑芬雅婷家豪建宏俊傑"
+
+
+def _timed(function, queries) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        function(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main(size: int = 3000, lookups: int = 2000) -> None:
+    rng = random.Random(0)
+    names = list(dict.fromkeys("".join(rng.choice(CHARS) for _ in range(rng.choice((2, 3, 3, 4)))) for _ in range(size)))
+    queries = [name[rng.randrange(len(name) - 1):] for name in rng.choices(names, k=lookups)]
+    typos = [name[:-1] + rng.choice(CHARS) for name in rng.choices(names, k=lookups)]
+
+    start = time.perf_counter()
+    index = NameIndex(names)
+    build = time.perf_counter() - start
+
+    linear = _timed(lambda query: [name for name in names if query in name], queries)
+    contains = _timed(index.contains, queries)
+    similar = _timed(index.similar, typos)
+    print(f"名稱數: {len(names)}，建立索引 {build * 1000:.1f} ms")
+    print(f"線性掃描子字串: {linear * 1e6:8.1f} µs/次")
+    print(f"NameIndex 子字串: {contains * 1e6:8.1f} µs/次 ({linear / contains:.1f}x)")
+    print(f"NameIndex 編輯距離 ≤ 1: {similar * 1e6:8.1f} µs/次")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""比較三種方式在新程序中重建全校課表的時間
+
+1. 由磁碟上的原始網頁重新解析（TieredPageCache 解析層尚未建立）
+2. 由 TieredPageCache 的解析層載入 JSON
+3. 以 mmap 開啟 TimetableSnapshot，取得索引並查詢第一份課表
+
+每一頁都使用 assests/班級課表.html 的內容加上不同的註解，模擬約 250 份不同的課表。
+
+使用方式:
+    python benchmarks/bench_snapshot.py
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tnfsh_class_table.new_backend.cache import TieredPageCache
+from tnfsh_class_table.new_backend.crawler import BASE_URL, INDEX_PAGES
+from tnfsh_class_table.new_backend.snapshot import TimetableSnapshot
+
+PAGE = (Path(__file__).resolve().parent.parent / "assests" / "班級課表.html").read_bytes()
+CLASSES = {f"{grade}{number:02d}": f"C101{grade}{number:02d}.html" for grade in (1, 2, 3) for number in range(1, 20)}
+TEACHERS = {f"T{index:03d} 老師{chr(0x4e00 + index)}": f"T{index:03d}.html" for index in range(190)}
+
+
+def _index_page(category: str, links: dict) -> bytes:
+    cells = "".join(f'<td><a href="{href}">{text}</a></td>' for text, href in links.items())
+    return f"<table><tr><td><span>{category}</span></td></tr><tr>{cells}</tr></table>".encode("utf-8")
+
+
+def _fill(cache: TieredPageCache) -> None:
+    cache.put(BASE_URL + INDEX_PAGES["class"], _index_page("高一", CLASSES))
+    cache.put(BASE_URL + INDEX_PAGES["teacher"], _index_page("國文科", TEACHERS))
+    for href in [*CLASSES.values(), *TEACHERS.values()]:
+        cache.put(BASE_URL + href, PAGE + f"<!-- {href} -->".encode("utf-8"))
+
+
+def _timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as root:
+        root = Path(root)
+        _fill(TieredPageCache(root))
+        parse = _timed(lambda: TieredPageCache(root).load_all())
+        load = _timed(lambda: TieredPageCache(root).load_all())
+        path = TimetableSnapshot.write_from_page_cache(TieredPageCache(root), root / "timetables.snapshot")
+
+        def open_snapshot() -> None:
+            snapshot = TimetableSnapshot.open(path)
+            snapshot.index()
+            snapshot.lookup("101").grid.course(0, 0)
+
+        snapshot_time = _timed(open_snapshot)
+        count = len(TimetableSnapshot.open(path))
+        size = path.stat().st_size
+
+    print(f"課表數: {count}，快照大小: {size / 1024:.0f} KiB")
+    print(f"{'方式':<16} {'時間 (ms)':>10}")
+    print(f"{'重新解析 HTML':<16} {parse * 1000:10.1f}")
+    print(f"{'載入解析層 JSON':<16} {load * 1000:10.1f}")
+    print(f"{'mmap 快照':<16} {snapshot_time * 1000:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""比較 TimetableExtractor 與原本多階段 BeautifulSoup 解析的速度
+
+使用方式:
+    python benchmarks/bench_timetable_extractor.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+from tnfsh_class_table.backend import TNFSHClassTable, TimetableExtractor
+
+PAGE = Path(__file__).resolve().parent.parent / "assests" / "班級課表.html"
+
+
+def legacy_parse(content: bytes):
+    """原本 TNFSHClassTable.__init__ 的解析流程"""
+    table = object.__new__(TNFSHClassTable)
+    table.soup = BeautifulSoup(content, 'html.parser')
+    table.soup_table = table._get_soup_table()
+    table.regular_soup_table = table._get_regular_soup_table()
+    return table._get_lesson(), table._get_table(), table._get_last_update()
+
+
+def main(number: int = 50) -> None:
+    content = PAGE.read_bytes()
+    assert legacy_parse(content) == TimetableExtractor.extract(content), "解析結果不一致"
+
+    legacy = min(timeit.repeat(lambda: legacy_parse(content), number=number, repeat=3)) / number
+    single_pass = min(timeit.repeat(lambda: TimetableExtractor.extract(content), number=number, repeat=3)) / number
+
+    print(f"頁面: {PAGE.name} ({len(content)} bytes)")
+    print(f"多階段 BeautifulSoup: {legacy * 1000:8.2f} ms/頁")
+    print(f"TimetableExtractor : {single_pass * 1000:8.2f} ms/頁")
+    print(f"加速倍數           : {legacy / single_pass:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
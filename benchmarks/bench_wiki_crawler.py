@@ -0,0 +1,104 @@
+"""比較竹園 Wiki 教師索引的完整抓取與增量更新時間
+
+以本機 HTTP 伺服器模擬竹園 Wiki：20 個科目、每科 30 位教師，每頁加上固定的回應延遲，支援 ETag 條件請求。
+- 舊方法: 每次 refresh() 建立新的 ThreadPoolExecutor(max_workers=10)，以 requests.get 抓取並解析所有科目
+- 完整抓取: WikiTeacherCrawler 第一次抓取
+- 增量更新: 只有一個科目的教師列表改變，其他科目回應 304
+
+使用方式:
+    python benchmarks/bench_wiki_crawler.py
+"""
+import hashlib
+import http.server
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests
+from tnfsh_class_table.new_backend.wiki_crawler import SUBJECTS_TITLE, WikiTeacherCrawler, parse_subjects, parse_teachers
+
+LATENCY = 0.02
+SUBJECTS = [f"科目{chr(0x4e00 + index)}科" for index in range(20)]
+
+
+def _teachers(subject: str, count: int = 30) -> str:
+    links = "".join(f'<a href="/{subject}老師{index}">{subject}老師{index}</a>' for index in range(count))
+    return f'<div class="mw-category">{links}</div>'
+
+
+class _Wiki(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    pages = {SUBJECTS_TITLE: '<div class="mw-category"></div><div class="mw-category">'
+             + "".join(f'<a href="/{subject}">{subject}</a>' for subject in SUBJECTS) + "</div>"}
+    pages.update({f"分類:{subject}老師": _teachers(subject) for subject in SUBJECTS})
+
+    def do_GET(self) -> None:
+        time.sleep(LATENCY)
+        url = urlsplit(self.path)
+        title = parse_qs(url.query)["title"][0] if url.query else unquote(url.path[1:])
+        body = self.pages[title].encode("utf-8")
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        status = 304 if self.headers.get("If-None-Match") == etag else 200
+        body = b"" if status == 304 else body
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def legacy(crawler: WikiTeacherCrawler) -> float:
+    """原本 NewWikiTeacherIndex 的做法"""
+    start = time.perf_counter()
+    subjects = parse_subjects(requests.get(crawler.normal_url(SUBJECTS_TITLE), timeout=5).content)
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        list(executor.map(
+            lambda subject: parse_teachers(requests.get(crawler.mobile_url(f"分類:{subject}老師"), timeout=5).content),
+            subjects,
+        ))
+    return time.perf_counter() - start
+
+
+def full_crawl(base_url: str) -> float:
+    """新的爬蟲第一次抓取，沒有可用的連線與指紋"""
+    crawler = WikiTeacherCrawler(base_url)
+    try:
+        return crawler.crawl_sync().elapsed
+    finally:
+        crawler.close()
+
+
+def main(repeat: int = 3) -> None:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Wiki)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    crawler = WikiTeacherCrawler(f"http://127.0.0.1:{server.server_port}")
+
+    old = min(legacy(crawler) for _ in range(repeat))
+    full = min(full_crawl(crawler.base_url) for _ in range(repeat))
+    pages = crawler.crawl_sync().pages
+    incremental = []
+    for round in range(repeat):
+        _Wiki.pages[f"分類:{SUBJECTS[0]}老師"] = _teachers(SUBJECTS[0], 31 + round)
+        result = crawler.crawl_sync(pages)
+        pages = result.pages
+        incremental.append(result.elapsed)
+    crawler.close()
+
+    print(f"科目數: {len(SUBJECTS)}，模擬回應延遲 {LATENCY * 1000:.0f} ms")
+    print(f"舊方法（每次新的執行緒池與連線）: {old * 1000:7.1f} ms")
+    print(f"完整抓取                        : {full * 1000:7.1f} ms")
+    print(f"增量更新（1 個科目改變）        : {min(incremental) * 1000:7.1f} ms")
+    print(result.report())
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
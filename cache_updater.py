@@ -1,5 +1,6 @@
-from tnfsh_timetable_core.timetable.cache import preload_all
-from tnfsh_class_table.ai_tools.scheduling.cache import scheduling_cache
+from tnfsh_class_table.ai_tools.scheduling.cache import preload_from_snapshot, scheduling_cache
+from tnfsh_class_table.backend import NewWikiTeacherIndex, TNFSHClassTableIndex, class_table_cache, data_generations, event_descriptions
+from tnfsh_class_table.new_backend.snapshot import install_snapshot, refresh_snapshot
 import os
 import asyncio
 import logging
@@ -14,19 +15,43 @@ core = TNFSHTimetableCore()
 logger = core.get_logger()
 
 async def update_cache():
+    """在旁邊建立完整的新資料，最後一次切換到新的資料世代
+
+    切換前開始的請求繼續使用上一個世代，排課快取與課表快取只移除上上個世代的項目。
+    整個課表網站只抓取一次：排課使用的 tnfsh_timetable_core 課表也由新的快照建立。
+    """
     try:
-        # 1. 更新 timetable cache
-        logger.info("開始更新課表快取...")
-        await preload_all(only_missing=False, max_concurrent=5, delay=0.01)
-        logger.info("課表快取更新完成")
+        # 1. 寫入新的課表快照並發布新世代
+        logger.info("開始更新課表快照...")
+        previous = data_generations.current()
+        snapshot = await refresh_snapshot()
+        if snapshot is not None:
+            install_snapshot(snapshot)
+            logger.info(f"課表快照更新完成，共 {len(snapshot)} 份課表")
 
-        # 2. 清理 scheduling cache
-        logger.info("開始清理排課快取...")
-        scheduling_cache._cache.clear()
-        logger.info("排課快取清理完成")
+            # 2. 以同一份快照更新排課使用的課表快取
+            loaded = await preload_from_snapshot(snapshot)
+            logger.info(f"排課課表快取更新完成，共 {loaded} 份課表")
+        else:
+            logger.warning("無法取得課表索引，沿用舊的課表快照")
+            data_generations.publish(previous.snapshot)
+            class_table_cache.prune(previous)
+        logger.info(f"已切換至資料世代 {data_generations.current().number}")
+        index_stats = TNFSHClassTableIndex.get_instance().stats()
+        logger.info(f"課表索引來源 {index_stats['source']}，{index_stats['age']:.0f} 秒前取得")
 
+        # 3. 移除上上個世代的排課快取
+        removed = scheduling_cache.prune(previous)
+        logger.info(f"排課快取已移除 {removed} 筆舊世代結果")
+
+        # 4. 增量更新竹園 Wiki 教師索引，只重新解析內容改變的科目
+        wiki_result = await asyncio.to_thread(NewWikiTeacherIndex.get_instance().refresh)
+        logger.info(wiki_result.report())
+
+        # 5. 確認匯出時遇到的未知教師在竹園 Wiki 上是否有頁面
+        found = event_descriptions.probe_pending()
+        logger.info(f"竹園 Wiki 新確認 {len(found)} 位教師的頁面")
 
-        
         logger.info("所有快取更新完成")
     except Exception as e:
         logger.error(f"快取更新過程中發生錯誤: {str(e)}")
@@ -51,9 +76,28 @@ def run_cache_update():
         except Exception as e:
             logger.error(f"快取更新失敗: {str(e)}")
 
-def start_cache_updater():
-    """在新線程中啟動快取更新器"""
-    updater_thread = threading.Thread(target=run_cache_update, daemon=True)
+def start_cache_updater(run_immediately: bool = False):
+    """在新線程中啟動快取更新器
+
+    Args:
+        run_immediately (bool): 是否先立即更新一次，再等待下一個凌晨 2 點；
+            否則先以目前世代的快照載入排課使用的課表
+    """
+    def run():
+        if run_immediately:
+            try:
+                asyncio.run(update_cache())
+            except Exception as e:
+                logger.error(f"快取更新失敗: {str(e)}")
+        elif data_generations.current().snapshot is not None:
+            try:
+                loaded = asyncio.run(preload_from_snapshot(data_generations.current().snapshot, save=False))
+                logger.info(f"已由課表快照載入 {loaded} 份排課課表")
+            except Exception as e:
+                logger.error(f"排課課表載入失敗: {str(e)}")
+        run_cache_update()
+
+    updater_thread = threading.Thread(target=run, daemon=True)
     updater_thread.start()
     return updater_thread
 
@@ -0,0 +1,127 @@
+import http.server
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import tnfsh_class_table.backend as backend
+import tnfsh_class_table.new_backend.snapshot as snapshot_module
+from tnfsh_class_table.backend import NewWikiTeacherIndex, TNFSHClassTableIndex, data_generations
+from tnfsh_class_table.new_backend.cache import TieredPageCache
+from tnfsh_class_table.new_backend.crawler import BASE_URL, INDEX_PAGES
+from tnfsh_class_table.new_backend.sequence import EventSequences
+from tnfsh_class_table.new_backend.snapshot import TimetableSnapshot
+
+PAGE = Path(__file__).resolve().parent.parent / "assests" / "班級課表.html"
+
+CLASS_INDEX = '<table><tr><td><span>高三</span></td></tr><tr><td><a href="C101307.html">307</a></td><td><a href="C101308.html">308</a></td></tr></table>'
+TEACH_INDEX = '<table><tr><td><span>國文科</span></td></tr><tr><td><a href="TA01.html">TA01 王小明</a></td></tr></table>'
+
+
+class _TimetableSite(http.server.BaseHTTPRequestHandler):
+    """模擬課表網站：索引頁面與 307、308 班課表，課表帶有 ETag 並支援 If-None-Match"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        name = self.path.rsplit("/", 1)[-1]
+        with self.server.lock:
+            self.server.hits[name] = self.server.hits.get(name, 0) + 1
+            self.server.headers.setdefault(name, []).append(dict(self.headers))
+        time.sleep(self.server.delay)
+        pages = {INDEX_PAGES["class"]: CLASS_INDEX.encode("utf-8"), INDEX_PAGES["teacher"]: TEACH_INDEX.encode("utf-8")}
+        if name in pages:
+            self._send(200, pages[name])
+        elif name in ("C101307.html", "C101308.html"):
+            if self.headers.get("If-None-Match") == self.server.etag:
+                self._send(304, b"")
+            else:
+                self._send(200, PAGE.read_bytes(), self.server.etag)
+        else:
+            self._send(404, b"")
+
+    def _send(self, status: int, body: bytes, etag: str = "") -> None:
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class _Tables:
+    """代替 class_table_cache，只提供 get()"""
+    def __init__(self, tables):
+        self.tables = tables
+
+    def get(self, target):
+        if target not in self.tables:
+            raise ValueError(f"找不到 {target}")
+        return self.tables[target]
+
+
+@pytest.fixture
+def index_pages():
+    """課表網站的索引頁面 {"class": 班級索引, "teacher": 教師索引}"""
+    return {"class": CLASS_INDEX, "teacher": TEACH_INDEX}
+
+
+@pytest.fixture
+def page_cache(tmp_path, index_pages):
+    """存有索引頁面與 307 班課表的網頁快取"""
+    cache = TieredPageCache(tmp_path / "pages")
+    cache.put(BASE_URL + INDEX_PAGES["class"], index_pages["class"].encode("utf-8"))
+    cache.put(BASE_URL + INDEX_PAGES["teacher"], index_pages["teacher"].encode("utf-8"))
+    cache.put(BASE_URL + "C101307.html", PAGE.read_bytes(), etag='"v1"')
+    return cache
+
+
+@pytest.fixture
+def snapshot(tmp_path, page_cache, monkeypatch):
+    """由 page_cache 寫入並開啟的快照，TNFSHClassTableIndex 改用快照中的索引
+
+    測試期間 event_sequences 寫入 tmp_path，竹園 Wiki 索引為空的替身，
+    結束時還原兩個索引的單例與資料世代，不影響其他測試。
+    """
+    sequences = EventSequences(tmp_path / "event_sequences.json")
+    monkeypatch.setattr(backend, "event_sequences", sequences)
+    monkeypatch.setattr(snapshot_module, "event_sequences", sequences)
+    monkeypatch.setattr(data_generations, "_current", data_generations.current())
+    for cls in (TNFSHClassTableIndex, NewWikiTeacherIndex):
+        monkeypatch.setattr(cls, "_instance", None)
+        monkeypatch.setattr(cls, "_initialized", False)
+    monkeypatch.setattr(NewWikiTeacherIndex, "_instance", SimpleNamespace(version=1, reverse_index={}))
+    monkeypatch.setattr(NewWikiTeacherIndex, "_initialized", True)
+
+    snapshot = TimetableSnapshot.open(TimetableSnapshot.write_from_page_cache(page_cache, tmp_path / "timetables.snapshot"))
+    TNFSHClassTableIndex.from_index(snapshot.index())
+    yield snapshot
+
+
+@pytest.fixture
+def timetable_site():
+    """本機的模擬課表網站
+
+    server.hits 與 server.headers 記錄每個網頁的請求次數與請求標頭，
+    server.etag 為課表目前的 ETag，server.delay 為每次回應前的延遲（秒）。
+    """
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _TimetableSite)
+    server.lock = threading.Lock()
+    server.hits, server.headers = {}, {}
+    server.etag, server.delay = '"v1"', 0.0
+    server.base_url = f"http://127.0.0.1:{server.server_port}/course/"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def tables():
+    """以 {target: TNFSHClassTable} 建立代替 class_table_cache 的物件"""
+    return _Tables
@@ -0,0 +1,51 @@
+import csv
+import io
+from datetime import date, datetime, time
+
+import tnfsh_class_table.backend as backend
+from tnfsh_class_table.ai_tools.timetable.lesson import get_next_lesson
+from tnfsh_class_table.backend import TNFSHClassTable
+from tnfsh_class_table.new_backend.bells import bell_schedules
+
+
+def test_tables_share_bell_schedule_and_find_next_lesson(monkeypatch, snapshot, tables):
+    """節次時間相同的課表共用同一個鐘聲表，並以它查詢下一節"""
+    table = TNFSHClassTable.from_cached("307", snapshot)
+    other = TNFSHClassTable.from_cached("307", snapshot)
+    assert table.lessons is not other.lessons
+    schedule = table.bell_schedule
+    assert schedule is other.bell_schedule is bell_schedules.get(dict(table.lessons))
+    assert schedule.as_dict() == table.lessons
+
+    assert schedule.at(date(2025, 9, 1), 0) == (datetime(2025, 9, 1, 8, 0), datetime(2025, 9, 1, 8, 50))
+    assert schedule.period_at(time(8, 30)) == 0
+    assert schedule.period_at(time(8, 55)) is None
+    assert schedule.next_period(time(8, 0)) == 1
+    assert schedule.next_period(time(8, 55)) == 1
+    assert schedule.next_period(time(17, 0)) is None
+
+    monkeypatch.setattr(backend, "class_table_cache", tables({"307": table}))
+    # 2025-09-01 是星期一
+    result = get_next_lesson("307", "2025-09-01 08:55")
+    assert result["day"] == 1 and result["period"] == 2 and result["start"] == "09:00"
+    assert result["subject"] == (table.grid.course(1, 0)[0] or "空堂")
+    assert get_next_lesson("307", "2025-09-06 08:55") == "今天沒有課"
+
+
+def test_unparseable_bell_time_skips_only_that_period(snapshot):
+    """某節的時間無法解析時，匯出 CSV 與 ICS 只略過該節的課程"""
+    table = TNFSHClassTable.from_cached("307", snapshot)
+    lessons = dict(table.lessons)
+    lessons["第一節"] = ["待定", "待定"]
+    table.__dict__["lessons"] = lessons
+
+    grid = table.grid
+    busy = [
+        (period, day) for period in range(grid.periods) for day in range(grid.weekdays)
+        if grid.course(period, day)[0]
+    ]
+    expected = len([slot for slot in busy if slot[0] != 0])
+    assert expected < len(busy)
+    assert table.render("ics").count(b"BEGIN:VEVENT") == expected
+    rows = list(csv.DictReader(io.StringIO(table.render("csv").decode("utf-8-sig"))))
+    assert len(rows) == expected and "08:00 AM" not in {row["Start Time"] for row in rows}
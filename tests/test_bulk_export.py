@@ -0,0 +1,21 @@
+import zipfile
+
+from tnfsh_class_table.backend import TNFSHClassTable
+from tnfsh_class_table.new_backend.bulk_export import export_all
+from tnfsh_class_table.new_backend.snapshot import install_snapshot
+
+
+def test_export_all_writes_every_target_from_snapshot(tmp_path, snapshot):
+    """由快照匯出所有課表到 zip，不發送請求，並回報進度"""
+    install_snapshot(snapshot)
+    requests_before = TNFSHClassTable.request_count
+    updates = []
+    report = export_all(tmp_path / "all.zip", formats=("ics", "JSON"), progress=lambda p: updates.append(p.done))
+
+    assert report.summary().startswith("1/1 份課表、2 個檔案")
+    assert updates == [1] and report.errors == {}
+    assert TNFSHClassTable.request_count == requests_before
+    with zipfile.ZipFile(tmp_path / "all.zip") as archive:
+        assert sorted(archive.namelist()) == ["class/307.ics", "class/307.json"]
+        table = TNFSHClassTable.from_cached("307", snapshot)
+        assert archive.read("class/307.ics") == table.render("ics")
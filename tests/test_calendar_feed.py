@@ -0,0 +1,41 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from tnfsh_class_table.backend import ExportCache, TNFSHClassTable
+from tnfsh_class_table.new_backend.feed import CalendarFeed, mount_calendar_feed
+
+
+def test_feed_serves_ics_with_etag_and_304(tmp_path, snapshot, tables):
+    """第一次回應完整 ICS，帶著 ETag 或 Last-Modified 再次請求時回應 304"""
+    table = TNFSHClassTable.from_cached("307", snapshot)
+    feed = CalendarFeed(tables({"307": table}), ExportCache(directory=str(tmp_path / "exports")))
+    app = FastAPI()
+    mount_calendar_feed(app, feed)
+    client = TestClient(app)
+
+    response = client.get("/307.ics")
+    assert response.status_code == 200 and response.content == table.render("ics")
+    assert response.headers["content-type"].startswith("text/calendar")
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+
+    assert client.get("/307.ics", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/307.ics", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/307.ics", headers={"If-None-Match": '"other"'}).status_code == 200
+    assert client.get("/999.ics").status_code == 404
+    assert feed.stats() == {"responses": 2, "not_modified": 2, "etags": 1}
+
+
+def test_known_etag_304_skips_export(tmp_path, snapshot, tables, monkeypatch):
+    """已記住 ETag 的課表收到相符的 If-None-Match 時直接回應 304，不取得匯出內容"""
+    table = TNFSHClassTable.from_cached("307", snapshot)
+    exports = ExportCache(directory=str(tmp_path / "exports"))
+    feed = CalendarFeed(tables({"307": table}), exports)
+    status, headers, body = feed.respond("307")
+    assert status == 200 and body == table.render("ics")
+
+    calls = []
+    monkeypatch.setattr(exports, "get", lambda *args: calls.append(args))
+    status, not_modified_headers, body = feed.respond("307", if_none_match=headers["ETag"])
+    assert status == 304 and body == b"" and calls == []
+    assert not_modified_headers["ETag"] == headers["ETag"]
+    assert not_modified_headers["Last-Modified"] == headers["Last-Modified"]
@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+import tnfsh_class_table.backend as backend
+from tnfsh_class_table.backend import DataGeneration, TNFSHClassTableCache, TNFSHClassTableIndex, data_generations
+
+
+@pytest.fixture
+def clock(snapshot, timetable_site, monkeypatch):
+    """索引指向本機的模擬課表網站，並以可手動推進的時鐘取代 monotonic"""
+    TNFSHClassTableIndex.from_index(dict(snapshot.index(), base_url=timetable_site.base_url))
+    monkeypatch.setattr(data_generations, "_current", DataGeneration(0))
+    now = [0.0]
+    monkeypatch.setattr(backend, "monotonic", lambda: now[0])
+    return now
+
+
+def _burst(func, count=16):
+    """以多個執行緒同時呼叫 func，回傳所有結果"""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def run(i):
+        barrier.wait()
+        results[i] = func()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_ttl_expiry_revalidates(clock, timetable_site):
+    """TTL 內直接命中；過期後以 If-None-Match 重新驗證，304 沿用舊物件，內容變動時換成新物件"""
+    cache = TNFSHClassTableCache(ttl=60)
+    table = cache.get("307")
+    assert table.grid.course(0, 0) == ("體育", {"潘帝仁": "TK07.HTML"})
+    assert table.etag == '"v1"' and timetable_site.hits["C101307.html"] == 1
+
+    clock[0] = 60
+    assert cache.get("307") is table
+    assert timetable_site.hits["C101307.html"] == 1
+
+    clock[0] = 61
+    assert cache.get("307") is table
+    assert timetable_site.headers["C101307.html"][-1]["If-None-Match"] == '"v1"'
+    assert cache.stats()["revalidations"] == 1 and cache.stats()["refreshes"] == 0
+
+    timetable_site.etag = '"v2"'
+    clock[0] = 200
+    refreshed = cache.get("307")
+    assert refreshed is not table and refreshed.table == table.table and refreshed.etag == '"v2"'
+    assert cache.stats()["revalidations"] == 1 and cache.stats()["refreshes"] == 1
+    assert timetable_site.hits["C101307.html"] == 3
+
+
+def test_lru_eviction_at_max_size(clock, timetable_site):
+    """超過 max_size 時淘汰最久未使用的項目，最近使用過的項目保留"""
+    cache = TNFSHClassTableCache(max_size=2)
+    first = cache.get("307")
+    cache.get("308")
+    assert cache.get("307") is first
+    cache.get("王小明")
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["misses"] == 3 and stats["hits"] == 1
+    assert cache.get("307") is first
+    cache.get("308")
+    assert cache.stats()["misses"] == 4 and cache.stats()["evictions"] == 2
+    # 建立課表物件不會發送請求
+    assert "C101307.html" not in timetable_site.hits
+
+
+def test_concurrent_burst_costs_one_fetch(clock, timetable_site):
+    """同一 target 的同時請求只抓取一次，過期後的同時請求也只重新驗證一次"""
+    timetable_site.delay = 0.05
+    cache = TNFSHClassTableCache(ttl=60)
+    grids = _burst(lambda: cache.get("307").grid)
+    assert all(grid is grids[0] for grid in grids)
+    assert timetable_site.hits["C101307.html"] == 1
+    assert cache.stats()["misses"] == 1
+
+    clock[0] = 61
+    tables = _burst(lambda: cache.get("307"))
+    assert all(table is tables[0] for table in tables)
+    assert timetable_site.hits["C101307.html"] == 2
+    assert cache.stats()["revalidations"] == 1
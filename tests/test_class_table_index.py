@@ -0,0 +1,95 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import requests
+
+from tnfsh_class_table.backend import TNFSHClassTableIndex
+
+
+class _Site:
+    """模擬學校網站的索引頁面，可以設定為失敗或暫停"""
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = 0
+        self.fail = False
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def get(self, url, timeout=None):
+        self.calls += 1
+        self.gate.wait(5)
+        if self.fail:
+            raise requests.ConnectionError("連線失敗")
+        content = self.pages["class" if url.endswith("_ClassIndex.html") else "teacher"]
+        return SimpleNamespace(content=content.encode("utf-8"), raise_for_status=lambda: None)
+
+
+def _reset(monkeypatch, tmp_path, site):
+    monkeypatch.setattr(requests, "get", site.get)
+    monkeypatch.setattr(TNFSHClassTableIndex, "_instance", None)
+    monkeypatch.setattr(TNFSHClassTableIndex, "_initialized", False)
+    monkeypatch.setattr(TNFSHClassTableIndex, "persist_path", str(tmp_path / "index.json"))
+
+
+def test_index_is_persisted_and_keeps_last_good_copy(tmp_path, monkeypatch, index_pages):
+    """索引寫入磁碟後，下次啟動不發送請求；重新載入失敗時保留舊的索引"""
+    site = _Site(index_pages)
+    _reset(monkeypatch, tmp_path, site)
+    first = TNFSHClassTableIndex()
+    assert site.calls == 2 and first.source == "network"
+    assert "307" in first.reverse_index
+
+    _reset(monkeypatch, tmp_path, site)
+    site.calls = 0
+    index = TNFSHClassTableIndex()
+    assert site.calls == 0 and index.source == "disk"
+    assert index.index == first.index
+
+    site.fail = True
+    assert index.refresh() is False
+    assert "307" in index.reverse_index
+    stats = index.stats()
+    assert stats["failures"] == 1 and stats["last_error"] and stats["last_refresh_duration"] is not None
+
+
+def test_stale_index_is_revalidated_in_background(tmp_path, monkeypatch, index_pages):
+    """過期的索引立即可用，重新驗證在背景進行"""
+    site = _Site(index_pages)
+    _reset(monkeypatch, tmp_path, site)
+    TNFSHClassTableIndex()
+    path = tmp_path / "index.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["saved_at"] -= TNFSHClassTableIndex.max_age + 1
+    data["index"]["class"]["data"]["高三"].pop("308")
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    _reset(monkeypatch, tmp_path, site)
+    site.gate.clear()
+    index = TNFSHClassTableIndex()
+    # 網站還沒有回應，讀取端仍拿到磁碟上的索引
+    assert "307" in index.reverse_index and "308" not in index.reverse_index
+    assert index.stats()["refreshing"]
+    assert index.revalidate() is None
+
+    site.gate.set()
+    with TNFSHClassTableIndex._refresh_lock:
+        pass
+    assert "308" in index.reverse_index
+    assert index.source == "network" and index.age < 60 and index.refreshes == 1
+
+
+def test_cold_start_failure_is_retried(tmp_path, monkeypatch, index_pages):
+    """第一次執行時網站無法連線，空的索引視為已過期，下一次重新驗證立即重新載入"""
+    site = _Site(index_pages)
+    site.fail = True
+    _reset(monkeypatch, tmp_path, site)
+    index = TNFSHClassTableIndex()
+    assert index.reverse_index == {} and index.loaded_at == 0
+    assert index.age > TNFSHClassTableIndex.max_age
+    assert index.stats()["last_error"] and not (tmp_path / "index.json").exists()
+
+    site.fail = False
+    assert index.refresh() is True
+    assert "307" in index.reverse_index and index.stats()["last_error"] is None
+    assert index.age < 60 and (tmp_path / "index.json").exists()
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from tnfsh_class_table.new_backend.columnar import export_columnar, timetable_frame
+
+
+def test_columnar_frame_matches_row_by_row(tmp_path, snapshot):
+    """向量化展開的結果與逐格讀取課表相同，CSV 可以讀回"""
+    parsed = snapshot.lookup("307")
+    times = list(parsed.lessons.values())
+    expected = []
+    for period in range(parsed.grid.periods):
+        for weekday in range(parsed.grid.weekdays):
+            subject, counterparts = parsed.grid.course(period, weekday)
+            if subject == "":
+                continue
+            start, end = times[period] if period < len(times) else (None, None)
+            for counterpart in counterparts or [None]:
+                expected.append(("307", "class", weekday + 1, period + 1, subject, counterpart, start, end))
+
+    frame = timetable_frame(snapshot)
+    rows = [tuple(None if pd.isna(value) else value for value in row) for row in frame.itertuples(index=False)]
+    assert sorted(rows, key=str) == sorted(expected, key=str)
+
+    path = tmp_path / "全校課表.csv"
+    assert export_columnar(path, format="csv", snapshot=snapshot) == len(expected)
+    assert len(pd.read_csv(path, encoding="utf-8-sig")) == len(expected)
@@ -0,0 +1,30 @@
+from tnfsh_timetable_core.scheduling.models import ClassNode, CourseNode as CoreCourseNode, TeacherNode
+from tnfsh_timetable_core.timetable_slot_log_dict.models import StreakTime
+
+from tnfsh_class_table.model.node import CourseNode
+from tnfsh_class_table.new_backend.models import TimeSlot
+
+
+def _core_nodes():
+    teacher = TeacherNode(teacher_name="王小明", courses={})
+    class_node = ClassNode(class_code="307", courses={})
+    busy = CoreCourseNode(time=StreakTime(weekday=1, period=2, streak=1), subject="國文",
+                          teachers={"王小明": teacher}, classes={"307": class_node})
+    free = CoreCourseNode(time=StreakTime(weekday=3, period=4, streak=2), is_free=True,
+                          teachers={"王小明": teacher}, classes={})
+    teacher.courses.update({busy.time: busy, free.time: free})
+    class_node.courses[busy.time] = busy
+    return busy, free
+
+
+def test_paths_from_core_share_snapshots():
+    """轉換後的節點與原節點比較結果一致，且同一原節點只建立一份快照"""
+    busy, free = _core_nodes()
+    paths = CourseNode.paths_from_core([[busy, free], [free, busy]])
+
+    assert paths[0][0] is paths[1][1]
+    assert paths[0][0] == CourseNode.from_core(busy)
+    assert paths[0][0] != paths[0][1]
+    assert paths[0][0].teacher == "王小明" and paths[0][1].is_free
+    assert paths[0][1].time == TimeSlot(3, 4) and paths[0][1].time.streak == 2
+
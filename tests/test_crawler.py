@@ -0,0 +1,94 @@
+import http.server
+import threading
+
+import pytest
+
+from tnfsh_class_table.new_backend.crawler import CourseSiteCrawler
+
+CLASS_INDEX = """<html><body><table>
+<tr><td><span>高一</span></td></tr>
+<tr><td><a href="C101101.html">101</a></td><td><a href="C101102.html">102</a></td></tr>
+<tr><td><span>高二</span></td></tr>
+<tr><td><a href="C101201.html">201</a></td><td><a href="C101299.html">299</a></td></tr>
+</table></body></html>"""
+
+TEACH_INDEX = """<html><body><table>
+<tr><td><span>國文科</span></td></tr>
+<tr><td><a href="TA01.html">TA01 王小明</a></td><td><a href="TA02.html">TA02 李大華</a></td></tr>
+</table></body></html>"""
+
+
+class _CourseSite(http.server.BaseHTTPRequestHandler):
+    """模擬課表網站：C101201.html 第一次回傳 503，C101299.html 不存在"""
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self) -> None:
+        name = self.path.rsplit("/", 1)[-1]
+        with self.server.lock:
+            self.server.hits[name] = self.server.hits.get(name, 0) + 1
+            hits = self.server.hits[name]
+        pages = {"_ClassIndex.html": CLASS_INDEX, "_TeachIndex.html": TEACH_INDEX}
+        if name == "C101201.html" and hits == 1:
+            self._send(503, b"")
+        elif name in pages:
+            self._send(200, pages[name].encode("utf-8"))
+        elif name.startswith(("C1", "TA")) and name != "C101299.html":
+            self._send(200, f"<html><body>{name}</body></html>".encode("utf-8"), etag=f'"{name}"')
+        else:
+            self._send(404, b"")
+
+    def _send(self, status: int, body: bytes, etag: str = "") -> None:
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", "Mon, 01 Sep 2025 00:00:00 GMT")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def course_site():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _CourseSite)
+    server.lock = threading.Lock()
+    server.hits = {}
+    server.connections = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_crawl_course_site(course_site):
+    """一次抓取索引與所有課表頁面，暫時性錯誤會重試，連線會重複使用"""
+    base_url = f"http://127.0.0.1:{course_site.server_port}/course/"
+    crawler = CourseSiteCrawler(base_url, concurrency=2, delay=0.001, backoff=0.01)
+    result = await crawler.crawl()
+
+    assert result.index["class"]["data"] == {
+        "高一": {"101": "C101101.html", "102": "C101102.html"},
+        "高二": {"201": "C101201.html", "299": "C101299.html"},
+    }
+    assert result.index["teacher"]["data"] == {"國文科": {"王小明": "TA01.html", "李大華": "TA02.html"}}
+    assert result.page("王小明") == b"<html><body>TA01.html</body></html>"
+    assert result.page("201") == b"<html><body>C101201.html</body></html>"
+    assert course_site.hits["C101201.html"] == 2
+    # 保留每頁的 ETag 與 Last-Modified，之後可以條件式重新驗證
+    assert result.validators["TA01.html"] == ('"TA01.html"', "Mon, 01 Sep 2025 00:00:00 GMT")
+    assert result.validators["_ClassIndex.html"] == (None, None)
+    assert list(result.errors) == ["C101299.html"]
+    assert len(result.pages) == 7
+    assert result.requests == 9
+    assert course_site.connections <= crawler.concurrency
+    assert result.pages_per_second > 0
+    assert "7 頁" in result.report()
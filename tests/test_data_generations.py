@@ -0,0 +1,25 @@
+from tnfsh_class_table.ai_tools.scheduling.cache import CacheKey, SchedulingCache
+from tnfsh_class_table.backend import DataGenerations
+
+
+def test_requests_keep_their_generation_after_publish():
+    """發布新世代後，舊世代的請求仍能取得自己的結果，新世代不會命中舊結果"""
+    generations = DataGenerations()
+    cache = SchedulingCache()
+    old = generations.current()
+    key = CacheKey("王小明", 1, 2, "swap", (1,), generation=old.number)
+    cache.set(key, ["old"])
+
+    new = generations.publish("snapshot")
+    assert new.number == old.number + 1 and generations.current() is new
+    assert cache.get(key) == ["old"]
+    new_key = CacheKey("王小明", 1, 2, "swap", (1,), generation=new.number)
+    assert cache.get(new_key) is None
+    cache.set(new_key, ["new"])
+
+    # 只移除比上個世代更舊的結果
+    assert cache.prune(old) == 0
+    newest = generations.publish()
+    assert cache.prune(new) == 1
+    assert cache.get(key) is None and cache.get(new_key) == ["new"]
+    assert newest.number == new.number + 1
@@ -0,0 +1,56 @@
+import threading
+from types import SimpleNamespace
+
+import requests
+
+from tnfsh_class_table.backend import EventDescriptionCache, NewWikiTeacherIndex
+
+URL = "http://w3.tnfsh.tn.edu.tw/deanofstudies/course/C101307.html"
+WIKI = SimpleNamespace(version=1, reverse_index={"王小明": {"url": "/王小明", "category": "國文科"}})
+
+
+def test_descriptions_are_shared_and_never_touch_network(monkeypatch):
+    """相同對象的描述只建立一次，匯出時不發送請求，未知教師留待背景確認"""
+    def head(url, timeout=5):
+        head.calls.append(url)
+        return SimpleNamespace(status_code=200)
+    head.calls = []
+    monkeypatch.setattr(requests, "head", head)
+
+    cache = EventDescriptionCache(wiki_index=WIKI)
+    known = cache.get("class", "307", URL, {"王小明": "TA01.html"})
+    assert 'href="https://tnfshwiki.tfcis.org/王小明">王小明-wiki' in known
+    assert cache.get("class", "307", URL, {"王小明": "TA01.html"}) is known
+    unknown = cache.get("class", "307", URL, {"林某": "TB01.html"})
+    assert "新竹園wiki： 無相關資料" in unknown
+    assert head.calls == [] and cache.stats()["hits"] == 1
+
+    assert cache.probe_pending() == ["林某"]
+    assert 'href="https://tnfshwiki.tfcis.org/林某"' in cache.get("class", "307", URL, {"林某": "TB01.html"})
+
+    # 索引版本變更時重新建立
+    cache._wiki_index = SimpleNamespace(version=2, reverse_index={})
+    assert "新竹園wiki： 無相關資料" in cache.get("class", "307", URL, {"王小明": "TA01.html"})
+
+
+def test_cold_wiki_index_is_loaded_in_background(monkeypatch):
+    """竹園 Wiki 索引尚未載入時匯出不等待抓取，描述先不含連結，背景載入後重新建立"""
+    loaded = threading.Event()
+
+    def get_instance():
+        loaded.wait(5)
+        monkeypatch.setattr(NewWikiTeacherIndex, "_instance", WIKI)
+        monkeypatch.setattr(NewWikiTeacherIndex, "_initialized", True)
+        return WIKI
+    monkeypatch.setattr(NewWikiTeacherIndex, "get_instance", get_instance)
+    monkeypatch.setattr(NewWikiTeacherIndex, "_initialized", False)
+
+    cache = EventDescriptionCache()
+    cold = cache.get("class", "307", URL, {"王小明": "TA01.html"})
+    assert "新竹園wiki： 無相關資料" in cold and cache.pending() == ["王小明"]
+    warming = cache._warming
+    assert warming.is_alive()
+
+    loaded.set()
+    warming.join(5)
+    assert 'href="https://tnfshwiki.tfcis.org/王小明">王小明-wiki' in cache.get("class", "307", URL, {"王小明": "TA01.html"})
@@ -0,0 +1,55 @@
+from icalendar import Calendar
+
+import tnfsh_class_table.backend as backend
+from tnfsh_class_table.backend import TimetableGrid, TNFSHClassTable, TNFSHClassTableCache
+from tnfsh_class_table.new_backend.sequence import EventSequences, event_uid, slot_fingerprints
+from tnfsh_class_table.new_backend.snapshot import install_snapshot
+
+
+def _events(data):
+    return {
+        str(event["uid"]): int(event["sequence"])
+        for event in Calendar.from_ical(data).walk("VEVENT")
+    }
+
+
+def test_uid_is_stable_and_only_changed_slots_bump_sequence(tmp_path, snapshot):
+    """重新匯出時 UID 不變，只有內容改變的格子 SEQUENCE 遞增"""
+    table = TNFSHClassTable.from_cached("307", snapshot)
+    first = _events(table._render_ics())
+    assert first and set(first.values()) == {0}
+    assert event_uid("307", 1, 1) in first
+    assert table._render_ics() == table._render_ics_with_icalendar()
+
+    # 換掉週一第一節的課程
+    nested = table.grid.to_nested()
+    nested[0][0] = {"自主學習": {}}
+    changed = TNFSHClassTable.from_cached("307", snapshot)
+    changed.grid = TimetableGrid.from_nested(nested)
+    second = _events(changed._render_ics())
+    assert second.keys() == first.keys()
+    assert {uid for uid, sequence in second.items() if sequence} == {event_uid("307", 1, 1)}
+    assert second[event_uid("307", 1, 1)] == 1
+
+    # 紀錄保存在檔案中，重新啟動後 SEQUENCE 延續
+    restarted = EventSequences(tmp_path / "event_sequences.json")
+    assert restarted.get("307", 1, 1)[0] == 1
+    assert restarted.update("307", slot_fingerprints(changed.grid, changed.lessons)) == []
+
+
+def test_export_from_previous_generation_does_not_bump_sequence(snapshot):
+    """切換世代後才匯出切換前取得的課表，不以舊內容比對，SEQUENCE 不會在新舊內容之間來回遞增"""
+    cache = TNFSHClassTableCache()
+    install_snapshot(snapshot)
+    old = cache.get("307")
+    # 舊世代的週一第一節與新世代不同
+    nested = old.grid.to_nested()
+    nested[0][0] = {"自主學習": {}}
+    old.grid = TimetableGrid.from_nested(nested)
+
+    install_snapshot(snapshot)
+    assert _events(old._render_ics())[event_uid("307", 1, 1)] == 0
+    new = cache.get("307")
+    assert new.generation == old.generation + 1
+    assert _events(new._render_ics())[event_uid("307", 1, 1)] == 0
+    assert backend.event_sequences.bumps == 0
@@ -0,0 +1,40 @@
+import pytest
+
+from tnfsh_class_table.backend import ExportCache, TimetableGrid, TNFSHClassTable
+
+
+def test_export_cache_serves_unique_files(tmp_path, monkeypatch, snapshot):
+    """相同內容只匯出一次，每次下載寫入不同的暫存檔，內容與 export() 相同"""
+    table = TNFSHClassTable.from_cached("307", snapshot)
+
+    cache = ExportCache(directory=str(tmp_path / "exports"))
+    first = cache.export_file(table, "ICS")
+    second = cache.export_file(table, "ics")
+    assert first != second and first.endswith("class_307.ics")
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 1
+
+    monkeypatch.chdir(tmp_path)
+    with open(first, "rb") as f:
+        assert f.read() == (tmp_path / table.export("ics")).read_bytes()
+    assert b"".join(table.iter_export("csv", chunk_size=100)) == table.render("csv")
+
+
+def test_export_cache_key_is_cheap_and_failed_renders_release_locks(tmp_path, monkeypatch, snapshot):
+    """快取鍵的 data_version 只計算一次，內容改變時重新計算；匯出失敗時不留下鍵的鎖"""
+    table = TNFSHClassTable.from_cached("307", snapshot)
+    calls = []
+    to_nested = TimetableGrid.to_nested
+    monkeypatch.setattr(TimetableGrid, "to_nested", lambda grid: calls.append(grid) or to_nested(grid))
+    version = table.data_version
+    assert ExportCache.key(table, "json") == ExportCache.key(table, "json") and len(calls) == 1
+
+    nested = to_nested(table.grid)
+    nested[0][0] = {"自主學習": {}}
+    table.grid = TimetableGrid.from_nested(nested)
+    assert table.data_version != version and len(calls) == 2
+
+    cache = ExportCache(directory=str(tmp_path / "exports"))
+    monkeypatch.setattr(table, "render", lambda type: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        cache.get(table, "json")
+    assert cache._key_locks == {}
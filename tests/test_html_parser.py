@@ -0,0 +1,63 @@
+import json
+from pathlib import Path
+
+import pytest
+from tnfsh_class_table.backend import TNFSHClassTable, TimetableExtractor
+from tnfsh_class_table.utils.html_parser import SOUP_BACKENDS, available_backends, get_backend, make_soup
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGE = ROOT / "assests" / "班級課表.html"
+GOLDEN = json.loads((Path(__file__).resolve().parent / "golden" / "班級課表.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_extractor_golden(backend):
+    """每個可用的解析器後端都應得到與 golden 完全相同的課表"""
+    lessons, table, last_update = TimetableExtractor.extract(PAGE.read_bytes(), backend)
+    assert lessons == GOLDEN["lessons"]
+    assert table == GOLDEN["table"]
+    assert last_update == GOLDEN["last_update"]
+
+
+@pytest.mark.parametrize("backend", [name for name in available_backends() if name in SOUP_BACKENDS])
+def test_soup_golden(backend):
+    """以 make_soup 建立的樹走原本的解析流程，結果也應與 golden 相同"""
+    table = object.__new__(TNFSHClassTable)
+    table.soup = make_soup(PAGE.read_bytes(), backend)
+    table.soup_table = table._get_soup_table()
+    table.regular_soup_table = table._get_regular_soup_table()
+    assert table._get_lesson() == GOLDEN["lessons"]
+    assert table._get_table() == GOLDEN["table"]
+    assert table._get_last_update() == GOLDEN["last_update"]
+
+
+def test_get_backend(monkeypatch):
+    monkeypatch.delenv("TNFSH_HTML_PARSER", raising=False)
+    assert get_backend() == available_backends()[0]
+    assert get_backend(soup=True) in SOUP_BACKENDS
+    assert get_backend("html.parser") == "html.parser"
+
+    monkeypatch.setenv("TNFSH_HTML_PARSER", "html.parser")
+    assert get_backend() == "html.parser"
+
+    with pytest.raises(ValueError):
+        get_backend("no-such-parser")
+
+
+def test_uncovered_pages_keep_html_parser(monkeypatch):
+    """沒有 golden 的索引頁面與竹園 Wiki 頁面固定使用 html.parser，不隨預設後端改變"""
+    import tnfsh_class_table.backend as backend
+    import tnfsh_class_table.new_backend.wiki_crawler as wiki_crawler
+
+    used = []
+
+    def spy(markup, parser=None):
+        used.append(parser)
+        return make_soup(markup, parser)
+
+    monkeypatch.setattr(backend, "make_soup", spy)
+    monkeypatch.setattr(wiki_crawler, "make_soup", spy)
+    backend.TNFSHClassTableIndex._parse_index_page('<table><tr><td><span>高一</span></td></tr><tr><td><a href="C101101.html">101</a></td></tr></table>')
+    wiki_crawler.parse_subjects('<div class="mw-category"></div><div class="mw-category"><a href="/x">國文科</a></div>')
+    wiki_crawler.parse_teachers('<div class="mw-category"><a href="/王小明">王小明</a></div>')
+    assert used == ["html.parser"] * 3
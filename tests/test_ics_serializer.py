@@ -0,0 +1,43 @@
+import random
+from datetime import datetime
+
+from icalendar import Calendar, Event
+
+from tnfsh_class_table.backend import TNFSHClassTable
+from tnfsh_class_table.new_backend.ics import CalendarEvent, serialize_calendar
+
+
+def _icalendar(prodid, events):
+    cal = Calendar()
+    cal.add("prodid", prodid)
+    cal.add("version", "2.0")
+    for item in events:
+        event = Event()
+        event.add("summary", item.summary)
+        event.add("dtstart", item.start)
+        event.add("dtend", item.end)
+        event.add("location", item.location)
+        event.add("description", item.description)
+        event.add("rrule", {"freq": "weekly", "count": item.count, "byday": [item.byday]})
+        cal.add_component(event)
+    return cal.to_ical()
+
+
+def test_escaping_and_folding_match_icalendar():
+    """跳脫字元、ASCII 與多位元組字元的折行邊界都與 icalendar 相同"""
+    rng = random.Random(5487)
+    alphabet = "ab,;:\\\n\r\"<>/ 國文課表𠀋é\\N"
+    texts = ["", "a" * 74, "a" * 75, "a" * 149, "國" * 25, "a" + "國" * 30, "𠀋" * 40]
+    texts += ["".join(rng.choice(alphabet) for _ in range(rng.randrange(1, 300))) for _ in range(200)]
+    events = [
+        CalendarEvent(text[:40], datetime(2025, 9, 1, 8), datetime(2025, 9, 1, 8, 50), "MO", 20, text, text[::-1])
+        for text in texts
+    ]
+    prodid = "-//class_307.ics_台南一中課表//TW"
+    assert serialize_calendar(prodid, events) == _icalendar(prodid, events)
+
+
+def test_timetable_export_matches_icalendar(snapshot):
+    """實際課表的匯出與原本以 icalendar 產生的內容逐位元組相同"""
+    table = TNFSHClassTable.from_cached("307", snapshot)
+    assert table._render_ics() == table._render_ics_with_icalendar()
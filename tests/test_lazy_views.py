@@ -0,0 +1,33 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import tnfsh_class_table.backend as backend
+from tnfsh_class_table.backend import TNFSHClassTable
+
+PAGE = Path(__file__).resolve().parent.parent / "assests" / "班級課表.html"
+
+
+def test_release_after_views_materialized(snapshot, monkeypatch):
+    """lessons、grid、last_update 都計算完成後釋放網頁內容與 soup，之後存取檢視不會重新抓取"""
+    calls = []
+
+    def fake_get(url, headers=None, timeout=None):
+        calls.append(url)
+        return SimpleNamespace(content=PAGE.read_bytes(), headers={"ETag": '"v1"'}, raise_for_status=lambda: None)
+    monkeypatch.setattr(backend.requests, "get", fake_get)
+
+    table = TNFSHClassTable("307")
+    assert calls == []
+    lessons = table.lessons
+    assert table.soup is not None
+    assert {"content", "_extracted", "soup"} <= set(table.__dict__)
+
+    grid = table.grid
+    assert "content" in table.__dict__
+    last_update = table.last_update
+    assert not {"content", "_extracted", "soup"} & set(table.__dict__)
+
+    assert table.lessons is lessons and table.grid is grid and table.last_update == last_update
+    assert table.table == grid.to_nested() and table.transposed_table
+    assert table.render("json")
+    assert len(calls) == 1 and table.etag == '"v1"'
@@ -0,0 +1,34 @@
+from icalendar import Calendar
+
+from tnfsh_class_table.backend import TimetableGrid, TNFSHClassTable
+from tnfsh_class_table.new_backend.merged import MergedCalendar, TargetEventCache
+
+
+def test_merged_calendar_dedupes_and_adds_incrementally(snapshot, tables):
+    """相同時段的相同課程只保留一次，加入新的課表不會重新產生其他課表的事件"""
+    table = TNFSHClassTable.from_cached("307", snapshot)
+
+    # 選修班級：週一第一節與 307 相同（重複），週二第一節與 307 衝堂
+    nested = [[{"": {}} for _ in row] for row in table.grid.to_nested()]
+    nested[0][0] = table.grid.to_nested()[0][0]
+    nested[0][1] = {"自主學習": {}}
+    elective = TNFSHClassTable.from_cached("307", snapshot)
+    elective.target = "選修"
+    elective.grid = TimetableGrid.from_nested(nested)
+
+    cache = TargetEventCache()
+    calendar = MergedCalendar(["307"], tables({"307": table, "選修": elective}), cache)
+    single = calendar.render()
+    assert single.count(b"BEGIN:VEVENT") == table._render_ics().count(b"BEGIN:VEVENT")
+
+    calendar.add("選修")
+    assert cache.stats()["misses"] == 2
+    merged = calendar.render()
+    summaries = [str(event["summary"]) for event in Calendar.from_ical(merged).walk("VEVENT")]
+    assert len(summaries) == single.count(b"BEGIN:VEVENT") + 1
+    assert "自主學習" in summaries
+    assert cache.stats()["misses"] == 2
+
+    # 另一份合併行事曆沿用快取的事件
+    assert MergedCalendar(["選修", "307"], tables({"307": table, "選修": elective}), cache).render().count(b"BEGIN:VEVENT") == len(summaries)
+    assert cache.stats()["misses"] == 2
@@ -0,0 +1,35 @@
+import random
+
+from tnfsh_class_table.backend import TNFSHClassTableIndex
+from tnfsh_class_table.new_backend.names import NameIndex, NameIndexRegistry
+
+
+def test_name_index_matches_linear_scan_and_finds_typos():
+    """子字串查詢與線性掃描結果相同，打錯一個字也能找到"""
+    rng = random.Random(7)
+    chars = "王陳林黃張李吳劉蔡楊許鄭謝郭洪曾邱廖賴周徐蘇葉莊呂江何蕭羅高潘簡朱鍾彭游詹胡施沈余盧梁趙顏柯翁魏孫戴范方宋鄧杜傅侯曹薛丁卓阮馬董温唐藍石蔣古紀姚連馮歐程湯黃田康姜白汪鄒尤巫鐘黎涂龔嚴韓袁金童陸夏柳凃邵錢伍倪溫于譚駱熊任甘秦顧毛章史官萬俞雷粘饒張瑞文明進永華美玲"
+    names = list(dict.fromkeys("".join(rng.choice(chars) for _ in range(rng.choice((2, 3, 4)))) for _ in range(800)))
+    names += ["顏永進", "永進老師"]
+    index = NameIndex(names)
+    for query in ["", "永", "永進", "顏永進", "不存在", *rng.sample(names, 50), *(name[1:] for name in rng.sample(names, 50))]:
+        assert index.contains(query) == tuple(name for name in names if query in name)
+
+    assert index.lookup("顏永進") == ("顏永進",)
+    assert index.lookup("永進") == ("顏永進", "永進老師")
+    assert "顏永進" in index.similar("顏永近")
+    assert index.similar("顏永近")[0] == "顏永進"
+
+
+def test_registry_shares_index_and_resolves_targets(snapshot):
+    """同一份反查表只建立一次名稱索引，課表索引以它修正名稱"""
+    registry = NameIndexRegistry()
+    source = {"王小明": {}, "王大明": {}}
+    assert registry.get("wiki", source, 1) is registry.get("wiki", source, 1)
+    assert registry.get("wiki", source, 2) is not registry.get("wiki", dict(source), 2)
+    assert registry.builds == 3
+
+    index = TNFSHClassTableIndex.get_instance()
+    assert index.names is index.names
+    assert index.resolve_target("小明") == "王小明"
+    assert index.resolve_target("王小名") == "王小明"
+    assert index.resolve_target("陳大文") == "陳大文"
@@ -1,11 +1,13 @@
 
-def test_new_wiki_teacher_index():
+def test_new_wiki_teacher_index(tmp_path):
     from tnfsh_class_table.backend import NewWikiTeacherIndex
     wiki_index = NewWikiTeacherIndex.get_instance()
-    wiki_index.export()
+    wiki_index.export(filepath=str(tmp_path / "new_wiki_teacher_all.json"))
 
 
 
 if __name__ == "__main__":
-    test_new_wiki_teacher_index()
-    print("NewWikiTeacherIndex test completed successfully.")
\ No newline at end of file
+    import pathlib
+    import tempfile
+    test_new_wiki_teacher_index(pathlib.Path(tempfile.mkdtemp()))
+    print("NewWikiTeacherIndex test completed successfully.")
@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import tnfsh_class_table.backend as backend
+from tnfsh_class_table.new_backend.cache import TieredPageCache
+from tnfsh_class_table.new_backend.crawler import BASE_URL, INDEX_PAGES, CrawlResult
+from tnfsh_class_table.new_backend.snapshot import TimetableSnapshot
+
+PAGE = Path(__file__).resolve().parent.parent / "assests" / "班級課表.html"
+GOLDEN = Path(__file__).resolve().parent / "golden" / "班級課表.json"
+URL = BASE_URL + "C101307.html"
+
+
+def test_parsed_from_memory_then_disk(tmp_path):
+    """解析結果先存在記憶體層，新的快取實例可直接從磁碟載入而不重新解析"""
+    golden = json.loads(GOLDEN.read_text(encoding="utf-8"))
+    cache = TieredPageCache(tmp_path)
+    cache.put(URL, PAGE.read_bytes(), etag='"v1"')
+
+    parsed = cache.parsed(URL)
+    assert parsed.grid.to_nested() == golden["table"]
+    assert parsed.last_update == golden["last_update"]
+    assert cache.parsed(URL) is parsed
+    assert cache.stats()["parses"] == 1 and cache.stats()["memory_hits"] == 1
+
+    cold = TieredPageCache(tmp_path)
+    assert cold.parsed(URL).grid.to_nested() == golden["table"]
+    assert cold.record(URL).etag == '"v1"'
+    assert cold.stats()["disk_hits"] == 1 and cold.stats()["parses"] == 0
+    assert cold.parsed(BASE_URL + "missing.html") is None
+
+
+def test_parser_version_invalidates_only_parsed_tier(tmp_path):
+    """解析器版本變更時由磁碟上的原始網頁重新解析，原始網頁以內容雜湊只存一份"""
+    cache = TieredPageCache(tmp_path)
+    cache.put(URL, PAGE.read_bytes())
+    cache.put(BASE_URL + "C101308.html", PAGE.read_bytes())
+    cache.parsed(URL)
+
+    upgraded = TieredPageCache(tmp_path, parser_version=cache.parser_version + 1)
+    assert upgraded.content(URL) == PAGE.read_bytes()
+    assert upgraded.parsed(URL) is not None
+    assert upgraded.stats()["parses"] == 1 and upgraded.stats()["disk_hits"] == 0
+    assert len(list((tmp_path / "raw").iterdir())) == 1
+
+
+def test_load_all_rebuilds_from_disk(tmp_path):
+    """快取中有索引頁面時，不需連網即可重建所有課表"""
+    class_index = '<table><tr><td><span>高三</span></td></tr><tr><td><a href="C101307.html">307</a></td></tr></table>'
+    teach_index = '<table><tr><td><span>國文科</span></td></tr><tr><td><a href="TA01.html">TA01 王小明</a></td></tr></table>'
+    cache = TieredPageCache(tmp_path)
+    cache.put(BASE_URL + INDEX_PAGES["class"], class_index.encode("utf-8"))
+    cache.put(BASE_URL + INDEX_PAGES["teacher"], teach_index.encode("utf-8"))
+    cache.put(URL, PAGE.read_bytes())
+
+    timetables = TieredPageCache(tmp_path).load_all()
+    assert list(timetables) == ["307"]
+    assert timetables["307"].grid.course(0, 0) == ("體育", {"潘帝仁": "TK07.HTML"})
+
+
+def test_put_crawl_keeps_validators(tmp_path, snapshot, index_pages, monkeypatch):
+    """put_crawl 保留抓取時的 ETag，由快照建立的課表重新驗證時會送出 If-None-Match"""
+    result = CrawlResult(index={"base_url": BASE_URL}, pages={
+        INDEX_PAGES["class"]: index_pages["class"].encode("utf-8"),
+        INDEX_PAGES["teacher"]: index_pages["teacher"].encode("utf-8"),
+        "C101307.html": PAGE.read_bytes(),
+    }, validators={"C101307.html": ('"crawled"', "Mon, 01 Sep 2025 00:00:00 GMT")})
+    cache = TieredPageCache(tmp_path / "crawled")
+    assert cache.put_crawl(result) == 3
+    assert cache.record(URL).etag == '"crawled"'
+    assert TieredPageCache(tmp_path / "crawled").record(URL).last_modified == "Mon, 01 Sep 2025 00:00:00 GMT"
+    assert cache.record(BASE_URL + INDEX_PAGES["class"]).etag is None
+
+    sent = []
+    def fake_get(url, headers=None, timeout=None):
+        sent.append(headers)
+        return SimpleNamespace(status_code=304)
+    monkeypatch.setattr(backend.requests, "get", fake_get)
+
+    crawled = TimetableSnapshot.open(TimetableSnapshot.write_from_page_cache(cache, tmp_path / "crawled.snapshot"))
+    table = backend.TNFSHClassTable.from_cached("307", crawled)
+    assert table.revalidate() is None
+    assert sent == [{"If-None-Match": '"crawled"', "If-Modified-Since": "Mon, 01 Sep 2025 00:00:00 GMT"}]
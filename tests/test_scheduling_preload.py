@@ -0,0 +1,24 @@
+import asyncio
+from types import SimpleNamespace
+
+from bs4 import BeautifulSoup
+from tnfsh_timetable_core import TNFSHTimetableCore
+from tnfsh_timetable_core.timetable.cache import prebuilt_cache
+from tnfsh_timetable_core.timetable.crawler import parse_html
+from tnfsh_timetable_core.timetable.models import TimeTable
+
+from tnfsh_class_table.ai_tools.scheduling.cache import preload_from_snapshot
+from tnfsh_class_table.new_backend.crawler import BASE_URL
+
+
+def test_preload_from_snapshot_matches_core_parser(monkeypatch, snapshot, page_cache):
+    """由快照建立的排課課表與 tnfsh_timetable_core 自行解析網頁的結果相同，不再抓取網站"""
+    async def fetch_index(self):
+        return SimpleNamespace(reverse_index={"307": {"url": "C101307.html", "category": "高三"}})
+    monkeypatch.setattr(TNFSHTimetableCore, "fetch_index", fetch_index)
+    monkeypatch.setitem(prebuilt_cache, "307", None)
+
+    assert asyncio.run(preload_from_snapshot(snapshot, save=False)) == 1
+    soup = BeautifulSoup(page_cache.content(BASE_URL + "C101307.html"), "html.parser")
+    expected = asyncio.run(TimeTable.from_parsed("307", parse_html(soup)))
+    assert prebuilt_cache["307"] == expected
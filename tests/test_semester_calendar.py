@@ -0,0 +1,37 @@
+from datetime import date, datetime, timedelta
+
+from tnfsh_class_table.backend import TNFSHClassTable
+from tnfsh_class_table.new_backend.semester import semester_calendar
+
+
+def test_semester_calendar_matches_window_and_date_lookup(snapshot):
+    """重複週數與原本的日期計算相同，依日期查詢得到當天星期的課程"""
+    day = datetime(2025, 8, 1, 10, 30)
+    while day < datetime(2027, 8, 1):
+        monday = day - timedelta(days=day.weekday())
+        end = datetime(day.year + 1, 2, 1) if day.month >= 8 else datetime(day.year, 7, 1)
+        assert TNFSHClassTable.semester_window(day) == (monday, end, (end - monday).days // 7 + 1)
+        day += timedelta(days=1)
+
+    calendar = semester_calendar(date(2025, 9, 3))
+    assert calendar is semester_calendar(datetime(2025, 12, 31, 23, 59))
+    assert calendar.slot(date(2025, 9, 3))[1] == 2
+    assert calendar.slot(date(2025, 9, 6)) is None
+
+    table = TNFSHClassTable.from_cached("307", snapshot)
+    lessons = table.lessons_on(date(2025, 9, 3))
+    assert [subject for _, subject, _, _ in lessons] == [table.grid.course(period, 2)[0] for period in range(table.grid.periods)]
+    assert lessons[0][2] == datetime(2025, 9, 3, 8, 0)
+    assert table.lessons_on(date(2025, 9, 6)) == []
+
+
+def test_weeks_when_semester_ends_on_monday():
+    """學期結束日 2027/2/1 是星期一，結束日所在的那一週不算在內，與查詢的時刻無關"""
+    calendar = semester_calendar(date(2026, 9, 1))
+    assert calendar.end == date(2027, 2, 1) and calendar.end.weekday() == 0
+    assert calendar.first_monday == date(2026, 7, 27)
+    assert calendar.weeks == 27 and calendar.dates[-1] == date(2027, 1, 29)
+    assert calendar.weeks_from(date(2027, 1, 25)) == 1
+    # 12/28 起算：12/28、1/4、1/11、1/18、1/25 共 5 週
+    assert TNFSHClassTable.semester_window(datetime(2026, 12, 28))[2] == 5
+    assert TNFSHClassTable.semester_window(datetime(2026, 12, 30, 10, 30))[2] == 5
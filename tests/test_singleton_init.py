@@ -0,0 +1,60 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import requests
+
+from tnfsh_class_table.backend import NewWikiTeacherIndex, TNFSHClassTableIndex
+
+from test_wiki_crawler import wiki_site
+
+THREADS = 16
+
+
+class _Server:
+    """記錄每個網址被請求的次數，回應前稍微延遲讓所有執行緒同時進入初始化"""
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        with self._lock:
+            self.calls[url] += 1
+        time.sleep(0.05)
+        content = self.pages["class" if url.endswith("_ClassIndex.html") else "teacher"]
+        return SimpleNamespace(content=content.encode("utf-8"), raise_for_status=lambda: None)
+
+
+def _first_calls(factory):
+    barrier = threading.Barrier(THREADS)
+
+    def call():
+        barrier.wait()
+        return factory()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        return list(executor.map(lambda _: call(), range(THREADS)))
+
+
+def test_concurrent_first_calls_fetch_index_once(tmp_path, monkeypatch, wiki_site, index_pages):
+    """同時第一次取得索引時只抓取一次，所有呼叫者拿到同一個已初始化的實例"""
+    server = _Server(index_pages)
+    monkeypatch.setattr(requests, "get", server.get)
+    monkeypatch.setattr(TNFSHClassTableIndex, "_instance", None)
+    monkeypatch.setattr(TNFSHClassTableIndex, "_initialized", False)
+    monkeypatch.setattr(TNFSHClassTableIndex, "persist_path", str(tmp_path / "index.json"))
+
+    indexes = _first_calls(TNFSHClassTableIndex.get_instance)
+    assert len({id(index) for index in indexes}) == 1
+    assert all("307" in index.reverse_index for index in indexes)
+
+    wikis = _first_calls(NewWikiTeacherIndex)
+    assert len({id(wiki) for wiki in wikis}) == 1
+    assert all("王小明" in wiki.reverse_index for wiki in wikis)
+
+    # 兩個課表索引頁面、一個科目頁面與兩個科目的教師頁面，各只請求一次
+    assert len(server.calls) == 2 and set(server.calls.values()) == {1}
+    assert len(wiki_site.calls) == 3 and set(wiki_site.calls.values()) == {1}
@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from tnfsh_class_table.backend import TNFSHClassTable, TNFSHClassTableIndex
+from tnfsh_class_table.new_backend.cache import TieredPageCache
+from tnfsh_class_table.new_backend.crawler import BASE_URL
+from tnfsh_class_table.new_backend.snapshot import TimetableSnapshot, refresh_snapshot
+
+GOLDEN = Path(__file__).resolve().parent / "golden" / "班級課表.json"
+
+
+def test_snapshot_round_trip(tmp_path, page_cache):
+    """快照以 mmap 開啟後，課表、節次時間、索引與 ETag 都與原資料相同"""
+    golden = json.loads(GOLDEN.read_text(encoding="utf-8"))
+    path = TimetableSnapshot.write_from_page_cache(page_cache, tmp_path / "timetables.snapshot")
+    assert [p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")] == []
+
+    snapshot = TimetableSnapshot.open(path)
+    assert snapshot.targets() == ["307"] and "308" not in snapshot
+    assert snapshot.index() == page_cache.load_index()
+
+    parsed = snapshot.lookup("307")
+    assert parsed.grid.to_nested() == golden["table"]
+    assert parsed.grid.transpose().to_nested() == [list(row) for row in zip(*golden["table"])]
+    assert parsed.lessons == golden["lessons"]
+    assert parsed.last_update == golden["last_update"]
+    assert snapshot.parsed(BASE_URL + "C101307.html").grid.course(0, 0) == ("體育", {"潘帝仁": "TK07.HTML"})
+    assert snapshot.record(BASE_URL + "C101307.html").etag == '"v1"'
+
+
+def test_open_rejects_missing_or_corrupt_snapshot(tmp_path):
+    """快照不存在或內容損毀時回傳 None，呼叫端改走原本的抓取流程"""
+    assert TimetableSnapshot.open(tmp_path / "missing.snapshot") is None
+    corrupt = tmp_path / "corrupt.snapshot"
+    corrupt.write_bytes(b"not a snapshot" * 10)
+    assert TimetableSnapshot.open(corrupt) is None
+
+
+@pytest.mark.asyncio
+async def test_refreshed_snapshot_etag_reaches_revalidate(tmp_path, snapshot, timetable_site):
+    """重新抓取產生的快照保留 ETag，由快照載入的課表重新驗證時伺服器回應 304"""
+    refreshed = await refresh_snapshot(
+        tmp_path / "refreshed.snapshot", TieredPageCache(tmp_path / "refreshed"),
+        base_url=timetable_site.base_url, delay=0.001,
+    )
+    assert refreshed.record(timetable_site.base_url + "C101307.html").etag == '"v1"'
+
+    TNFSHClassTableIndex.from_index(refreshed.index())
+    table = TNFSHClassTable.from_cached("307", refreshed)
+    assert table.revalidate() is None
+    assert timetable_site.headers["C101307.html"][-1]["If-None-Match"] == '"v1"'
+    assert timetable_site.hits["C101307.html"] == 2
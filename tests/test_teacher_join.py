@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+from tnfsh_class_table.backend import EventDescriptionCache
+from tnfsh_class_table.new_backend.teachers import TeacherJoinRegistry
+
+URL = "http://w3.tnfsh.tn.edu.tw/deanofstudies/course/C101307.html"
+OFFICIAL = {
+    "國文": {"王小明": "TA01.html", "吳銘": "TA02.html", "陳大文": "TA03.html", "張三": "TX01.html"},
+    "數學": {"林某": "TB01.html"},
+}
+WIKI = {
+    "王小明": {"url": "/王小明", "category": "國文科"},
+    "朱蒙": {"url": "/朱蒙", "category": "國文科"},
+    "陳大文老師": {"url": "/陳大文老師", "category": "國文科"},
+    "林某": {"url": "/林某", "category": "國文科"},
+}
+
+
+def test_join_maps_official_teachers_to_wiki_once():
+    """對照表每個索引版本只建立一次，別名與部分比對都對應到 Wiki 頁面"""
+    registry = TeacherJoinRegistry()
+    join = registry.get(OFFICIAL, WIKI, 1)
+    assert registry.get(OFFICIAL, WIKI, 1) is join
+    assert registry.get(OFFICIAL, WIKI, 2) is not join and registry.builds == 2
+
+    assert join.get("朱蒙") is join.get("吳銘")
+    assert join.get("吳銘").wiki_url == "https://tnfshwiki.tfcis.org/朱蒙"
+    assert join.get("陳大文").wiki_links == (("https://tnfshwiki.tfcis.org/陳大文老師", "陳大文老師"),)
+    assert join.get("張三").wiki_category is None
+    assert join.wiki_links("小明") == (("https://tnfshwiki.tfcis.org/王小明", "王小明"),)
+
+    assert join.substitutes("王小明", "official_website") == {"吳銘": "TA02.html", "陳大文": "TA03.html"}
+    assert join.substitutes("朱蒙", "wiki") == {"王小明": "TA01.html", "陳大文": "TA03.html", "林某": "TB01.html"}
+    assert join.substitutes("張三", "wiki") == {}
+
+
+def test_event_descriptions_read_wiki_links_from_join():
+    """行事曆描述的竹園 Wiki 連結來自對照表，包含別名"""
+    cache = EventDescriptionCache(
+        wiki_index=SimpleNamespace(version=1, reverse_index=WIKI),
+        official_index=SimpleNamespace(index={"teacher": {"data": OFFICIAL}}),
+    )
+    description = cache.get("class", "307", URL, {"吳銘": "TA02.html"})
+    assert 'href="https://tnfshwiki.tfcis.org/朱蒙">朱蒙-wiki' in description
+    assert cache.version("class")[0] == cache._join().version
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from tnfsh_class_table.backend import TNFSHClassTable, TimetableExtractor
+
+PAGE = Path(__file__).resolve().parent.parent / "assests" / "班級課表.html"
+
+
+def _legacy_parse(content: bytes):
+    """原本多階段 BeautifulSoup 解析的結果"""
+    table = object.__new__(TNFSHClassTable)
+    table.soup = BeautifulSoup(content, 'html.parser')
+    table.soup_table = table._get_soup_table()
+    table.regular_soup_table = table._get_regular_soup_table()
+    return table._get_lesson(), table._get_table(), table._get_last_update()
+
+
+def test_extractor_matches_legacy_pipeline():
+    """單次走訪的結果應與原本的解析流程完全相同"""
+    content = PAGE.read_bytes()
+    lessons, table, last_update = TimetableExtractor.extract(content)
+
+    assert (lessons, table, last_update) == _legacy_parse(content)
+    assert last_update == "2025/02/03 18:59:34"
+    assert lessons["第一節"] == ["08:00", "08:50"]
+    assert len(table) == 8 and all(len(row) == 5 for row in table)
+    assert table[0][0] == {"體育": {"潘帝仁": "TK07.HTML"}}
+
+
+def test_extractor_handles_unusual_markup():
+    """註解、未關閉標籤與 border 欄位的處理應與 BeautifulSoup 一致"""
+    content = PAGE.read_bytes().decode("utf-16")
+    content = content.replace("<span", "<!-- x --> <span", 5).replace("</p>", "", 3)
+    content = content.replace('TK07.HTML">', 'TK07.HTML">A B</a><a href="X">C', 1)
+    content = content.encode("utf-8")
+
+    assert TimetableExtractor.extract(content, "html.parser") == _legacy_parse(content)
+
+
+def test_extractor_without_table():
+    lessons, table, last_update = TimetableExtractor.extract(b"<html><body><p>hi</p></body></html>")
+    assert lessons == {}
+    assert table == []
+    assert last_update == "No update date found."
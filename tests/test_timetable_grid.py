@@ -0,0 +1,34 @@
+import json
+from pathlib import Path
+
+from tnfsh_class_table.backend import TimetableGrid
+
+GOLDEN = Path(__file__).resolve().parent / "golden" / "班級課表.json"
+
+
+def _golden_table():
+    return json.loads(GOLDEN.read_text(encoding="utf-8"))["table"]
+
+
+def test_grid_round_trip():
+    """精簡課表轉回巢狀格式應與原本完全相同"""
+    table = _golden_table()
+    grid = TimetableGrid.from_nested(table)
+
+    assert grid.shape == (8, 5)
+    assert grid.to_nested() == table
+    assert grid.transpose().to_nested() == [list(row) for row in zip(*table)]
+    assert grid.course(0, 0) == ("體育", {"潘帝仁": "TK07.HTML"})
+
+
+def test_grid_views_share_storage():
+    """列、欄與轉置檢視都不複製陣列，相同字串只存一份"""
+    table = _golden_table()
+    grid = TimetableGrid.from_nested(table)
+    transposed = grid.transpose()
+
+    assert transposed.cells is grid.cells
+    assert transposed.shape == (5, 8)
+    assert list(transposed.row(2)) == list(grid.column(2))
+    assert list(grid.row(3)) == list(transposed.column(3))
+    assert TimetableGrid.from_nested(table).cells == grid.cells
@@ -0,0 +1,117 @@
+import hashlib
+import http.server
+import threading
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pytest
+
+from tnfsh_class_table.backend import NewWikiTeacherIndex
+
+SUBJECTS = '<div class="mw-category"></div><div class="mw-category"><a href="/%E5%9C%8B%E6%96%87%E7%A7%91">國文科</a><a href="/%E6%95%B8%E5%AD%B8%E7%A7%91">數學科</a></div>'
+
+
+def _teachers(*names):
+    links = "".join(f'<a href="/{name}">{name}</a>' for name in names)
+    return f'<div class="mw-category">{links}</div>'
+
+
+class _Wiki(http.server.BaseHTTPRequestHandler):
+    """模擬竹園 Wiki 的分類頁面，支援 ETag 條件請求，記錄每個頁面的請求次數與連線數"""
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        title = parse_qs(url.query)["title"][0] if url.query else unquote(url.path[1:])
+        with self.server.lock:
+            self.server.calls[title] = self.server.calls.get(title, 0) + 1
+        body = self.server.pages.get(title)
+        if body is None:
+            return self._send(404, b"")
+        body = body.encode("utf-8")
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.server.not_modified += 1
+            return self._send(304, b"", etag)
+        self._send(200, body, etag)
+
+    def _send(self, status: int, body: bytes, etag: str = "") -> None:
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def wiki_site(monkeypatch):
+    """本機的竹園 Wiki，並讓 NewWikiTeacherIndex 改用它建立新的單例"""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Wiki)
+    server.lock = threading.Lock()
+    server.calls = {}
+    server.connections = 0
+    server.not_modified = 0
+    server.pages = {
+        "分類:科目": SUBJECTS,
+        "分類:國文科老師": _teachers("王小明", "李大華"),
+        "分類:數學科老師": _teachers("陳大文"),
+    }
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(NewWikiTeacherIndex, "base_url", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(NewWikiTeacherIndex, "_instance", None)
+    monkeypatch.setattr(NewWikiTeacherIndex, "_initialized", False)
+    yield server
+    NewWikiTeacherIndex.crawler().close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_refresh_reparses_only_changed_subjects(wiki_site):
+    """重新載入時以條件請求確認，只有改變的科目重新解析，索引一次替換，連線重複使用"""
+    index = NewWikiTeacherIndex()
+    assert index.version == 1
+    assert index.reverse_index["陳大文"] == {"url": "/陳大文", "category": "數學科"}
+    assert not NewWikiTeacherIndex.last_crawl.incremental
+
+    result = index.refresh()
+    assert result.incremental and result.changed == [] and result.not_modified == 3
+    assert index.version == 1  # 內容沒有改變，不使依賴索引的快取失效
+
+    before = index.index
+    wiki_site.pages["分類:數學科老師"] = _teachers("陳大文", "林某")
+    result = index.refresh()
+    assert result.changed == ["數學科"] and result.not_modified == 2
+    assert index.version == 2 and index.reverse_index["林某"]["category"] == "數學科"
+    assert index.index is not before and before["數學科"]["teachers"] == {"陳大文": "/陳大文"}
+    assert index.index["國文科"]["teachers"] == before["國文科"]["teachers"]
+
+    # 科目列表暫時無法取得時沿用目前的索引
+    del wiki_site.pages["分類:科目"]
+    index.refresh()
+    assert index.version == 2 and "林某" in index.reverse_index
+
+    stats = index.stats()
+    assert stats["full_refresh_duration"] is not None and stats["incremental_refresh_duration"] is not None
+    assert wiki_site.connections <= NewWikiTeacherIndex.crawler().concurrency
+
+
+def test_first_crawl_failure_is_retried(wiki_site):
+    """第一次抓取時科目列表無法取得，不發布空的索引，下一個呼叫者重新抓取"""
+    subjects = wiki_site.pages.pop("分類:科目")
+    NewWikiTeacherIndex.crawler().retries = 0
+    index = NewWikiTeacherIndex.get_instance()
+    assert index.version == 0 and not NewWikiTeacherIndex._initialized
+    assert "分類:科目" in NewWikiTeacherIndex.last_crawl.errors
+
+    wiki_site.pages["分類:科目"] = subjects
+    index = NewWikiTeacherIndex.get_instance()
+    assert NewWikiTeacherIndex._initialized
+    assert index.version == 1 and index.reverse_index["王小明"]["category"] == "國文科"
@@ -54,7 +54,7 @@ class AIAssistant:
         from tnfsh_class_table.ai_tools.timetable.timetable import get_table
         from tnfsh_class_table.ai_tools.timetable.specific_course import get_specific_course
         from tnfsh_class_table.ai_tools.timetable.timetable_link import get_timetable_link
-        from tnfsh_class_table.ai_tools.timetable.lesson import get_lesson
+        from tnfsh_class_table.ai_tools.timetable.lesson import get_lesson, get_lessons_on_date, get_next_lesson
         from tnfsh_class_table.ai_tools.timetable.wrapper_func.final_solution import final_solution
 
         from tnfsh_class_table.ai_tools.wiki.wiki_link import get_wiki_link
@@ -81,6 +81,8 @@ class AIAssistant:
             get_specific_course,
             get_timetable_link,
             get_lesson,
+            get_next_lesson,
+            get_lessons_on_date,
             final_solution,
 
             # wiki
@@ -1,8 +1,10 @@
 """快取相關功能"""
 from typing import Dict, List, Tuple, Any, Optional
+import threading
 import time
 from dataclasses import dataclass
-from tnfsh_timetable_core.scheduling.models import CourseNode
+from tnfsh_class_table.backend import DataGeneration, data_generations
+from tnfsh_class_table.model.node import CourseNode
 
 @dataclass
 class CacheKey:
@@ -12,54 +14,107 @@ class CacheKey:
     period: int
     func_name: str
     params: tuple  # rotation 和 swap 用 (teacher_involved,)，substitute 用 (source,)
+    generation: int = 0  # 計算結果所依據的資料世代，請求開始時由 data_generations.current() 取得
 
     def __hash__(self):
-        return hash((self.teacher_name, self.weekday, self.period, self.func_name, self.params))
+        return hash((self.teacher_name, self.weekday, self.period, self.func_name, self.params, self.generation))
 
 class SchedulingCache:
     """排課相關功能的快取
     使用 LRU (Least Recently Used) 策略管理快取
+    鍵包含資料世代，資料更新後新請求自然不會命中舊結果，不需要在請求進行中清除快取
     """
     def __init__(self, max_size: int = 100, ttl: int = 36000):
         self._cache: Dict[CacheKey, Tuple[Any, float]] = {}  # (value, timestamp)
         self._max_size = max_size
         self._ttl = ttl  # Time To Live in seconds
+        self._lock = threading.Lock()
 
     def get(self, key: CacheKey) -> Optional[Any]:
         """獲取快取的值"""
-        if key not in self._cache:
-            return None
-        
-        value, timestamp = self._cache[key]
-        if time.time() - timestamp > self._ttl:
-            # 超過 TTL，刪除快取
-            del self._cache[key]
-            return None
-
-        # 更新使用時間
-        self._cache[key] = (value, time.time())
-        return value
+        with self._lock:
+            if key not in self._cache:
+                return None
+
+            value, timestamp = self._cache[key]
+            if time.time() - timestamp > self._ttl:
+                # 超過 TTL，刪除快取
+                del self._cache[key]
+                return None
+
+            # 更新使用時間
+            self._cache[key] = (value, time.time())
+            return value
 
     def set(self, key: CacheKey, value: Any):
         """設置快取的值"""
-        # 如果快取已滿，移除最舊的項目
-        if len(self._cache) >= self._max_size:
-            oldest_key = min(self._cache.items(), key=lambda x: x[1][1])[0]
-            del self._cache[oldest_key]
-        
-        self._cache[key] = (value, time.time())
+        with self._lock:
+            # 如果快取已滿，移除最舊的項目
+            if key not in self._cache and len(self._cache) >= self._max_size:
+                oldest_key = min(self._cache.items(), key=lambda x: x[1][1])[0]
+                del self._cache[oldest_key]
+
+            self._cache[key] = (value, time.time())
 
     def invalidate(self, teacher_name: str, weekday: int, period: int):
-        """當課表發生變化時，清除相關的快取"""
-        keys_to_remove = []
-        for key in self._cache:
-            if (key.teacher_name == teacher_name and 
-                key.weekday == weekday and 
-                key.period == period):
-                keys_to_remove.append(key)
-        
-        for key in keys_to_remove:
-            del self._cache[key]
+        """當課表發生變化時，清除相關的快取（所有世代）"""
+        with self._lock:
+            keys_to_remove = []
+            for key in self._cache:
+                if (key.teacher_name == teacher_name and
+                    key.weekday == weekday and
+                    key.period == period):
+                    keys_to_remove.append(key)
+
+            for key in keys_to_remove:
+                del self._cache[key]
+
+    def prune(self, generation: Optional[DataGeneration] = None) -> int:
+        """移除比指定世代（預設為目前的世代）更舊的結果，回傳移除的數量"""
+        number = (generation or data_generations.current()).number
+        with self._lock:
+            keys_to_remove = [key for key in self._cache if key.generation < number]
+            for key in keys_to_remove:
+                del self._cache[key]
+            return len(keys_to_remove)
 
 # 全域快取實例
 scheduling_cache = SchedulingCache()
+
+
+async def preload_from_snapshot(snapshot: Any, save: bool = True) -> int:
+    """以課表快照填入 tnfsh_timetable_core 的課表快取，不需要再抓取一次整個網站
+
+    快照中的課表、節次時間與更新時間和 tnfsh_timetable_core 解析同一個網頁的結果相同，
+    直接交給 TimeTable.from_parsed 建立排課使用的課表。
+
+    Args:
+        snapshot (TimetableSnapshot): 已開啟的課表快照
+        save (bool): 是否同時寫入 tnfsh_timetable_core 的磁碟快取
+
+    Returns:
+        int: 載入的課表數
+    """
+    from tnfsh_timetable_core.timetable.cache import prebuilt_cache, save_to_disk
+    from tnfsh_timetable_core.timetable.models import TimeTable
+
+    loaded = 0
+    for target in snapshot.targets():
+        parsed = snapshot.lookup(target)
+        if parsed is None:
+            continue
+        raw = {
+            "last_update": parsed.last_update,
+            "periods": {name: tuple(times) for name, times in parsed.lessons.items()},
+            "table": parsed.grid.to_nested(),
+        }
+        try:
+            table = await TimeTable.from_parsed(target, raw)
+        except (KeyError, ValueError) as e:  # tnfsh_timetable_core 的索引中沒有此課表
+            print(f"無法載入 {target} 的排課課表: {e}")
+            continue
+        prebuilt_cache[target] = table
+        if save:
+            save_to_disk(target, table)
+        loaded += 1
+    return loaded
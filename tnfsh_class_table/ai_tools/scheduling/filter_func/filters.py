@@ -1,6 +1,6 @@
 """輪調和對調專用過濾器"""
 from .base import FirstCandidateCourseFilter, FirstCandidateCourseFilters, PathFilter, PathFilters
-from tnfsh_timetable_core.scheduling.models import CourseNode
+from tnfsh_class_table.model.node import CourseNode
 from typing import List
 
 
@@ -29,12 +29,12 @@ class RotationFirstCandidateFilter(FirstCandidateCourseFilter):
             from tnfsh_timetable_core import TNFSHTimetableCore
             core = TNFSHTimetableCore()
             scheduling = await core.fetch_scheduling()
-            self.source_node = await scheduling.fetch_course_node(
+            self.source_node = CourseNode.from_core(await scheduling.fetch_course_node(
                 self.src_teacher,
                 self.weekday,
                 self.period,
                 ignore_condition=True
-            )
+            ))
 
     def _check_condition(self, node: 'CourseNode') -> bool:
         """檢查節點是否符合過濾條件"""
@@ -58,7 +58,7 @@ class RotationFirstCandidateFilter(FirstCandidateCourseFilter):
 
         # 檢查目標教師
         if self.filters.destination_teacher:
-            teacher_id = list(node.teachers.keys())[0] if node.teachers else None
+            teacher_id = node.teacher
             if teacher_id != self.filters.destination_teacher:
                 from tnfsh_timetable_core import TNFSHTimetableCore
                 core = TNFSHTimetableCore()
@@ -115,12 +115,12 @@ class SwapFirstCandidateFilter(FirstCandidateCourseFilter):
             from tnfsh_timetable_core import TNFSHTimetableCore
             core = TNFSHTimetableCore()
             scheduling = await core.fetch_scheduling()
-            self.source_node = await scheduling.fetch_course_node(
+            self.source_node = CourseNode.from_core(await scheduling.fetch_course_node(
                 self.src_teacher,
                 self.weekday,
                 self.period,
                 ignore_condition=True
-            )
+            ))
 
     def _check_condition(self, node: 'CourseNode') -> bool:
         """檢查節點是否符合過濾條件"""
@@ -144,7 +144,7 @@ class SwapFirstCandidateFilter(FirstCandidateCourseFilter):
 
         # 檢查目標教師
         if self.filters.destination_teacher:
-            teacher_id = list(node.teachers.keys())[0] if node.teachers else None
+            teacher_id = node.teacher
             if teacher_id != self.filters.destination_teacher:
                 from tnfsh_timetable_core import TNFSHTimetableCore
                 core = TNFSHTimetableCore()
@@ -198,9 +198,7 @@ class TeacherPathFilter(PathFilter):
 
     def _get_teacher_id(self, node: CourseNode) -> str:
         """取得節點的教師 ID"""
-        if not node.teachers:
-            return None
-        return list(node.teachers.keys())[0]
+        return node.teacher
 
     def _check_condition(self, node: CourseNode) -> bool:
         """檢查節點是否符合教師過濾條件"""
@@ -5,6 +5,7 @@ from pydantic import BaseModel
 from math import ceil
 from typing import Literal
 from tnfsh_class_table.utils.log_func import log_func
+from tnfsh_class_table.model.node import CourseNode
 from tnfsh_timetable_core import TNFSHTimetableCore
 core = TNFSHTimetableCore()
 logger = core.get_logger()
@@ -19,13 +20,13 @@ class RotationStep(BaseModel):
     teacher_url_dict: dict[str, str] = {}
 
     @classmethod
-    async def create(cls, node1, node2, index: int):
+    async def create(cls, node1: CourseNode, node2: CourseNode, index: int):
         """建立 RotationStep 實例的工廠方法"""
         # 取得節點資訊
-        teacher1 = ','.join(t.teacher_name for t in node1.teachers.values())
-        class1 = ','.join(c.class_code for c in node1.classes.values())
-        teacher2 = ','.join(t.teacher_name for t in node2.teachers.values())
-        class2 = ','.join(c.class_code for c in node2.classes.values())
+        teacher1 = ','.join(node1.teachers)
+        class1 = ','.join(node1.classes)
+        teacher2 = ','.join(node2.teachers)
+        class2 = ','.join(node2.classes)
 
         # 設定主要指令
         if enable_subject_and_class_in_main_instruction:
@@ -75,13 +76,13 @@ class SwapStep(RotationStep):
     """交換步驟的資料模型，繼承自 RotationStep"""
     
     @classmethod
-    async def create(cls, node1, node2, index: int):
+    async def create(cls, node1: CourseNode, node2: CourseNode, index: int):
         """建立 SwapStep 實例的工廠方法"""
         # 取得節點資訊
-        teacher1 = ','.join(t.teacher_name for t in node1.teachers.values())
-        class1 = ','.join(c.class_code for c in node1.classes.values())
-        teacher2 = ','.join(t.teacher_name for t in node2.teachers.values())
-        class2 = ','.join(c.class_code for c in node2.classes.values())
+        teacher1 = ','.join(node1.teachers)
+        class1 = ','.join(node1.classes)
+        teacher2 = ','.join(node2.teachers)
+        class2 = ','.join(node2.classes)
 
         if enable_subject_and_class_in_main_instruction:
                 
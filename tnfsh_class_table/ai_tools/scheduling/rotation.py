@@ -5,9 +5,10 @@ from math import ceil
 from click import option
 from pydantic import BaseModel
 
-from tnfsh_timetable_core.scheduling.models import CourseNode
+from tnfsh_class_table.model.node import CourseNode
 from tnfsh_class_table.ai_tools.scheduling.filter_func.filters import RotationFirstCandidateFilter, TeacherPathFilter
 from tnfsh_class_table.ai_tools.scheduling.cache import scheduling_cache, CacheKey
+from tnfsh_class_table.backend import data_generations
 
 from tnfsh_timetable_core import TNFSHTimetableCore
 
@@ -47,6 +48,9 @@ async def async_rotation(
     logger.info(f"[Rotation] 開始輪調課程：教師={source_teacher}, 星期={weekday}, 節次={period}, 最大深度={teacher_involved}, 頁碼={page}")
     logger.info(f"[Rotation] 過濾條件: {filter_params}")
 
+    # 整個請求使用同一個資料世代，背景更新切換世代時不影響進行中的請求
+    generation = data_generations.current()
+
     scheduling = await core.fetch_scheduling()
     try:
         src_course_node = await scheduling.fetch_course_node(
@@ -66,7 +70,8 @@ async def async_rotation(
         weekday=src_course_node.time.weekday,
         period=src_course_node.time.period,
         func_name="rotation",
-        params=(teacher_involved,)
+        params=(teacher_involved,),
+        generation=generation.number
     )
     
     options = scheduling_cache.get(cache_key)
@@ -79,7 +84,8 @@ async def async_rotation(
             period=src_course_node.time.period,
             max_depth=teacher_involved
         )
-        options = list(options)  # 確保是列表格式
+        # 轉為精簡節點再快取，不保留整張排課圖的參照
+        options = CourseNode.paths_from_core(options)
         scheduling_cache.set(cache_key, options)
         logger.debug("排課結果已快取")
     else:
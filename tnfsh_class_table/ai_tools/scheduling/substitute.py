@@ -2,6 +2,7 @@
 from __future__ import annotations
 from typing import Literal, TYPE_CHECKING
 from math import ceil
+import asyncio
 
 from tnfsh_timetable_core import TNFSHTimetableCore
 core = TNFSHTimetableCore()
@@ -9,6 +10,7 @@ logger = core.get_logger()
 
 from tnfsh_class_table.ai_tools.scheduling.models import CourseInfoWithTime, StreakTime, random_seed, PaginatedSubstituteResult
 from tnfsh_class_table.ai_tools.scheduling.cache import scheduling_cache, CacheKey
+from tnfsh_class_table.backend import data_generations, teacher_join
 
 async def async_substitute(
         source_teacher:str, 
@@ -23,6 +25,8 @@ async def async_substitute(
     """
     # logger: start
     logger.info(f"[Substitute] 開始尋找代課教師：{source_teacher}, 星期={weekday}, 節次={period}, 模式={source}, 頁碼={page}")
+    # 整個請求使用同一個資料世代，背景更新切換世代時不影響進行中的請求
+    generation = data_generations.current()
     try:
         # 驗證基本參數
         if not isinstance(weekday, int) or not 1 <= weekday <= 5:
@@ -62,7 +66,8 @@ async def async_substitute(
             weekday=weekday,
             period=period,
             func_name="substitute",
-            params=(source,)
+            params=(source,),
+            generation=generation.number
         )
         
         cached_result = scheduling_cache.get(cache_key)
@@ -71,80 +76,35 @@ async def async_substitute(
             free_substitute_teachers, src_teacher_category = cached_result
             logger.debug("使用快取的代課教師列表")
         else:
-            if source == 'official_website':
-                # ... official_website 處理邏輯 ...
-                forward_wiki_index = await core.fetch_index()
-                reversed_wiki_index = forward_wiki_index.reverse_index
-                teacher_info = reversed_wiki_index.get(source_teacher)
-                
-                if not teacher_info:
-                    logger.warning(f"在官網找不到教師：{source_teacher}")
-                    return PaginatedSubstituteResult(
-                        target=source_teacher,
-                        mode=source,
-                        teacher_category="unknown",
-                        weekday=weekday,
-                        period=period,
-                        streak=1,
-                        source_course=CourseInfoWithTime(
-                            subject="unknown",
-                            time=StreakTime(weekday=weekday, period=period, streak=1)
-                        ),
-                        current_page=1,
-                        total_pages=0,
-                        options={}
-                    )
-
-                src_teacher_category = teacher_info.category
-                src_teacher_url = teacher_info.url
-                if not src_teacher_category or not src_teacher_url:
-                    logger.warning(f"教師 {source_teacher} 缺少必要資訊")
-                    return PaginatedSubstituteResult(
-                        target=source_teacher,
-                        mode=source,
-                        teacher_category="unknown",
-                        weekday=weekday,
-                        period=period,
-                        streak=1,
-                        source_course=src_course_info_with_time,
-                        current_page=1,
-                        total_pages=0,
-                        options={}
-                    )
-
-                # 取得官網的代課教師列表
-                src_teacher_prefix = src_teacher_url[1]
-                index_index = forward_wiki_index.index
-                candidate_teachers = index_index.teacher.data.get(src_teacher_category, {})
-                substitute_teachers = {}
-                for teacher, url in candidate_teachers.items():
-                    if teacher == source_teacher:
-                        continue
-                    if url[1] == src_teacher_prefix:
-                        substitute_teachers[teacher] = url
+            if source not in ('official_website', 'wiki'):
+                logger.error(f"❌ 無效的資料來源：{source}")
+                raise ValueError(f"無效的資料來源：{source}")
 
-            elif source == 'wiki':
-                # ... wiki 處理邏輯 ...
-                from tnfsh_wiki_teachers_core import TNFSHWikiTeachersCore
-                wiki_core = TNFSHWikiTeachersCore()
-                wiki_index = await wiki_core.fetch_index()
-                forward_wiki_index = wiki_index.index
-                reversed_wiki_index = wiki_index.reverse_index
-                
-                teacher_info = reversed_wiki_index.get(source_teacher)
-                if not teacher_info:
-                    logger.warning(f"在 Wiki 中找不到教師：{source_teacher}")
-                    return PaginatedSubstituteResult(
-                        target=source_teacher,
-                        mode=source,
-                        teacher_category="unknown",
-                        source_course=src_course_info_with_time,
-                        current_page=1,
-                        total_pages=0,
-                        options={}
-                    )
+            # 官網與 Wiki 的教師對照表每個索引版本只建立一次，第一次可能需要下載索引
+            join = await asyncio.to_thread(teacher_join)
+            record = join.get(source_teacher)
+            if record is None:
+                logger.warning(f"在官網找不到教師：{source_teacher}")
+                return PaginatedSubstituteResult(
+                    target=source_teacher,
+                    mode=source,
+                    teacher_category="unknown",
+                    weekday=weekday,
+                    period=period,
+                    streak=1,
+                    source_course=CourseInfoWithTime(
+                        subject="unknown",
+                        time=StreakTime(weekday=weekday, period=period, streak=1)
+                    ),
+                    current_page=1,
+                    total_pages=0,
+                    options={}
+                )
 
-                src_teacher_category = teacher_info.category
+            if source == 'official_website':
+                src_teacher_category = record.official_category
+            else:
+                src_teacher_category = record.wiki_category
                 if not src_teacher_category:
                     logger.warning(f"教師 {source_teacher} 在 Wiki 中缺少類別資訊")
                     return PaginatedSubstituteResult(
@@ -159,28 +119,10 @@ async def async_substitute(
                         total_pages=0,
                         options={}
                     )
-                    
                 logger.debug(f"📚 找到教師類別：{src_teacher_category}")
-                candidate_teachers = forward_wiki_index.get(src_teacher_category, {}).teachers
-                substitute_teachers = {}
-                for teacher, wiki_url in candidate_teachers.items():
-                    if teacher == source_teacher:
-                        continue
-                    substitute_teachers[teacher] = wiki_url
-                
-                index = await core.fetch_index()
-                reversed_index = index.reverse_index
-                substitute_teachers = {
-                    teacher: 
-                    reversed_index.get(teacher, {}).url 
-                    for teacher in substitute_teachers.keys() 
-                    if reversed_wiki_index.get(teacher, None) is not None
-                    and reversed_index.get(teacher, None) is not None
-                }
 
-            else:
-                logger.error(f"❌ 無效的資料來源：{source}")
-                raise ValueError(f"無效的資料來源：{source}")
+            # 同科目的其他教師 {教師: 官網課表連結}
+            substitute_teachers = join.substitutes(record.name, source)
 
             base_url = "http://w3.tnfsh.tn.edu.tw/deanofstudies/course"   
 
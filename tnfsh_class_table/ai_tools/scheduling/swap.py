@@ -9,6 +9,8 @@ from tnfsh_timetable_core import TNFSHTimetableCore
 from tnfsh_class_table.ai_tools.scheduling.filter_func.filters import SwapFirstCandidateFilter, TeacherPathFilter
 from tnfsh_class_table.ai_tools.scheduling.filter_func.base import FilterParams
 from tnfsh_class_table.ai_tools.scheduling.cache import scheduling_cache, CacheKey
+from tnfsh_class_table.backend import data_generations
+from tnfsh_class_table.model.node import CourseNode
 
 core = TNFSHTimetableCore()
 logger = core.get_logger()
@@ -35,6 +37,9 @@ async def async_swap(
     logger.info(f"[Swap] 開始交換課程：教師={source_teacher}, 星期={weekday}, 節次={period}, 最大深度={teacher_involved}, 頁碼={page}")
     logger.info(f"[Swap] 過濾條件: {filter_params}")
 
+    # 整個請求使用同一個資料世代，背景更新切換世代時不影響進行中的請求
+    generation = data_generations.current()
+
     # 獲取原課程節點
     scheduling = await core.fetch_scheduling()
     try:
@@ -55,7 +60,8 @@ async def async_swap(
         weekday=weekday,
         period=period,
         func_name="swap",
-        params=(teacher_involved,)
+        params=(teacher_involved,),
+        generation=generation.number
     )
     
     options = scheduling_cache.get(cache_key)
@@ -67,7 +73,8 @@ async def async_swap(
             period=period,
             max_depth=teacher_involved
         )
-        options = list(options)  # 確保是列表格式
+        # 轉為精簡節點再快取，不保留整張排課圖的參照
+        options = CourseNode.paths_from_core(options)
         scheduling_cache.set(cache_key, options)
         logger.debug("排課結果已快取")
     else:
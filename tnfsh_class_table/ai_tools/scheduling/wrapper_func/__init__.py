@@ -0,0 +1,9 @@
+def resolve_teacher_name(name: str | None) -> str | None:
+    """以課表索引的名稱索引修正不完整或打錯的教師名稱，無法唯一對應時原樣回傳"""
+    if not name:
+        return name
+    try:
+        from tnfsh_class_table.backend import TNFSHClassTableIndex
+        return TNFSHClassTableIndex.get_instance().resolve_target(name)
+    except Exception:
+        return name
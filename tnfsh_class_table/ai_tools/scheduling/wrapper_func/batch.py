@@ -75,6 +75,12 @@ def batch_process(
         FirstCandidateCourseFilters,
         PathFilters
     )
+    from tnfsh_class_table.ai_tools.scheduling.wrapper_func import resolve_teacher_name
+
+    # 先把不完整或打錯的教師名稱對應到課表上的名稱
+    source_teacher = resolve_teacher_name(source_teacher)
+    destination_teacher = resolve_teacher_name(destination_teacher)
+    exclude_teachers = [resolve_teacher_name(teacher) for teacher in exclude_teachers]
 
     # 如果是代課模式
     if mode == "substitute":
@@ -70,8 +70,13 @@ def rotation(
     """
     import asyncio
     from tnfsh_class_table.ai_tools.scheduling.rotation import async_rotation
+    from tnfsh_class_table.ai_tools.scheduling.wrapper_func import resolve_teacher_name
     from tnfsh_class_table.ai_tools.scheduling.filter_func.base import FilterParams, FirstCandidateCourseFilters, PathFilters
 
+    # 先把不完整或打錯的教師名稱對應到課表上的名稱
+    source_teacher = resolve_teacher_name(source_teacher)
+    destination_teacher = resolve_teacher_name(destination_teacher)
+    exclude_teachers = [resolve_teacher_name(teacher) for teacher in exclude_teachers]
 
     # 將 list 轉換成 set
     filter_params = FilterParams(
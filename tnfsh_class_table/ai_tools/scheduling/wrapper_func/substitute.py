@@ -33,6 +33,8 @@ def substitute(
     """
     import asyncio
     from tnfsh_class_table.ai_tools.scheduling.substitute import async_substitute
+    from tnfsh_class_table.ai_tools.scheduling.wrapper_func import resolve_teacher_name
+    source_teacher = resolve_teacher_name(source_teacher)
     result = asyncio.run(async_substitute(source_teacher, weekday, period, source, page))
     return result
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Union
 from tnfsh_class_table.utils.log_func import log_func
 
 
@@ -24,6 +24,87 @@ def get_lesson(target: str) -> Dict[str, List[str]]:
         >>> get_lesson("307")
         {"第一節": ["08:30", "09:30"], "第二節": ["09:30", "10:30"]......} # 代表第一節從08:30到09:30......s
     """
-    from tnfsh_class_table.backend import TNFSHClassTable
-    class_table = TNFSHClassTable(target)
-    return class_table.lessons
\ No newline at end of file
+    from tnfsh_class_table.backend import class_table_cache
+    class_table = class_table_cache.get(target)
+    return class_table.bell_schedule.as_dict()
+
+
+@log_func
+def get_next_lesson(target: str, now: str = "") -> Union[Dict[str, Union[str, int]], str]:
+    """
+    取得指定目標在某個時間的下一節課。
+
+    使用場景:
+        1. 使用者詢問「307下一節是什麼課」
+        2. 使用者詢問某老師接下來要上什麼課
+
+    Args:
+        target: 班級或老師名稱
+        now: 時間，格式為 "YYYY-mm-dd HH:MM"，預設為目前時間
+
+    Returns:
+        Dict[str, Union[str, int]]: 下一節的星期、節次、時間與課程名稱；當天已經沒有課時回傳說明文字
+
+    Example:
+        >>> get_next_lesson("307", "2025-03-31 10:05")
+        {"day": 1, "period": 3, "lesson": "第三節", "start": "10:10", "end": "11:00", "subject": "國文"}
+    """
+    from datetime import datetime
+    from tnfsh_class_table.backend import class_table_cache
+    moment = datetime.strptime(now, "%Y-%m-%d %H:%M") if now else datetime.now()
+    class_table = class_table_cache.get(target)
+    schedule = class_table.bell_schedule
+    grid = class_table.grid
+    day = moment.weekday()
+    if day >= grid.weekdays:
+        return "今天沒有課"
+    period = schedule.next_period(moment.time())
+    if period is None or period >= grid.periods:
+        return "今天已經沒有下一節課"
+    subject, _ = grid.course(period, day)
+    start, end = schedule.times[period]
+    return {
+        "day": day + 1,
+        "period": period + 1,
+        "lesson": schedule.names[period],
+        "start": start.strftime("%H:%M"),
+        "end": end.strftime("%H:%M"),
+        "subject": subject or "空堂",
+    }
+
+
+@log_func
+def get_lessons_on_date(target: str, day: str) -> Union[List[Dict[str, str]], str]:
+    """
+    取得指定目標在某一天的所有課程。
+
+    使用場景:
+        1. 使用者詢問「307明天有什麼課」、「某老師 4/1 要上哪些課」
+        2. 搭配 get_current_time 將「明天」等說法換算為日期
+
+    Args:
+        target: 班級或老師名稱
+        day: 日期，格式為 "YYYY-mm-dd"
+
+    Returns:
+        List[Dict[str, str]]: 依節次排列的節次名稱、時間與課程名稱；週末或不在學期內時回傳說明文字
+
+    Example:
+        >>> get_lessons_on_date("307", "2025-03-31")
+        [{"lesson": "第一節", "start": "08:00", "end": "08:50", "subject": "體育"}, ...]
+    """
+    from datetime import datetime
+    from tnfsh_class_table.backend import class_table_cache
+    class_table = class_table_cache.get(target)
+    lessons = class_table.lessons_on(datetime.strptime(day, "%Y-%m-%d").date())
+    if not lessons:
+        return f"{day} 沒有課"
+    return [
+        {
+            "lesson": name,
+            "start": start.strftime("%H:%M") if start else "",
+            "end": end.strftime("%H:%M") if end else "",
+            "subject": subject or "空堂",
+        }
+        for name, subject, start, end in lessons
+    ]
@@ -41,15 +41,15 @@ def get_specific_course(target: str, day: int, period: int) -> Union[dict[str, U
                 ]
             }
         """
-        from tnfsh_class_table.backend import TNFSHClassTable
-        class_table = TNFSHClassTable(target)
-        table = class_table.transposed_table
-        if day < 1 or day > len(table) or period < 1 or period > len(table[0]):
+        from tnfsh_class_table.backend import class_table_cache
+        class_table = class_table_cache.get(target)
+        table = class_table.grid.transpose()
+        days, periods = table.shape
+        if day < 1 or day > days or period < 1 or period > periods:
             return "請提供有效的星期和節次範圍"
-        course = table[day - 1][period - 1]
-        subject = list(course.keys())[0] 
-        object = list(course[subject].keys())
-        links = list(course[subject].values()) 
+        subject, counterparts = table.course(day - 1, period - 1)
+        object = list(counterparts.keys())
+        links = list(counterparts.values()) 
         #print(links)
         type = class_table.type
         if type == "class":
@@ -63,39 +63,39 @@ def get_table(target: str) -> dict[str, Union[str, list[dict[str, Union[str, lis
             "type": "teacher"
         }
         """
-        from tnfsh_class_table.backend import TNFSHClassTable
-        target: TNFSHClassTable = TNFSHClassTable(target)
-        table = target.transposed_table
+        from tnfsh_class_table.backend import TNFSHClassTable, class_table_cache
+        target: TNFSHClassTable = class_table_cache.get(target)
+        table = target.grid.transpose()
         result = {}
         type = target.type
         result["all_courses"] = []
-        for i, day in enumerate(table):
+        days, _ = table.shape
+        for i in range(days):
             day_result = {}
             day_result["day"] = i + 1
             courses = []
-            for j, period in enumerate(day):
-                if isinstance(period, dict):
-                    course = {}
-                    course["period"] = j + 1
-                    course_name = list(period.keys())[0]
-                    objects = list(period[course_name].keys())
-                    links = list(period[course_name].values())
-                    course["subject"] = course_name
-                    if type == "class":
-                        for object, link in zip(objects, links):
-                            course["teachers_of_course"] = []
-                            course["teachers_of_course"].append({
-                                "teacher_name": object,
-                                "link": link
-                            })
-                    else: 
-                        for object, link in zip(objects, links):
-                            course["class_engaged"] = []
-                            course["class_engaged"].append({
-                                "class_code": object,
-                                "link": link
-                            })
-                    courses.append(course)
+            for j, cell_id in enumerate(table.row(i)):
+                course = {}
+                course["period"] = j + 1
+                course_name, counterparts = table.decode(cell_id)
+                objects = list(counterparts.keys())
+                links = list(counterparts.values())
+                course["subject"] = course_name
+                if type == "class":
+                    for object, link in zip(objects, links):
+                        course["teachers_of_course"] = []
+                        course["teachers_of_course"].append({
+                            "teacher_name": object,
+                            "link": link
+                        })
+                else: 
+                    for object, link in zip(objects, links):
+                        course["class_engaged"] = []
+                        course["class_engaged"].append({
+                            "class_code": object,
+                            "link": link
+                        })
+                courses.append(course)
                 day_result["courses"] = courses
             result["all_courses"].append(day_result)
         
@@ -1,6 +1,7 @@
 from typing import Any
 from bs4 import BeautifulSoup, Tag, Comment
 from tnfsh_class_table.utils.log_func import log_func
+from tnfsh_class_table.utils.html_parser import make_soup
 
 def _regular_soup(soup: Any) -> str:
     """
@@ -50,7 +51,8 @@ def get_wiki_content(target: str) -> str:
     url = get_wiki_link(target)
     import requests
     response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
+    # 輸出的是整段 HTML，不同解析器修正標籤的方式不同，維持原本的 html.parser
+    soup = make_soup(response.text, "html.parser")
     soup = soup.find('div', {'id': 'bodyContent'})
     soup = _regular_soup(soup)
     return str(soup)
@@ -48,30 +48,16 @@ def get_wiki_link(target: str) -> Union[str, list[str]]:
     except tenacity.RetryError:
         pass
 
-    # 如果是老師，進行額外檢查
+    # 如果是老師，以官網與竹園 Wiki 的教師對照表檢查（包含別名）
     try:
-        from tnfsh_wiki_teachers_core import TNFSHWikiTeachersCore
-        wiki_core = TNFSHWikiTeachersCore()
-        import asyncio
-        index = asyncio.run(wiki_core.fetch_index())
-        teacher_data = index.reverse_index.root
+        from tnfsh_class_table.backend import teacher_join
+        join = teacher_join()
 
-        # 先直接搜尋完全匹配的教師名稱
-        if target in teacher_data:
-            teacher_info_list = teacher_data[target]
-            return f"{base_url}/{teacher_info_list.url.strip("/")}"
-
-        # 若無完全匹配，搜尋包含教師名稱的項目
-        partial_matches = [
-            name 
-            for name, info_list in teacher_data.items()
-            if target in name
-        ]
-
-        if len(partial_matches) == 1:
-            return f"{base_url}/{teacher_data[partial_matches[0]].url.strip("/")}"
-        else:
-            return partial_matches
+        # 完全相同、別名或部分比對，找不到時改找編輯距離相近的名稱
+        links = join.wiki_links(target) or join.similar_wiki_links(target)
+        if len(links) == 1:
+            return links[0][0]
+        return [name for _, name in links]
     except ValueError:
         raise ValueError(f"無法找到 {target} 的Wiki連結")
 
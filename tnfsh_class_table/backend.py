@@ -1,19 +1,38 @@
 from __future__ import annotations
 import requests
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, Tag, UnicodeDammit
 import re
 import json
-from datetime import datetime
-from typing import Dict, List, Optional, Union, Any, Tuple
+import hashlib
+import io
+import tempfile
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Union, Any, Tuple
 from abc import ABC, abstractmethod
 import gradio as gr
 import threading
 import icalendar
-from urllib.parse import unquote
-from time import sleep
+from time import sleep, monotonic
+import time
+from pathlib import Path
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
 import concurrent.futures
+from tnfsh_class_table.utils.html_parser import VOID_ELEMENTS, feed, make_soup
+from tnfsh_class_table.new_backend.bells import BellSchedule, bell_schedules
+from tnfsh_class_table.new_backend.descriptions import EventDescriptionCache, event_descriptions
+from tnfsh_class_table.new_backend.export_cache import ExportCache, export_cache
+from tnfsh_class_table.new_backend.generations import DataGeneration, DataGenerations, data_generations
+from tnfsh_class_table.new_backend.grid import TimetableGrid
+from tnfsh_class_table.new_backend.ics import CalendarEvent, serialize_calendar
+from tnfsh_class_table.new_backend.names import NameIndex, name_indexes
+from tnfsh_class_table.new_backend.semester import semester_calendar
+from tnfsh_class_table.new_backend.sequence import event_sequences, event_uid, slot_fingerprints
+from tnfsh_class_table.new_backend.teachers import TEACHER_ALIASES, TeacherJoin, teacher_joins
+from tnfsh_class_table.new_backend.wiki_crawler import (
+    SUBJECTS_TITLE, WIKI_BASE_URL, PageFingerprint, WikiCrawlResult, WikiTeacherCrawler,
+)
 
 class Util:
     def print_format(data: Any, format: str = "json", remove_attrs: bool = True) -> None:
@@ -80,26 +99,122 @@ class Util:
         return None
 
 class TNFSHClassTableIndex:
-    """台南一中課表索引的單例類別"""
+    """台南一中課表索引的單例類別
+
+    索引成功取得後會寫入磁碟（預設為 new_backend.cache.CACHE_DIR 下的 class_table_index.json），
+    之後啟動時直接載入，不需要等待網路；超過 max_age 秒的索引會在背景重新驗證，
+    讀取端在驗證期間仍使用上一份完整的索引。重新載入失敗時保留舊的索引，不會變成空的索引。
+
+    Attributes:
+        loaded_at (float): 目前索引取得的時間（epoch 秒），尚未取得完整的索引時為 0
+        source (str): 目前索引的來源，"network"、"disk" 或 "snapshot"
+        refreshes (int): 成功重新載入的次數
+        failures (int): 重新載入失敗的次數
+        last_refresh_duration (Optional[float]): 最近一次重新載入花費的秒數
+        last_error (Optional[str]): 最近一次失敗的原因
+    """
     
     _instance = None
     _initialized = False
+    # 第一次建立時只有一個執行緒抓取索引，其他執行緒等待同一個結果
+    _init_lock = threading.Lock()
+    persist_path: Optional[str] = None  # 預設為 CACHE_DIR / "class_table_index.json"
+    max_age = 6 * 60 * 60  # 超過此秒數的索引在背景重新驗證
+    _refresh_lock = threading.Lock()
+    _revalidator: Optional[threading.Thread] = None
+
+    loaded_at = 0.0
+    source = ""
+    refreshes = 0
+    failures = 0
+    last_refresh_duration: Optional[float] = None
+    last_error: Optional[str] = None
     
     def __new__(cls) -> 'TNFSHClassTableIndex':
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            with cls._init_lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
         return cls._instance
     
     def __init__(self) -> None:
-        # 確保初始化只執行一次
-        if not TNFSHClassTableIndex._initialized:
+        # 確保初始化只執行一次；同時建立時其他執行緒在鎖上等待，初始化失敗時由下一個呼叫者重試
+        if TNFSHClassTableIndex._initialized:
+            return
+        with TNFSHClassTableIndex._init_lock:
+            if TNFSHClassTableIndex._initialized:
+                return
             self.base_url = "http://w3.tnfsh.tn.edu.tw/deanofstudies/course/"
-            self.index = self._get_index()
-            self.reverse_index = self._build_reverse_index()
+            if self._load_persisted():
+                # 先使用磁碟上的索引，過期時在背景重新驗證
+                if self.age > self.max_age:
+                    self.revalidate()
+            else:
+                # 第一次執行，沒有可用的索引，只能等待網路
+                self.index = self._get_index()
+                self.reverse_index = self._build_reverse_index()
+                self.source = "network"
+                if all(self.index[data_type]["data"] for data_type in ("class", "teacher")):
+                    self.loaded_at = time.time()
+                    self._persist()
+                else:
+                    # 沒有取得完整的索引時維持 loaded_at = 0，下一次背景重新驗證立即重新載入
+                    self.failures += 1
+                    self.last_error = "索引頁面沒有任何班級或老師"
             TNFSHClassTableIndex._initialized = True
 
-    def _get_index(self) -> Dict[str, Union[str, Dict[str, Union[str, Dict[str, Dict[str, str]]]]]]:
-        """取得完整的台南一中課表索引"""
+    @classmethod
+    def _persist_file(cls) -> Path:
+        if cls.persist_path is None:
+            from tnfsh_class_table.new_backend.cache import CACHE_DIR
+            return CACHE_DIR / "class_table_index.json"
+        return Path(cls.persist_path)
+
+    def _load_persisted(self) -> bool:
+        """載入磁碟上的索引，檔案不存在或無法使用時回傳 False"""
+        path = self._persist_file()
+        try:
+            data = json.loads(path.read_bytes())
+            index = data["index"]
+            self.base_url = index["base_url"]
+            self.index = index
+            self.reverse_index = self._build_reverse_index()
+            self.loaded_at = float(data["saved_at"])
+            self.source = "disk"
+            return True
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"無法讀取課表索引 {path}: {e}")
+            return False
+
+    def _persist(self) -> None:
+        """以原子方式把目前的索引寫入磁碟"""
+        path = self._persist_file()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"saved_at": self.loaded_at, "index": self.index}, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"無法寫入課表索引 {path}: {e}")
+
+    @property
+    def age(self) -> float:
+        """目前索引的秒數"""
+        return time.time() - self.loaded_at
+
+    def _get_index(self, strict: bool = False) -> Dict[str, Union[str, Dict[str, Union[str, Dict[str, Dict[str, str]]]]]]:
+        """取得完整的台南一中課表索引
+
+        Args:
+            strict (bool): 為 True 時任一索引頁面失敗就拋出例外，否則以空的資料代替
+        """
         urls = ("_ClassIndex.html", "_TeachIndex.html")
         data_types = ("class", "teacher")
 
@@ -113,36 +228,14 @@ class TNFSHClassTableIndex:
                 # 發送請求獲取頁面內容
                 response = requests.get(self.base_url + url, timeout=10)
                 response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-                parsed_data = {}
-                current_category = None
-                for tr in soup.find_all("tr"):
-                    category_tag = tr.find("span")
-                    if category_tag and not tr.find("a"):
-                        current_category = category_tag.text.strip()
-                        parsed_data[current_category] = {}
-                    for a in tr.find_all("a"):
-                        link = a.get("href")
-                        text = a.text.strip()
-                        if text.isdigit() and link:
-                            parsed_data[current_category][text] = link
-                        else:
-                            match = re.search(r'([\u4e00-\u9fa5]+)', text)
-                            if match:
-                                text = match.group(1)
-                                parsed_data[current_category][text] =  link
-                            else:
-                                text = text.replace("\r", "").replace("\n", "").replace(" ", "").strip()
-                                if len(text) > 3:
-                                    text = text[3:].strip()
-                                    parsed_data[current_category][text] = link
-
                 result[data_type] = {
                     "url": url,
-                    "data": parsed_data
+                    "data": self._parse_index_page(response.content)
                 }
 
             except Exception as e:
+                if strict:
+                    raise
                 print(f"Error processing {data_type}: {str(e)}")
                 result[data_type] = {
                     "url": url,
@@ -151,17 +244,55 @@ class TNFSHClassTableIndex:
 
         return result
     
+    @staticmethod
+    def _parse_index_page(content: Union[str, bytes]) -> Dict[str, Dict[str, str]]:
+        """解析 _ClassIndex.html 或 _TeachIndex.html
+
+        Returns:
+            Dict[str, Dict[str, str]]: {分類: {班級或老師: 連結}}
+        """
+        # 索引頁面不在 golden 測試範圍內，維持與原本相同的 html.parser
+        soup = make_soup(content, "html.parser")
+        parsed_data = {}
+        current_category = None
+        for tr in soup.find_all("tr"):
+            category_tag = tr.find("span")
+            if category_tag and not tr.find("a"):
+                current_category = category_tag.text.strip()
+                parsed_data[current_category] = {}
+            for a in tr.find_all("a"):
+                link = a.get("href")
+                text = a.text.strip()
+                if text.isdigit() and link:
+                    parsed_data[current_category][text] = link
+                else:
+                    match = re.search(r'([\u4e00-\u9fa5]+)', text)
+                    if match:
+                        text = match.group(1)
+                        parsed_data[current_category][text] =  link
+                    else:
+                        text = text.replace("\r", "").replace("\n", "").replace(" ", "").strip()
+                        if len(text) > 3:
+                            text = text[3:].strip()
+                            parsed_data[current_category][text] = link
+        return parsed_data
+
     def _build_reverse_index(self) -> Dict[str, Dict[str, str]]:
         """建立反查表，將老師/班級對應到其 URL 和分類。
 
         Returns:
             Dict[str, Dict[str, str]]: 反查表結構為 {老師/班級: {url: url, category: category}}
         """
+        return self._build_reverse_index_from(self.index)
+
+    @staticmethod
+    def _build_reverse_index_from(index: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+        """由 index 建立反查表，不修改目前的索引"""
         reverse_index = {}
         
         # 處理教師資料
-        if "teacher" in self.index:
-            teacher_data = self.index["teacher"]["data"]
+        if "teacher" in index:
+            teacher_data = index["teacher"]["data"]
             for subject, teachers in teacher_data.items():
                 for teacher_name, teacher_url in teachers.items():
                     reverse_index[teacher_name] = {
@@ -170,8 +301,8 @@ class TNFSHClassTableIndex:
                     }
 
         # 處理班級資料
-        if "class" in self.index:
-            class_data = self.index["class"]["data"]
+        if "class" in index:
+            class_data = index["class"]["data"]
             for grade, classes in class_data.items():
                 for class_num, class_url in classes.items():
                     reverse_index[class_num] = {
@@ -230,11 +361,135 @@ class TNFSHClassTableIndex:
         except Exception as e:
             raise Exception(f"Failed to write JSON file: {str(e)}")
     
-    def refresh(self) -> None:
-        """重新載入索引資料"""
-        self.index = self._get_index()
-        self.reverse_index = self._build_reverse_index()
+    def refresh(self) -> bool:
+        """重新載入索引資料，成功後寫入磁碟；失敗時保留目前的索引
+
+        同時只會有一個重新載入在執行，其他呼叫會等待它完成後直接回傳。
+
+        Returns:
+            bool: 是否成功取得新的索引
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            with self._refresh_lock:
+                return self.last_error is None
+        try:
+            return self._reload()
+        finally:
+            self._refresh_lock.release()
+
+    def revalidate(self) -> Optional[threading.Thread]:
+        """在背景重新載入索引，不等待結果；已經在重新載入時回傳 None"""
+        if not self._refresh_lock.acquire(blocking=False):
+            return None
+
+        def run() -> None:
+            try:
+                self._reload()
+            finally:
+                self._refresh_lock.release()
+
+        thread = threading.Thread(target=run, name="class-table-index-revalidate", daemon=True)
+        thread.start()
+        return thread
+
+    def _reload(self) -> bool:
+        """取得新的索引並替換目前的索引（需持有 _refresh_lock）"""
+        start = monotonic()
+        try:
+            index = self._get_index(strict=True)
+            if not all(index[data_type]["data"] for data_type in ("class", "teacher")):
+                raise ValueError("索引頁面沒有任何班級或老師")
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            print(f"課表索引重新載入失敗，沿用 {self.age:.0f} 秒前的索引: {e}")
+            return False
+        finally:
+            self.last_refresh_duration = monotonic() - start
+        # 先建立反查表再一起替換，讀取端不會看到不一致的索引
+        reverse_index = self._build_reverse_index_from(index)
+        self.index, self.reverse_index = index, reverse_index
+        self.loaded_at = time.time()
+        self.source = "network"
+        self.refreshes += 1
+        self.last_error = None
+        self._persist()
+        return True
+
+    @classmethod
+    def start_revalidation(cls, interval: float = 10 * 60) -> threading.Thread:
+        """啟動在背景重新驗證索引的執行緒，每 interval 秒檢查一次，索引超過 max_age 秒時重新載入
+
+        重複呼叫時回傳同一個執行緒。
+
+        Args:
+            interval (float): 檢查的間隔秒數
+        """
+        if cls._revalidator is not None and cls._revalidator.is_alive():
+            return cls._revalidator
+
+        def run() -> None:
+            while True:
+                instance = cls.get_instance()
+                if instance.age > cls.max_age:
+                    instance.refresh()
+                sleep(interval)
+
+        cls._revalidator = threading.Thread(target=run, name="class-table-index-revalidator", daemon=True)
+        cls._revalidator.start()
+        return cls._revalidator
+
+    def stats(self) -> Dict[str, Any]:
+        """取得索引的年齡與重新載入的統計資訊"""
+        return {
+            "age": self.age,
+            "source": self.source,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_refresh_duration": self.last_refresh_duration,
+            "last_error": self.last_error,
+            "refreshing": self._refresh_lock.locked(),
+        }
+
+    @property
+    def names(self) -> NameIndex:
+        """班級與老師名稱的模糊查詢索引，每份反查表只建立一次"""
+        return name_indexes.get("official", self.reverse_index)
+
+    def resolve_target(self, name: str) -> str:
+        """將不完整或打錯的班級/老師名稱對應到唯一的名稱
+
+        Args:
+            name (str): 使用者輸入的名稱，例如 "永進" 或 "顏永近"
+
+        Returns:
+            str: 唯一對應的名稱；完全相同、找不到或有多個候選時原樣回傳
+        """
+        if name not in self.reverse_index and name in TEACHER_ALIASES:
+            return TEACHER_ALIASES[name]
+        return self.names.resolve(name) or name
         
+    @classmethod
+    def from_index(cls, index: Dict[str, Any], loaded_at: Optional[float] = None) -> 'TNFSHClassTableIndex':
+        """以已取得的索引資料（例如快照中的索引）設定單例，不發送請求
+
+        Args:
+            index (Dict[str, Any]): 與 self.index 相同結構的索引
+            loaded_at (float, optional): 索引取得的時間，預設為現在
+
+        Returns:
+            TNFSHClassTableIndex: 索引類別的單例實例
+        """
+        instance = cls.__new__(cls)
+        reverse_index = cls._build_reverse_index_from(index)
+        with cls._init_lock:
+            instance.base_url = index["base_url"]
+            instance.index, instance.reverse_index = index, reverse_index
+            instance.loaded_at = time.time() if loaded_at is None else loaded_at
+            instance.source = "snapshot"
+            cls._initialized = True
+        return instance
+
     @classmethod
     def get_instance(cls) -> 'TNFSHClassTableIndex':
         """取得單例實例
@@ -242,30 +497,105 @@ class TNFSHClassTableIndex:
         Returns:
             TNFSHClassTableIndex: 索引類別的單例實例
         """
-        if cls._instance is None:
-            cls._instance = cls()
-        return cls._instance
+        # cls() 會等待進行中的初始化完成，不會拿到尚未初始化的實例
+        if cls._instance is not None and cls._initialized:
+            return cls._instance
+        return cls()
 
 class NewWikiTeacherIndex:
-    """新竹園 Wiki 教師索引的單例類別"""
+    """新竹園 Wiki 教師索引的單例類別
+
+    索引由 new_backend.wiki_crawler.WikiTeacherCrawler 抓取，多次重新載入共用同一個連線池。
+    refresh() 以上次每個科目頁面的指紋發送條件請求，只重新解析內容改變的科目；
+    新的 (index, reverse_index, version) 建立完成後才一次替換，讀取端不會看到一半的索引。
+
+    Attributes:
+        version (int): 索引版本，內容改變時遞增，供 EventDescriptionCache 與教師對照表判斷快取是否失效
+        last_crawl (Optional[WikiCrawlResult]): 最近一次抓取的結果
+        full_refresh_duration (Optional[float]): 最近一次完整抓取花費的秒數
+        incremental_refresh_duration (Optional[float]): 最近一次增量更新花費的秒數
+    """
     
     _instance = None
     _initialized = False
+    # 第一次建立時只有一個執行緒抓取索引，其他執行緒等待同一個結果
+    _init_lock = threading.Lock()
+    _refresh_lock = threading.Lock()
+    base_url = WIKI_BASE_URL
+    _crawler: Optional[WikiTeacherCrawler] = None
+
+    last_crawl: Optional[WikiCrawlResult] = None
+    full_refresh_duration: Optional[float] = None
+    incremental_refresh_duration: Optional[float] = None
     
     def __new__(cls) -> 'NewWikiTeacherIndex':
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            with cls._init_lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
         return cls._instance
     
     def __init__(self) -> None:
-        # 確保初始化只執行一次
-        if not NewWikiTeacherIndex._initialized:
-            self.base_url = "https://tnfshwiki.tfcis.org"
-            # 使用線程池進行並發請求
-            with ThreadPoolExecutor(max_workers=10) as executor:
-                self.index = self._get_new_wiki_teacher_index(executor)
-            self.reverse_index = self._build_teacher_reverse_index()
-            NewWikiTeacherIndex._initialized = True
+        # 確保初始化只執行一次；同時建立時其他執行緒在鎖上等待，初始化失敗時由下一個呼叫者重試
+        if NewWikiTeacherIndex._initialized:
+            return
+        with NewWikiTeacherIndex._init_lock:
+            if NewWikiTeacherIndex._initialized:
+                return
+            self._pages: Dict[str, PageFingerprint] = {}
+            self._state: Tuple[Dict[str, Any], Dict[str, Dict[str, str]], int] = ({}, {}, 0)
+            # 科目列表無法取得時不發布空的索引，也不標記為已初始化，由下一個呼叫者重新抓取
+            if self._apply(self._crawl()):
+                NewWikiTeacherIndex._initialized = True
+
+    @property
+    def index(self) -> Dict[str, Dict[str, Any]]:
+        return self._state[0]
+
+    @property
+    def reverse_index(self) -> Dict[str, Dict[str, str]]:
+        return self._state[1]
+
+    @property
+    def version(self) -> int:
+        return self._state[2]
+
+    @classmethod
+    def crawler(cls) -> WikiTeacherCrawler:
+        """共用的爬蟲，base_url 改變時重新建立"""
+        crawler = cls._crawler
+        if crawler is None or crawler.base_url != cls.base_url.rstrip("/"):
+            if crawler is not None:
+                crawler.close()
+            crawler = cls._crawler = WikiTeacherCrawler(cls.base_url)
+        return crawler
+
+    def _crawl(self) -> WikiCrawlResult:
+        """以上次的頁面指紋抓取索引，沒有指紋時完整抓取"""
+        result = self.crawler().crawl_sync(self._pages)
+        if result.incremental:
+            NewWikiTeacherIndex.incremental_refresh_duration = result.elapsed
+        else:
+            NewWikiTeacherIndex.full_refresh_duration = result.elapsed
+        NewWikiTeacherIndex.last_crawl = result
+        print(result.report())
+        return result
+
+    def _apply(self, result: WikiCrawlResult) -> bool:
+        """發布抓取結果，索引內容改變時才遞增版本；科目列表無法取得時沿用目前的索引
+
+        Returns:
+            bool: 目前是否有可用的索引（新發布或沿用）；科目列表無法取得且尚未發布過時為 False
+        """
+        if SUBJECTS_TITLE in result.errors or (not result.index and self.index):
+            return bool(self._state[2])
+        self._pages = result.pages
+        if not result.modified and self._state[2]:
+            return True
+        index = result.index
+        # 建立完成後一次替換，讀取端拿到的 index、reverse_index 與 version 一定一致
+        self._state = (index, self._build_reverse_index_from(index), self._state[2] + 1)
+        return True
     
     def _get_new_wiki_normal_url(self, title: str) -> str:
         """
@@ -277,8 +607,7 @@ class NewWikiTeacherIndex:
         Returns:
             str: 標準版 URL
         """
-        url = f"{self.base_url}/{title}"
-        return url
+        return self.crawler().normal_url(title)
     
     def _get_new_wiki_mobile_url(self, title: str) -> str:
         """
@@ -290,81 +619,17 @@ class NewWikiTeacherIndex:
         Returns:
             str: 行動版 URL
         """
-        url = f"{self.base_url}/index.php?title={title}&mobileaction=toggle_view_mobile"
-        return url
-    
-    def _get_new_wiki_teacher_index(self, executor: ThreadPoolExecutor) -> Dict[str, Dict[str, Union[str, Dict[str, str]]]]:
-        """並發從新竹園 Wiki 網站取得教師索引"""
-        def _get_new_wiki_subject() -> Dict[str, Dict[str, str]]:
-            title = "分類:科目"
-            url = self._get_new_wiki_normal_url(title)
-            try:
-                response = requests.get(url, timeout=5)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-
-                subject_list = soup.find_all("div", class_="mw-category")[1]
-                #print(subject_list)
-                subject_index = {}
-                for subject in subject_list.find_all("a"):
-                    subject_name = subject.text.strip()
-                    subject_url = subject.get("href")
-                    if subject_name == "藝術與人文科":
-                        continue
-                    if subject_name and subject_url:
-                        subject_index[subject_name] = {"url": unquote(subject_url)}
-                return subject_index
-            except requests.RequestException:
-                return {}
-
-        def _get_subject_teacher_list(subject_name: str) -> Dict[str, str]:
-            url = self._get_new_wiki_mobile_url(f"分類:{subject_name}老師")
-            #print(url)
-            try:
-                response = requests.get(url, timeout=5)
-                response.raise_for_status()
-                #print(response.status_code)
-                soup = BeautifulSoup(response.content, 'html.parser')
-                if not soup.find("div", class_="mw-category"):
-                    return {}
-
-                teacher_list = soup.find("div", class_="mw-category").find_all("a")
-                teacher_names = [teacher.text for teacher in teacher_list]
-                teacher_urls = [unquote(teacher.get("href")) for teacher in teacher_list]
-                result = dict(zip(teacher_names, teacher_urls))
-                #print(result)
-                return result
-            except requests.RequestException:
-                return {}
-
-        # 取得科目索引
-        teacher_index = _get_new_wiki_subject()
-        #print(teacher_index)
-        if not teacher_index:
-            return {}
-
-        # 建立並發任務
-        future_to_subject = {
-            executor.submit(_get_subject_teacher_list, subject_name): subject_name
-            for subject_name in teacher_index
-        }
-
-        # 收集結果
-        for future in as_completed(future_to_subject):
-            subject_name = future_to_subject[future]
-            try:
-                teacher_list = future.result()
-                teacher_index[subject_name]["teachers"] = teacher_list
-            except Exception as e:
-                print(f"處理科目 {subject_name} 時發生錯誤: {e}")
-                teacher_index[subject_name]["teachers"] = {}
-
-        return teacher_index
+        return self.crawler().mobile_url(title)
 
     def _build_teacher_reverse_index(self) -> Dict[str, Dict[str, str]]:
         """建立教師反查表，將教師名稱對應到其科目與URL"""
+        return self._build_reverse_index_from(self.index)
+
+    @staticmethod
+    def _build_reverse_index_from(index: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+        """由 index 建立教師反查表，不修改目前的索引"""
         reverse_index = {}
-        for subject, data in self.index.items():
+        for subject, data in index.items():
             for teacher, teacher_url in data["teachers"].items():
                 reverse_index[teacher] = {
                     "url": teacher_url,
@@ -418,11 +683,30 @@ class NewWikiTeacherIndex:
         except Exception as e:
             raise Exception(f"Failed to write JSON file: {str(e)}")
 
-    def refresh(self) -> None:
-        """重新載入索引資料"""
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            self.index = self._get_new_wiki_teacher_index(executor)
-        self.reverse_index = self._build_teacher_reverse_index()
+    def refresh(self) -> WikiCrawlResult:
+        """重新載入索引資料，只重新抓取與解析內容改變的科目
+
+        Returns:
+            WikiCrawlResult: 抓取結果，report() 包含耗時與重新解析的科目數
+        """
+        with self._refresh_lock:
+            result = self._crawl()
+            if self._apply(result):
+                NewWikiTeacherIndex._initialized = True
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """取得索引大小與完整抓取、增量更新的耗時"""
+        last = self.last_crawl
+        return {
+            "version": self.version,
+            "subjects": len(self.index),
+            "teachers": len(self.reverse_index),
+            "full_refresh_duration": self.full_refresh_duration,
+            "incremental_refresh_duration": self.incremental_refresh_duration,
+            "last_changed": list(last.changed) if last is not None else [],
+            "last_errors": dict(last.errors) if last is not None else {},
+        }
 
     @classmethod
     def get_instance(cls) -> 'NewWikiTeacherIndex':
@@ -431,25 +715,309 @@ class NewWikiTeacherIndex:
         Returns:
             NewWikiTeacherIndex: 索引類別的單例實例
         """
-        if cls._instance is None:
-            cls._instance = cls()
-        return cls._instance
+        # cls() 會等待進行中的初始化完成，不會拿到尚未初始化的實例
+        if cls._instance is not None and cls._initialized:
+            return cls._instance
+        return cls()
+
+def teacher_join() -> TeacherJoin:
+    """取得官網與竹園 Wiki 教師的對照表，兩個索引的每個版本只建立一次
+
+    Returns:
+        TeacherJoin: 以目前 TNFSHClassTableIndex 與 NewWikiTeacherIndex 建立的對照表
+    """
+    official = TNFSHClassTableIndex.get_instance()
+    wiki = NewWikiTeacherIndex.get_instance()
+    return teacher_joins.get(official.index["teacher"]["data"], wiki.reverse_index, wiki.version)
+
+
+class TimetableExtractor:
+    """單次走訪課表網頁，同時擷取節次時間、課表內容與最後更新時間
+
+    以事件方式 (start / end / data) 接收 HTML 標籤，不建立 BeautifulSoup 樹，
+    結果與 TNFSHClassTable 原本的多階段解析 (_get_soup_table → _get_regular_soup_table
+    → _get_lesson / _get_table / _get_last_update) 相同。
+
+    Example:
+        >>> lessons, table, last_update = TimetableExtractor.extract(response.content)
+    """
+    # 解析結果的格式或內容有變動時必須遞增，讓磁碟快取中舊版的解析結果失效
+    PARSER_VERSION = 1
+    CLASS_TABLE_CONTENT_WITH_LESSON_WITHOUT_NAP_LENGTH = 7
+    ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+    PRESERVE_WHITESPACE_TAGS = frozenset(("pre", "textarea"))
+
+    class _Element:
+        """走訪時仍開啟中的元素"""
+        __slots__ = ("tag", "texts", "links", "spans")
+
+        def __init__(self, tag: str) -> None:
+            self.tag = tag
+            self.texts: Optional[List[str]] = None   # 需要收集文字時才建立
+            self.links: Optional[List[Tuple[Optional[List[str]], str]]] = None  # p 內的 (a 文字, href)
+            self.spans: Optional[List[List[str]]] = None  # 最後更新時間段落內的 span 文字
+
+    def __init__(self) -> None:
+        self._stack: List[TimetableExtractor._Element] = []
+        self._text_buffers: List[List[str]] = []  # 所有開啟中且需要收集文字的緩衝區
+        self._pending: List[str] = []  # 尚未歸屬的連續文字
+        self._preserve_whitespace = 0
+        self._table_depth: Optional[int] = None   # 第一個 <table> 在堆疊中的深度
+        self._table_done = False
+        self._row: Optional[List[Tuple[List[str], List[Any]]]] = None  # 目前列的 (td 文字, td 內的 p) 列表
+        self._cell: Optional[Tuple[List[str], List[Any]]] = None
+        self._update_p: Optional[TimetableExtractor._Element] = None
+        self._update_done = False
+        self.rows: List[List[Tuple[List[str], List[Any]]]] = []
+        self.update_spans: List[List[str]] = []
+
+    @classmethod
+    def extract(cls, content: Union[bytes, str], backend: Optional[str] = None) -> Tuple[Dict[str, List[str]], List[List[Dict[str, Dict[str, str]]]], str]:
+        """解析課表網頁
+
+        Args:
+            content (Union[bytes, str]): 課表網頁內容，bytes 會依 BeautifulSoup 相同規則判斷編碼
+            backend (str, optional): HTML 解析器後端，參考 utils.html_parser
+
+        Returns:
+            Tuple: (lessons, table, last_update)
+        """
+        if isinstance(content, bytes):
+            content = UnicodeDammit(content, is_html=True).unicode_markup or ""
+        return feed(content, cls(), backend)
+
+    def _open_text(self, element: _Element) -> List[str]:
+        element.texts = []
+        self._text_buffers.append(element.texts)
+        return element.texts
+
+    def start(self, tag: str, attrs: Dict[str, Optional[str]]) -> None:
+        self._flush()
+        if tag in self.PRESERVE_WHITESPACE_TAGS:
+            self._preserve_whitespace += 1
+        element = self._Element(tag)
+        self._stack.append(element)
+        depth = len(self._stack)
+
+        if tag == "table" and self._table_depth is None and not self._table_done:
+            self._table_depth = depth
+        elif self._table_depth is not None:
+            if tag == "tr":
+                self._row = []
+                self.rows.append(self._row)
+            elif tag == "td" and self._row is not None:
+                style = attrs.get("style")
+                texts = self._open_text(element)
+                # 含 border 的 td 不列入課表
+                self._cell = (texts, [])
+                if not (style and "border" in style):
+                    self._row.append(self._cell)
+            elif tag == "p" and self._cell is not None:
+                self._open_text(element)
+                element.links = []
+                self._cell[1].append(element)
+            elif tag == "a" and self._cell is not None:
+                texts = self._open_text(element)
+                href = attrs.get("href") or ""
+                for open_element in self._stack:
+                    if open_element.links is not None:
+                        open_element.links.append((texts, href))
+
+        if tag == "p" and not self._update_done and self._update_p is None:
+            classes = (attrs.get("class") or "").split()
+            if "MsoNormal" in classes and attrs.get("align") == "center":
+                self._update_p = element
+                element.spans = self.update_spans
+        elif tag == "span" and self._update_p is not None:
+            self.update_spans.append(self._open_text(element))
+
+        if tag in VOID_ELEMENTS:
+            self.end(tag)
+
+    def end(self, tag: str) -> None:
+        self._flush()
+        # 與 BeautifulSoup 相同：關閉最近一個同名元素，若無則忽略
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index].tag == tag:
+                break
+        else:
+            return
+        while len(self._stack) > index:
+            self._close_element(self._stack.pop())
+
+    def _close_element(self, element: _Element) -> None:
+        if element.tag in self.PRESERVE_WHITESPACE_TAGS:
+            self._preserve_whitespace -= 1
+        if element.texts is not None:
+            # 緩衝區依開啟順序排列，關閉的元素必定在最後面
+            for i in range(len(self._text_buffers) - 1, -1, -1):
+                if self._text_buffers[i] is element.texts:
+                    del self._text_buffers[i]
+                    break
+        depth = len(self._stack) + 1
+        if self._table_depth is not None:
+            if depth == self._table_depth:
+                self._table_depth = None
+                self._table_done = True
+                self._row = None
+                self._cell = None
+            elif element.tag == "td" and self._cell is not None and self._cell[0] is element.texts:
+                self._cell = None
+            elif element.tag == "tr":
+                self._row = None
+        if element is self._update_p:
+            self._update_p = None
+            self._update_done = True
+
+    def data(self, text: str) -> None:
+        self._pending.append(text)
+
+    def comment(self, text: str) -> None:
+        # 註解不列入文字，但會切斷前後的字串
+        self._flush()
+
+    def _flush(self) -> None:
+        """將累積的文字交給開啟中的元素，純空白字串比照 BeautifulSoup 壓縮為單一空白或換行"""
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending.clear()
+        if not self._preserve_whitespace and not text.strip(self.ASCII_SPACES):
+            text = "\n" if "\n" in text else " "
+        for buffer in self._text_buffers:
+            buffer.append(text)
+
+    def close(self) -> Tuple[Dict[str, List[str]], List[List[Dict[str, Dict[str, str]]]], str]:
+        """結束解析並組合結果"""
+        self._flush()
+        while self._stack:
+            self._close_element(self._stack.pop())
+
+        length = self.CLASS_TABLE_CONTENT_WITH_LESSON_WITHOUT_NAP_LENGTH
+        regular_rows = [row for row in self.rows if len(row) == length]
+
+        lessons: Dict[str, List[str]] = {}
+        table: List[List[Dict[str, Dict[str, str]]]] = []
+        for row in regular_rows:
+            lesson_name = "".join(row[0][0]).strip().replace("\n", "").replace("\r", "")
+            lessons[lesson_name] = list(_lesson_times("".join(row[1][0])))
+            table.append([self._split_course(ps) for _, ps in row[2:]])
+
+        if len(self.update_spans) > 1:
+            last_update = "".join(self.update_spans[1]).strip()
+        else:
+            last_update = "No update date found."
+        return lessons, table, last_update
+
+    @staticmethod
+    def _split_course(ps: List[_Element]) -> Dict[str, Dict[str, str]]:
+        """分析 td 內的 p 為 {課程名稱: {教師名稱: 連結}}，規則同 TNFSHClassTable._get_table"""
+        def clean_text(text: str) -> str:
+            return text.strip("\n").strip("\r").strip(" ").replace(" ", ", ")
+
+        if not ps:
+            return {"": {"": ""}}
+
+        teacher_ps = [p for p in ps if p.links]
+        class_ps = [p for p in ps if not p.links]
+
+        teachers_dict: Dict[str, str] = {}
+        for p in teacher_ps:
+            for texts, href in p.links:
+                teachers_dict[clean_text("".join(texts))] = href
+        if not teacher_ps:
+            teachers_dict = {"": ""}
+
+        if class_ps:
+            texts = [clean_text("".join(p.texts)) for p in class_ps]
+            class_name = "".join(filter(None, texts)).replace("\n", ", ")
+        else:
+            class_name = ""
+
+        if class_name or teachers_dict != {"": ""}:
+            return {class_name: teachers_dict}
+        return {"": {"": ""}}
+
+
+_LESSON_TIME_PATTERN = re.compile(r'(\d{2})(\d{2})')
+
+
+@lru_cache(maxsize=256)
+def _lesson_times(text: str) -> Tuple[str, ...]:
+    """將節次時間欄位 "0810｜0900" 轉為 ("08:10", "09:00")，全校只有少數幾種，每種只處理一次"""
+    return tuple(
+        _LESSON_TIME_PATTERN.sub(r'\1:\2', value.replace(" ", ""))
+        for value in text.strip().replace("\n", "").replace("\r", "").split("｜")
+    )
+
+
+class _LazyView:
+    """TNFSHClassTable 的延遲屬性：第一次存取時才計算並記住結果
+
+    計算過程持有物件的鎖，確保多執行緒同時存取時只會抓取、解析一次。
+    結果存進實例的 __dict__，之後的存取不再經過此描述器。
+    """
+    def __init__(self, func: Any) -> None:
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            pass
+        with instance._lock:
+            if self.name in instance.__dict__:
+                return instance.__dict__[self.name]
+            value = self.func(instance)
+            instance.__dict__[self.name] = value
+            if self.name in instance.MATERIALIZED_VIEWS:
+                instance._release_if_materialized()
+            return value
+
 
 class TNFSHClassTable:
     """課表處理的主要類別
     
     負責從學校網站擷取課表資訊並進行解析，提供多種匯出格式。
+    除了 target、type、url 以外的屬性都在第一次存取時才抓取、計算並記住；
+    當 lessons、grid、last_update 都已計算後，
+    會釋放原始網頁內容與 BeautifulSoup 樹，讓快取中的物件保持精簡。
+    課表本身以 TimetableGrid 儲存，table 與 transposed_table 每次存取時才由 grid 轉換。
     
     Attributes:
         url (str): 課表網頁的URL
-        soup (BeautifulSoup): 解析後的HTML內容
-        soup_table (Tag): 課表的HTML元素
-        regular_soup_table (Tag): 正規化處理後的課表HTML元素 
+        content (bytes): 課表網頁的原始內容
+        soup (BeautifulSoup): 解析後的HTML內容（僅供除錯）
+        soup_table (Tag): 課表的HTML元素（僅供除錯）
+        regular_soup_table (Tag): 正規化處理後的課表HTML元素（僅供除錯）
         lessons (Dict[str, List[str]]): 課程時間對應表 {"課程名稱": ["開始時間", "結束時間"], ...}
+        grid (TimetableGrid): 精簡課表 (節次 × 星期)
         table (List[List[Dict[str, Dict[str, str]]]]): 結構化的課表資料 [[{"國文": {"王小明": "TK07.HTML"}}, ...], ...]
+        transposed_table (List[List[Dict[str, Dict[str, str]]]]): 轉置後的課表資料 (星期, 節次)
         last_update (str): 課表最後更新時間
         class_ (Dict[str, Union[int, str]]): 班級資訊
+        generation (Optional[int]): 由 TNFSHClassTableCache 取得時所屬的資料世代編號
     """
+    # 全部計算完成後即可釋放原始資料的屬性
+    MATERIALIZED_VIEWS = ("lessons", "grid", "last_update")
+    RELEASABLE_ATTRIBUTES = ("content", "_extracted", "soup", "soup_table", "regular_soup_table")
+
+    # 全程序向學校伺服器發出的課表請求數
+    request_count = 0
+    _request_count_lock = threading.Lock()
+
+    @classmethod
+    def _count_request(cls) -> None:
+        with cls._request_count_lock:
+            cls.request_count += 1
+
     class TableError(Exception):
         """課表處理相關錯誤的例外類別
         
@@ -460,26 +1028,108 @@ class TNFSHClassTable:
             self.message = message
             super().__init__(self.message)
 
-    def __init__(self, target: str) -> None:
-        """初始化課表物件
+    def __init__(self, target: str, response: Optional[requests.Response] = None, page_cache: Any = None) -> None:
+        """初始化課表物件，此時不會發送請求
         
         Args:
-            url (str): 課表網頁的URL
+            target (str): 班級代碼或老師名稱
+            response (requests.Response, optional): 已取得的課表網頁回應，若未指定則在需要時才發送請求
+            page_cache (TieredPageCache, optional): 抓取到的網頁會一併寫入此快取
             
         Raises:
-            TableError: 當網頁請求或解析失敗時
+            ValueError: 找不到班級或老師時
         """
+        self._lock = threading.RLock()
+        self._response = response
+        self.page_cache = page_cache
         self.class_table_index = TNFSHClassTableIndex.get_instance()
         self.target = target
         self.type = self._get_type()
         self.url: str = self._get_url()
-        self.soup: BeautifulSoup = self._get_soup()
-        self.soup_table: Tag = self._get_soup_table()
-        self.regular_soup_table: Tag = self._get_regular_soup_table()
-        self.lessons: Dict[str, List[str]] = self._get_lesson()
-        self.table: List[List[Dict[str, Dict[str, str]]]] = self._get_table()
-        self.transposed_table: List[List[Dict[str, Dict[str, str]]]] = self._get_transpose_table()
-        self.last_update: str = self._get_last_update()
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.fetched = False  # 是否已取得過網頁（含從快取載入），有內容可供重新驗證
+        self.generation: Optional[int] = None
+
+    @classmethod
+    def from_cached(cls, target: str, source: Any, page_cache: Any = None) -> Optional[TNFSHClassTable]:
+        """以快取中已解析的課表建立物件，不發送請求
+
+        Args:
+            target (str): 班級代碼或老師名稱
+            source (TieredPageCache | TimetableSnapshot): 提供 parsed(url) 與 record(url) 的快取
+            page_cache (TieredPageCache, optional): 之後重新抓取時寫入的快取
+
+        Returns:
+            Optional[TNFSHClassTable]: 快取中沒有此課表時回傳 None
+
+        Raises:
+            ValueError: 找不到班級或老師時
+        """
+        table = cls(target, page_cache=page_cache)
+        parsed = source.parsed(table.url)
+        if parsed is None:
+            return None
+        record = source.record(table.url)
+        table.__dict__.update(lessons=parsed.lessons, grid=parsed.grid, last_update=parsed.last_update)
+        table.etag = record.etag
+        table.last_modified = record.last_modified
+        table.fetched = True
+        return table
+
+    def _release_if_materialized(self) -> None:
+        """所有資料屬性都計算完成後，釋放網頁內容與 BeautifulSoup 樹"""
+        if all(name in self.__dict__ for name in self.MATERIALIZED_VIEWS):
+            for name in self.RELEASABLE_ATTRIBUTES:
+                self.__dict__.pop(name, None)
+
+    @_LazyView
+    def content(self) -> bytes:
+        response, self._response = self._response, None
+        return self._get_content(response)
+
+    @_LazyView
+    def _extracted(self) -> Tuple[Dict[str, List[str]], List[List[Dict[str, Dict[str, str]]]], str]:
+        # 單次走訪網頁同時取得節次時間、課表與最後更新時間
+        return TimetableExtractor.extract(self.content)
+
+    @_LazyView
+    def lessons(self) -> Dict[str, List[str]]:
+        return self._extracted[0]
+
+    @_LazyView
+    def grid(self) -> TimetableGrid:
+        return TimetableGrid.from_nested(self._extracted[1])
+
+    @_LazyView
+    def last_update(self) -> str:
+        return self._extracted[2]
+
+    @property
+    def bell_schedule(self) -> BellSchedule:
+        """解析後的節次時間，與節次時間相同的其他課表共用同一個物件"""
+        return bell_schedules.get(self.lessons)
+
+    @property
+    def table(self) -> List[List[Dict[str, Dict[str, str]]]]:
+        return self.grid.to_nested()
+
+    @property
+    def transposed_table(self) -> List[List[Dict[str, Dict[str, str]]]]:
+        return self.grid.transpose().to_nested()
+
+    @_LazyView
+    def soup(self) -> BeautifulSoup:
+        return make_soup(self.content)
+
+    @_LazyView
+    def soup_table(self) -> Optional[Tag]:
+        return self._get_soup_table()
+
+    @_LazyView
+    def regular_soup_table(self) -> Tag:
+        return self._get_regular_soup_table()
+
     def _get_type(self):
         target = self.target
         if target.isdigit():
@@ -491,36 +1141,72 @@ class TNFSHClassTable:
         base_url = self.class_table_index.base_url
         reverse_index = self.class_table_index.reverse_index
         target = self.target
-        aliases = {"朱蒙":"吳銘"}
         try:
             url = base_url + reverse_index[target]["url"]
             return url
         except:
             try:
-                url = base_url + reverse_index[aliases[target]]["url"]
+                url = base_url + reverse_index[TEACHER_ALIASES[target]]["url"]
                 return url
             except Exception as e:
                 raise ValueError(f'找不到班級或老師: {str(e)}')
 
-    def _get_soup(self) -> BeautifulSoup:
-        """發送 GET 請求取得網頁 HTML 內容，並使用 BeautifulSoup 進行解析
+    def _get_content(self, response: Optional[requests.Response] = None) -> bytes:
+        """發送 GET 請求取得網頁 HTML 內容
+
+        同時記錄回應中的 ETag 與 Last-Modified，供快取重新驗證使用。
+
+        Args:
+            response (requests.Response, optional): 已取得的回應，若提供則不再發送請求
 
         Returns:
-            BeautifulSoup: 解析後的 HTML 內容
+            bytes: 網頁原始內容
 
         Raises:
             TableError: 當網頁請求失敗時
-
-        Example:
-            >>> table = class_table("https://example.com/table.html")
-            >>> soup = table.get_soup()
         """
         try:
-            response = requests.get(self.url, timeout=10)
+            if response is None:
+                TNFSHClassTable._count_request()
+                response = requests.get(self.url, timeout=10)
             response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
+            self.etag = response.headers.get("ETag")
+            self.last_modified = response.headers.get("Last-Modified")
+            self.fetched = True
+        except Exception as e:
+            raise self.TableError(f"網頁請求失敗: {str(e)}")
+        if self.page_cache is not None:
+            try:
+                self.page_cache.put(self.url, response.content, self.etag, self.last_modified)
+            except OSError as e:
+                print(f"寫入網頁快取失敗: {e}")
+        return response.content
+
+    def revalidate(self) -> Optional[TNFSHClassTable]:
+        """以 If-None-Match / If-Modified-Since 向伺服器確認課表是否有更新
+
+        Returns:
+            Optional[TNFSHClassTable]: 若伺服器回應 304 則回傳 None，否則回傳以新內容建立的課表物件
+
+        Raises:
+            TableError: 當網頁請求失敗時
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        try:
+            TNFSHClassTable._count_request()
+            response = requests.get(self.url, headers=headers, timeout=10)
         except Exception as e:
             raise self.TableError(f"網頁請求失敗: {str(e)}")
+        if response.status_code == 304:
+            return None
+        return TNFSHClassTable(self.target, response=response, page_cache=self.page_cache)
+
+    # 以下為原本以 BeautifulSoup 多階段解析的實作，
+    # 保留給 soup_table 等除錯屬性使用，並作為 TimetableExtractor 的對照組
 
     def _get_last_update(self) -> str:
         """
@@ -584,14 +1270,10 @@ class TNFSHClassTable:
 
         lesson_names = []
         lesson_times = []
-        import re
-        re_pattern = r'(\d{2})(\d{2})'
-        re_sub = r'\1:\2'
         for lesson_row in self.regular_soup_table.find_all('tr'):
             lesson_row = lesson_row.find_all('td')
             lesson_name = lesson_row[0].text.strip().replace("\n", "").replace("\r", "")
-            lesson_time = [re.sub(re_pattern, re_sub, time.replace(" ","")) 
-                           for time in lesson_row[1].text.strip().replace("\n", "").replace("\r", "").split("｜")]
+            lesson_time = list(_lesson_times(lesson_row[1].text))
             lesson_names.append(str(lesson_name))
             lesson_times.append(lesson_time)
 
@@ -686,135 +1368,93 @@ class TNFSHClassTable:
         #print_format(result, "json")
         return result
 
-    def _get_transpose_table(self) -> List[List[Dict[str, Dict[str, str]]]]:
-        table = self.table
-        return [list(row) for row in zip(*table)]
-
     def _get_event_description(self, target: Dict[str, str]) -> str:
-        def _get_a_href(url: str, text: str) -> str:
-            return f'<a href="{url}">{text}</a>'
-
-        def _get_new_wiki_teacher_links_and_name(teacher_name: str) -> List[Tuple[str, str]]:
-            """取得新竹園 Wiki 教師連結列表，返回 (URL, 名稱) 的列表"""
-            wiki_base_url = "https://tnfshwiki.tfcis.org"
-            Index = NewWikiTeacherIndex.get_instance()
-            teacher_data = Index.reverse_index
-            #print_format(Index.teacher_index)
-            # 先直接搜尋完全匹配的教師名稱
-            if teacher_name in teacher_data:
-                teacher_info_list = teacher_data[teacher_name]
-                return [(wiki_base_url + teacher_info_list["url"], teacher_name)]
-
-            # 若無完全匹配，搜尋包含教師名稱的項目
-            partial_matches = [
-                (wiki_base_url + "/" + info_list["url"], name) 
-                for name, info_list in teacher_data.items()
-                if teacher_name in name
-            ]
-            #print(teacher_name)
-            #print_format(teacher_data)
-            if partial_matches:
-                return partial_matches
-            else:
-                # 如果還是找不到，嘗試直接生成 URL 並檢查是否有效
-                wiki_base_url = "https://tnfshwiki.tfcis.org"
-                teacher_url = f"{wiki_base_url}/{teacher_name}"
-                try:
-                    response = requests.head(teacher_url, timeout=5)
-                    if response.status_code == 200:
-                        partial_matches.append((teacher_url, teacher_name))
-                except requests.RequestException:
-                    pass
+        """取得匯出事件的描述，由 event_descriptions 快取，不發送任何請求
 
-            return partial_matches
+        Args:
+            target (Dict[str, str]): 該格的 {教師或班級名稱: 課表連結}
+        """
+        return event_descriptions.get(self.type, self.target, self.url, target)
 
-        description = []
-        tnfsh_official_url = "https://www.tnfsh.tn.edu.tw"
-        tnfsh_lesson_information_url = "https://www.tnfsh.tn.edu.tw/latestevent/index.aspx?Parser=22,4,25"
-        
-        def _get_class_event_description(self, target):
-            if target and target != {"": ""}:  # 如果有教師資訊
-                # 課表連結
-                table_links = []
-                for teacher_name, teacher_link in target.items():
-                    teacher_url = f"http://w3.tnfsh.tn.edu.tw/deanofstudies/course/{teacher_link}"
-                    table_links.append(f"{_get_a_href(teacher_url, f'{teacher_name}-課表')}")
-                description.append(f"教師課表連結： {' | '.join(table_links)}")
-                description.append(
-                    f"本班課表連結： {_get_a_href(self.url, f'{self.target}-課表')}"
-                )
-
-                # 竹園wiki連結
-                wiki_links = []
-                for teacher_name in target.keys():
-                    new_wiki_links = _get_new_wiki_teacher_links_and_name(teacher_name)
-                    if new_wiki_links:
-                        wiki_links.extend(
-                            [_get_a_href(link, f"{name}-wiki") for link, name in new_wiki_links]
-                        )
-                if wiki_links:
-                    description.append(f"新竹園wiki： {' | '.join(wiki_links)}")
-                else:
-                    description.append("新竹園wiki： 無相關資料")
+    @staticmethod
+    def semester_window(today: Optional[datetime] = None) -> Tuple[datetime, datetime, int]:
+        """取得匯出行事曆的時間範圍
 
+        Args:
+            today (datetime, optional): 基準日，預設為今天
 
-            else:
-                description.append("教師： 無相關資料")
-                description.append(
-                    f"本班課表連結： {_get_a_href(self.url, f'{self.target}-課表')}"
-                )
-            description.append("")
-            description.append(
-                f"南一中官網： {_get_a_href(tnfsh_official_url, '南一中官網')}"
-                f"\n南一中官網-課程資訊： {_get_a_href(tnfsh_lesson_information_url, '教學進度、總體計畫、多元選修等等')}"
-            )
-            
-            return "\n".join(description)
-        def _get_teacher_event_description(self, target):
-            if target and target != {"": ""}:  # 如果有教師資訊
-                # 課表連結
-                table_links = []
+        Returns:
+            Tuple[datetime, datetime, int]: (本週一, 學期結束日, 重複週數)
+        """
+        from datetime import timedelta
+        today = today or datetime.today()
+        monday = today - timedelta(days=today.weekday())
+        # 學期的上課日曆每學期只建立一次
+        calendar = semester_calendar(today)
+        target_date = datetime.combine(calendar.end, datetime.min.time())
+        return monday, target_date, calendar.weeks_from(monday.date())
 
-                
-                for class_code, class_link in target.items():
-                    class_url = f"http://w3.tnfsh.tn.edu.tw/deanofstudies/course/{class_link}"
-                    table_links.append(f"{_get_a_href(class_url, f'{class_code}-課表')}")
-                description.append(f"任課班級課表連結： {' | '.join(table_links)}")
-                
-                description.append(
-                    f"任課老師課表連結： {_get_a_href(self.url, f'{self.target}-課表')}"
-                )
-            else:
-                description.append("班級： 無相關資料")
-                description.append(
-                    f"任教老師課表連結： {_get_a_href(self.url, f'{self.target}-課表')}"
-                )
-            
-            description.append("")
-            description.append(
-                f"南一中官網： {_get_a_href(tnfsh_official_url, '南一中官網')}"
-                f"\n南一中官網-課程資訊： {_get_a_href(tnfsh_lesson_information_url, '教學進度、總體計畫、多元選修等等')}"
-            )
-            
-            return "\n".join(description)
-        target = target
-        if self.type == "class":
-            return _get_class_event_description(self, target)
-        elif self.type == "teacher":
-            return _get_teacher_event_description(self, target)
+    def lessons_on(self, day: Union[datetime, date]) -> List[Tuple[str, str, Optional[datetime], Optional[datetime]]]:
+        """取得某一天的課程
 
-    def _export_to_json(self, filepath: Optional[str] = None) -> str:
-        """將課表資料匯出為JSON格式
-        
         Args:
-            filepath (str, optional): 輸出檔案路徑，若未指定則自動生成
-            
+            day (date): 日期
+
         Returns:
-            str: 實際儲存的檔案路徑
-            
-        Raises:
-            Exception: 當檔案寫入失敗時
+            List[Tuple[str, str, Optional[datetime], Optional[datetime]]]: 依節次排列的 (節次名稱, 課程名稱, 開始, 結束)，
+                空堂的課程名稱為空字串；週末或不在學期內時回傳空 list
+        """
+        if isinstance(day, datetime):
+            day = day.date()
+        slot = semester_calendar(day).slot(day)
+        if slot is None:
+            return []
+        _, weekday = slot
+        schedule = self.bell_schedule
+        grid = self.grid
+        lessons = []
+        for period in range(min(grid.periods, len(schedule))):
+            subject, _ = grid.course(period, weekday)
+            start, end = schedule.at(day, period) or (None, None)
+            lessons.append((schedule.names[period], subject, start, end))
+        return lessons
+
+    @property
+    def data_version(self) -> str:
+        """課表內容的雜湊，內容相同的課表有相同的版本
+
+        依 grid 與 lessons 物件記住結果，匯出快取每次查詢不需要重新序列化整張課表；
+        grid 或 lessons 被換成其他物件時重新計算。
+        """
+        grid, lessons, last_update = self.grid, self.lessons, self.last_update
+        memo = self.__dict__.get("_data_version")
+        if memo is not None and memo[0] is grid and memo[1] is lessons and memo[2] == last_update:
+            return memo[3]
+        data = [self.target, self.url, last_update, lessons, grid.to_nested()]
+        version = hashlib.sha1(json.dumps(data, ensure_ascii=False).encode("utf-8")).hexdigest()
+        self._data_version = (grid, lessons, last_update, version)
+        return version
+
+    def sync_event_sequences(self) -> int:
+        """以目前的課表內容更新 event_sequences，內容改變的格子 SEQUENCE 會遞增
+
+        同一個物件的內容沒有改變時不會重新比對。屬於舊世代的物件只讀取紀錄：
+        新世代發布時 install_snapshot() 已經比對過，切換前開始的匯出若再以舊內容比對，
+        同一格的 SEQUENCE 會在新舊內容之間來回遞增。
+
+        Returns:
+            int: event_sequences.version(target)，可作為快取鍵的一部分
         """
+        if self.generation is not None and self.generation != data_generations.current().number:
+            return event_sequences.version(self.target)
+        data_version = self.data_version
+        if getattr(self, "_synced_data_version", None) != data_version:
+            event_sequences.update(self.target, slot_fingerprints(self.grid, self.lessons))
+            self._synced_data_version = data_version
+        return event_sequences.version(self.target)
+
+    def _render_json(self) -> bytes:
+        """將課表資料轉為 JSON 格式的 bytes"""
         data: Dict[str, Any] = {
             "metadata": {
                 "object": self.target,
@@ -827,80 +1467,239 @@ class TNFSHClassTable:
                 "table": self.table
             }
         }
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+    def _render_csv(self) -> bytes:
+        """將課表轉為 Google Calendar 格式的 CSV bytes（UTF-8 BOM）"""
+        import csv
+        from datetime import timedelta
+        buffer = io.StringIO(newline='')
+        fieldnames = [
+            "Subject", 
+            "Start Date", 
+            "Start Time", 
+            "End Time", 
+            "Description", 
+            "Location", 
+            "Repeat"
+        ]
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+        writer.writeheader()
+
+        # 計算本週一的日期
+        monday, _, _ = self.semester_window()
+
+        # 修改巢狀迴圈順序：先遍歷節次，再遍歷星期
+        grid = self.grid
+        schedule = self.bell_schedule
+        for lesson_index in range(grid.periods):
+            for day_index, cell_id in enumerate(grid.row(lesson_index)):
+                lesson_name, teacher = grid.decode(cell_id)
+                if lesson_name == "":
+                    continue
+                
+                try:
+                    current_date = monday + timedelta(days=day_index)
+                    
+                    start_datetime, end_datetime = self._lesson_datetimes(schedule, current_date, lesson_index)
+                    
+                    # 設定每週重複(但repeat不能用在google calendar)
+                    repeat_rule = ("FREQ=WEEKLY;"
+                                "COUNT=52;"
+                                "BYDAY=MO,TU,WE,TH,FR;"
+                                "WKST=MO"
+                    )  # 重複52週（一年）
+                                                
+                    writer.writerow({
+                        "Subject": lesson_name,
+                        "Start Date": start_datetime.strftime("%m/%d/%Y"),
+                        "Start Time": start_datetime.strftime("%I:%M %p"),
+                        "End Time": end_datetime.strftime("%I:%M %p"),
+                        "Description": self._get_event_description(teacher),
+                        "Location": "701台南市東區民族路一段1號",
+                        "Repeat": repeat_rule
+                    })
+                except (IndexError, KeyError, ValueError) as e:
+                    print(f"警告：處理課程資料時發生錯誤: {e}")
+                    continue
+        return buffer.getvalue().encode("utf-8-sig")
+
+    @staticmethod
+    def _lesson_datetimes(schedule: BellSchedule, day: datetime, lesson_index: int) -> Tuple[datetime, datetime]:
+        """取得某天第 lesson_index 節的上下課時間
+
+        Raises:
+            IndexError: 節次時間表中沒有此節
+            ValueError: 節次時間無法解析
+        """
+        if lesson_index >= len(schedule):
+            raise IndexError(f"節次時間表中沒有第 {lesson_index + 1} 節")
+        times = schedule.at(day.date(), lesson_index)
+        if times is None:
+            raise ValueError(f"無法解析 {schedule.names[lesson_index]} 的節次時間")
+        return times
+
+    def _calendar_events(self) -> List[CalendarEvent]:
+        """依節次、星期的順序產生每格課程的每週重複事件"""
+        from datetime import timedelta
+
+        # 計算本週一的日期和到目標日期的週數
+        monday, _, weeks = self.semester_window()
+        weekday_map = {
+            0: 'MO',
+            1: 'TU',
+            2: 'WE',
+            3: 'TH',
+            4: 'FR'
+        }
+
+        self.sync_event_sequences()
+        events = []
+        grid = self.grid
+        schedule = self.bell_schedule
+        for lesson_index in range(grid.periods):
+            for day_index, cell_id in enumerate(grid.row(lesson_index)):
+                lesson_name, teacher = grid.decode(cell_id)
+                if lesson_name == "":
+                    continue
+
+                try:
+                    current_date = monday + timedelta(days=day_index)
+
+                    start_datetime, end_datetime = self._lesson_datetimes(schedule, current_date, lesson_index)
+
+                    sequence, stamp = event_sequences.get(self.target, day_index + 1, lesson_index + 1)
+                    # 只在特定星期重複到目標日期
+                    events.append(CalendarEvent(
+                        summary=lesson_name,
+                        start=start_datetime,
+                        end=end_datetime,
+                        byday=weekday_map[day_index],
+                        count=weeks,
+                        description=self._get_event_description(teacher),
+                        location='701台南市東區民族路一段1號',
+                        uid=event_uid(self.target, day_index + 1, lesson_index + 1),
+                        sequence=sequence,
+                        stamp=stamp,
+                    ))
+                except (IndexError, KeyError, ValueError) as e:
+                    print(f"警告：處理課程資料時發生錯誤: {e}")
+                    continue
+        return events
+
+    def _render_ics(self, filename: Optional[str] = None) -> bytes:
+        """將課表轉為 ICS 格式的 bytes，以 new_backend.ics 的範本直接序列化
 
+        Args:
+            filename (str, optional): 寫入 PRODID 的檔名，預設為 "{type}_{target}.ics"
+        """
+        if filename is None:
+            filename = f"{self.type}_{self.target}.ics"
+        return serialize_calendar(f'-//{filename}_台南一中課表//TW', self._calendar_events())
+
+    def _render_ics_with_icalendar(self, filename: Optional[str] = None) -> bytes:
+        """以 icalendar 產生與 _render_ics 相同的內容，作為測試與效能比較的基準"""
+        from icalendar import Calendar, Event
+        if filename is None:
+            filename = f"{self.type}_{self.target}.ics"
+
+        # 建立日曆
+        cal = Calendar()
+        cal.add('prodid', f'-//{filename}_台南一中課表//TW')
+        cal.add('version', '2.0')
+        for calendar_event in self._calendar_events():
+            event = Event()
+            event.add('summary', calendar_event.summary)
+            event.add('dtstart', calendar_event.start)
+            event.add('dtend', calendar_event.end)
+            event.add('dtstamp', calendar_event.stamp)
+            event.add('uid', calendar_event.uid)
+            event.add('sequence', calendar_event.sequence)
+            event.add('location', calendar_event.location)
+            event.add('description', calendar_event.description)
+            event.add('rrule', {
+                'freq': 'weekly',
+                'count': calendar_event.count,
+                'byday': [calendar_event.byday]
+            })
+            cal.add_component(event)
+        return cal.to_ical()
+
+    def render(self, type: str) -> bytes:
+        """在記憶體中匯出課表，不寫入任何檔案
+
+        Args:
+            type (str): "json"、"csv" 或 "ics"
+
+        Returns:
+            bytes: 檔案內容
+
+        Raises:
+            ValueError: 不支援的格式
+        """
+        type = type.lower()
+        if type == "json":
+            return self._render_json()
+        if type == "csv":
+            try:
+                return self._render_csv()
+            except Exception as e:
+                raise Exception(f"匯出 CSV 時發生未預期的錯誤: {e}")
+        if type == "ics":
+            try:
+                return self._render_ics()
+            except ImportError:
+                raise Exception("請安裝 icalendar 套件: poetry add icalendar")
+            except Exception as e:
+                raise Exception(f"匯出 ICS 時發生未預期的錯誤: {e}")
+        raise ValueError(f'沒有模式: {type}')
+
+    def iter_export(self, type: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """以 chunk_size 為單位逐段產生匯出內容，內容由 export_cache 快取
+
+        Args:
+            type (str): "json"、"csv" 或 "ics"
+            chunk_size (int): 每段的大小
+
+        Yields:
+            bytes: 檔案內容的一段
+        """
+        data = export_cache.get(self, type)
+        for offset in range(0, len(data), chunk_size):
+            yield data[offset:offset + chunk_size]
+
+    def _export_to_json(self, filepath: Optional[str] = None) -> str:
+        """將課表資料匯出為JSON格式
+        
+        Args:
+            filepath (str, optional): 輸出檔案路徑，若未指定則自動生成
+            
+        Returns:
+            str: 實際儲存的檔案路徑
+            
+        Raises:
+            Exception: 當檔案寫入失敗時
+        """
         # 如果未指定檔案路徑，則自動生成
         if filepath is None:
             filepath = f"{self.type}_{self.target}.json"
 
         # 寫入 JSON 檔案
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(filepath, 'wb') as f:
+                f.write(self._render_json())
             return filepath
         except Exception as e:
             raise Exception(f"Failed to write JSON file: {str(e)}")
 
     def _export_to_csv(self, filepath: str = None) -> str:
         """將課表匯出為 Google Calendar 格式的 CSV"""
-        import csv
-        from datetime import timedelta
         if filepath is None:
             filepath = f"{self.type}_{self.target}.csv"
         try:
-            with open(filepath, 'w', newline='', encoding='utf-8-sig') as csvfile:
-                fieldnames = [
-                    "Subject", 
-                    "Start Date", 
-                    "Start Time", 
-                    "End Time", 
-                    "Description", 
-                    "Location", 
-                    "Repeat"
-                ]
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-
-                # 計算本週一的日期
-                today = datetime.today()
-                monday = today - timedelta(days=today.weekday())
-
-                # 修改巢狀迴圈順序：先遍歷節次，再遍歷星期
-                for lesson_index, lessons in enumerate(self.table):
-                    lesson_index_name = list(self.lessons.keys())[lesson_index]
-                    for day_index, day in enumerate(lessons):
-                        if not day:
-                            continue
-                        lesson_name = list(day.keys())[0]
-                        if lesson_name == "":
-                            continue
-                        teacher = list(day.values())[0]
-                        start_time, end_time = self.lessons[lesson_index_name]
-                        
-                        try:
-                            current_date = monday + timedelta(days=day_index)
-                            
-                            start_datetime = datetime.strptime(f"{current_date.date()} {start_time}", "%Y-%m-%d %H:%M")
-                            end_datetime = datetime.strptime(f"{current_date.date()} {end_time}", "%Y-%m-%d %H:%M")
-                            
-                            # 設定每週重複(但repeat不能用在google calendar)
-                            repeat_rule = ("FREQ=WEEKLY;"
-                                        "COUNT=52;"
-                                        "BYDAY=MO,TU,WE,TH,FR;"
-                                        "WKST=MO"
-                            )  # 重複52週（一年）
-                                                        
-                            writer.writerow({
-                                "Subject": lesson_name,
-                                "Start Date": start_datetime.strftime("%m/%d/%Y"),
-                                "Start Time": start_datetime.strftime("%I:%M %p"),
-                                "End Time": end_datetime.strftime("%I:%M %p"),
-                                "Description": self._get_event_description(teacher),
-                                "Location": "701台南市東區民族路一段1號",
-                                "Repeat": repeat_rule
-                            })
-                        except (IndexError, KeyError) as e:
-                            print(f"警告：處理課程資料時發生錯誤: {e}")
-                            continue
+            data = self._render_csv()
+            with open(filepath, 'wb') as csvfile:
+                csvfile.write(data)
             return filepath
         
         except IOError as e:
@@ -912,80 +1711,11 @@ class TNFSHClassTable:
         """將課表匯出為 ICS 格式檔案"""
         if filepath is None:
             filepath = f"{self.type}_{self.target}.ics"
-        from datetime import timedelta
         try:
-            from icalendar import Calendar, Event
-            
-            # 建立日曆
-            cal = Calendar()
-            cal.add('prodid', f'-//{filepath}_台南一中課表//TW')
-            cal.add('version', '2.0')
-            
-            # 計算本週一的日期和目標結束日期
-            today = datetime.today()
-            monday = today - timedelta(days=today.weekday())
-            
-            # 計算到目標日期的週數
-            if today.month >= 8:  # 下學期
-                target_date = datetime(today.year + 1, 2, 1)
-            else:  # 上學期
-                target_date = datetime(today.year, 7, 1)
-            
-            weeks = ((target_date - monday).days // 7) + 1
-            
-            # 遍歷課表
-            for lesson_index, lessons in enumerate(self.table):
-                lesson_index_name = list(self.lessons.keys())[lesson_index]
-                for day_index, day in enumerate(lessons):
-                    if not day:
-                        continue
-                        
-                    lesson_name = list(day.keys())[0]
-                    if lesson_name == "":
-                        continue
-                    #print(lesson_name)
-                    teacher = list(day.values())[0]
-                    start_time, end_time = self.lessons[lesson_index_name]
-                    
-                    try:
-                        current_date = monday + timedelta(days=day_index)
-                        
-                        start_datetime = datetime.strptime(f"{current_date.date()} {start_time}", "%Y-%m-%d %H:%M")
-                        end_datetime = datetime.strptime(f"{current_date.date()} {end_time}", "%Y-%m-%d %H:%M")
-                        
-                        # 建立事件
-                        event = Event()
-                        event.add('summary', lesson_name)
-                        event.add('dtstart', start_datetime)
-                        event.add('dtend', end_datetime)
-                        event.add('location', '701台南市東區民族路一段1號')
-                        event.add('description', self._get_event_description(teacher))
-                        #event.add('description', "hi")
-
-                        # 設定重複規則 - 只在特定星期重複到目標日期
-                        weekday_map = {
-                            0: 'MO',
-                            1: 'TU',
-                            2: 'WE',
-                            3: 'TH',
-                            4: 'FR'
-                        }
-                        event.add('rrule', {
-                            'freq': 'weekly',
-                            'count': weeks,
-                            'byday': [weekday_map[day_index]]
-                        })
-                        
-                        
-                        cal.add_component(event)
-                        
-                    except (IndexError, KeyError) as e:
-                        print(f"警告：處理課程資料時發生錯誤: {e}")
-                        continue
-                        
+            data = self._render_ics(filepath)
             # 寫入 ICS 檔案
             with open(filepath, 'wb') as f:
-                f.write(cal.to_ical())
+                f.write(data)
             return filepath
             
         except ImportError:
@@ -1007,4 +1737,178 @@ class TNFSHClassTable:
         elif type == "ics":
             filepath = self._export_to_ics(filepath)
         
-        return filepath
\ No newline at end of file
+        return filepath
+
+
+class TNFSHClassTableCache:
+    """TNFSHClassTable 的共享快取（執行緒安全）
+
+    以 target 為鍵，使用 LRU 策略限制數量，並在超過 TTL 後以條件式請求
+    (If-None-Match / If-Modified-Since) 向學校伺服器重新驗證。
+    同一 target 的同時請求只會觸發一次抓取，其餘請求等待其結果。
+    若指定 snapshot (TimetableSnapshot) 或 page_cache (TieredPageCache)，未命中時會依序
+    從其中載入已解析的課表，新抓取的網頁會寫入 page_cache。
+    快取項目以 (世代編號, target) 為鍵，世代的快照優先於建構時指定的 snapshot；
+    發布新世代後舊世代的項目仍可供進行中的請求使用，直到 prune() 移除。
+
+    Attributes:
+        hits (int): 直接命中快取的次數
+        misses (int): 快取中沒有資料的次數（包含從 snapshot 或 page_cache 載入）
+        page_cache_loads (int): 未命中時從 snapshot 或 page_cache 載入而不需抓取的次數
+        revalidations (int): 重新驗證後伺服器回應 304 的次數
+        refreshes (int): 重新驗證後取得新內容的次數
+        errors (int): 重新驗證失敗而沿用舊資料的次數
+        evictions (int): 因容量限制被淘汰的次數
+    """
+    def __init__(self, max_size: int = 256, ttl: int = 600, page_cache: Any = None, snapshot: Any = None) -> None:
+        self._entries: OrderedDict[Tuple[int, str], Tuple[TNFSHClassTable, float]] = OrderedDict()
+        self._max_size = max_size
+        self._ttl = ttl  # Time To Live in seconds
+        self.page_cache = page_cache
+        self.snapshot = snapshot
+        self._lock = threading.Lock()
+        self._target_locks: Dict[Tuple[int, str], threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.page_cache_loads = 0
+        self.revalidations = 0
+        self.refreshes = 0
+        self.errors = 0
+        self.evictions = 0
+
+    def _lookup(self, key: Tuple[int, str]) -> Optional[Tuple[TNFSHClassTable, float]]:
+        """取得快取項目，命中時順便更新 LRU 順序（需持有 self._lock）"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: Tuple[int, str], table: TNFSHClassTable) -> None:
+        """存入快取項目並淘汰最久未使用的項目（需持有 self._lock）"""
+        self._entries[key] = (table, monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            oldest_key, _ = self._entries.popitem(last=False)
+            self._target_locks.pop(oldest_key, None)
+            self.evictions += 1
+
+    def get(self, target: str, generation: Optional[DataGeneration] = None) -> TNFSHClassTable:
+        """取得指定班級或老師的課表物件
+
+        Args:
+            target (str): 班級代碼或老師名稱
+            generation (DataGeneration, optional): 使用的資料世代，預設為 data_generations 目前的世代
+
+        Returns:
+            TNFSHClassTable: 課表物件
+
+        Raises:
+            ValueError: 找不到班級或老師時
+        """
+        generation = generation or data_generations.current()
+        key = (generation.number, target)
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None and monotonic() - entry[1] <= self._ttl:
+                self.hits += 1
+                return entry[0]
+            target_lock = self._target_locks.setdefault(key, threading.Lock())
+
+        with target_lock:
+            # 等待期間可能已由其他執行緒更新
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None and monotonic() - entry[1] <= self._ttl:
+                    self.hits += 1
+                    return entry[0]
+
+            if entry is None:
+                table = None
+                for source in (generation.snapshot or self.snapshot, self.page_cache):
+                    if table is None and source is not None:
+                        table = TNFSHClassTable.from_cached(target, source, self.page_cache)
+                loaded = table is not None
+                if table is None:
+                    table = TNFSHClassTable(target, page_cache=self.page_cache)
+                table.generation = generation.number
+                with self._lock:
+                    self.misses += 1
+                    self.page_cache_loads += loaded
+                    self._store(key, table)
+                return table
+
+            stale_table = entry[0]
+            if not stale_table.fetched:
+                # 尚未抓取過的物件沒有需要重新驗證的內容
+                with self._lock:
+                    self.hits += 1
+                    self._store(key, stale_table)
+                return stale_table
+            try:
+                new_table = stale_table.revalidate()
+            except TNFSHClassTable.TableError as e:
+                print(f"重新驗證 {target} 課表失敗，沿用快取資料: {e}")
+                with self._lock:
+                    self.errors += 1
+                return stale_table
+
+            with self._lock:
+                if new_table is None:
+                    self.revalidations += 1
+                    table = stale_table
+                else:
+                    self.refreshes += 1
+                    table = new_table
+                    table.generation = generation.number
+                self._store(key, table)
+            return table
+
+    def invalidate(self, target: Optional[str] = None) -> None:
+        """清除指定 target 在所有世代的快取，若未指定則清除全部"""
+        with self._lock:
+            if target is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[1] == target]:
+                    del self._entries[key]
+
+    def prune(self, generation: Optional[DataGeneration] = None) -> int:
+        """移除比指定世代（預設為目前的世代）更舊的項目
+
+        已取得課表物件的請求不受影響；仍在使用舊世代的請求之後會重新從舊世代的快照載入。
+
+        Returns:
+            int: 移除的項目數
+        """
+        number = (generation or data_generations.current()).number
+        with self._lock:
+            stale = [key for key in self._entries if key[0] < number]
+            for key in stale:
+                del self._entries[key]
+                self._target_locks.pop(key, None)
+            return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        """取得快取統計資訊
+
+        Returns:
+            Dict[str, int]: 包含 size、hits、misses、page_cache_loads、revalidations、refreshes、errors、evictions、
+            目前的世代編號 generation，以及全程序實際向學校伺服器發出的課表請求數 server_requests
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "page_cache_loads": self.page_cache_loads,
+                "revalidations": self.revalidations,
+                "refreshes": self.refreshes,
+                "errors": self.errors,
+                "evictions": self.evictions,
+                "generation": data_generations.current().number,
+                "server_requests": TNFSHClassTable.request_count,
+            }
+
+
+# 全域快取實例
+class_table_cache = TNFSHClassTableCache()
@@ -1,5 +1,8 @@
 from enum import auto
-from tnfsh_class_table.backend import TNFSHClassTableIndex, TNFSHClassTable, NewWikiTeacherIndex
+from tnfsh_class_table.backend import TNFSHClassTableIndex, TNFSHClassTable, NewWikiTeacherIndex, TimetableGrid, class_table_cache, export_cache
+from tnfsh_class_table.new_backend.bulk_export import export_all
+from tnfsh_class_table.new_backend.feed import mount_calendar_feed
+from tnfsh_class_table.new_backend.merged import MergedCalendar
 from tnfsh_class_table.models import CourseInfo, SwapStep, SwapSinglePath, SwapPaths, URLMap
 from typing import Any, List, Union, Optional, Literal
 import gradio as gr
@@ -10,6 +13,8 @@ import asyncio
 from bs4 import BeautifulSoup, Comment
 from datetime import datetime
 import os
+import re
+import tempfile
 import concurrent.futures
 from google.genai import types
 
@@ -219,6 +224,32 @@ class GradioInterface:
                     inputs=[save_grade, save_class, save_format],
                     outputs=[save_file, save_message, file_info],
                 )
+
+                gr.Markdown("## 下載全部課表")
+                gr.Markdown("一次下載全校所有班級與老師的課表壓縮檔")
+                with gr.Row():
+                    save_all_formats = gr.CheckboxGroup(choices=self.export_formats, value=["ICS"], label="格式")
+                    save_all_btn = gr.Button("下載全部課表")
+                save_all_file = gr.File(label="下載檔案")
+                save_all_message = gr.Textbox(label="訊息")
+                save_all_btn.click(
+                    fn=self._save_all_files,
+                    inputs=[save_all_formats],
+                    outputs=[save_all_file, save_all_message],
+                )
+
+                gr.Markdown("## 合併多個課表")
+                gr.Markdown("將多個班級或老師的課表合併成一個 ICS 行事曆，相同時段的相同課程只會出現一次")
+                with gr.Row():
+                    merge_targets = gr.Textbox(label="班級或老師", placeholder="例如：307, 顏永進")
+                    merge_btn = gr.Button("下載合併課表")
+                merge_file = gr.File(label="下載檔案")
+                merge_message = gr.Textbox(label="訊息")
+                merge_btn.click(
+                    fn=self._save_merged_file,
+                    inputs=[merge_targets],
+                    outputs=[merge_file, merge_message],
+                )
             
             with gr.Tab("顯示老師課表") as teacher_tab:
                 
@@ -323,7 +354,7 @@ class GradioInterface:
                 gr.Markdown("""
                 - **AI 助手**：對話查詢(1)調課與代課方式(2)竹園Wiki(3)老師或班級課表。
                 - **顯示班級課表**：選擇年級和班級，顯示該班級的課表。
-                - **下載班級課表**：選擇年級和班級，下載該班級的課表檔案。
+                - **下載班級課表**：選擇年級和班級，下載該班級的課表檔案，也可以一次下載全校課表的壓縮檔。
                 - **顯示老師課表**：選擇科目與老師，顯示該老師的課表。
                 - **下載老師課表**：選擇科目與老師，下載該老師的課表檔案。
                 """)
@@ -380,7 +411,7 @@ class GradioInterface:
             
 
             # 啟動介面
-            demo.launch(
+            app, local_url, share_url = demo.launch(
                 share=True,
                 #inbrowser=True, 
                 show_error=True,
@@ -388,6 +419,24 @@ class GradioInterface:
                 prevent_thread_lock=True
             )
 
+            # 掛載可訂閱的 ICS 行事曆，例如 webcal://<host>/307.ics
+            mount_calendar_feed(app)
+
+    @staticmethod
+    def _format_grid_rows(grid: TimetableGrid) -> list[list[str]]:
+        """將精簡課表轉為 Dataframe 的列，每格為「課程名稱\n教師或班級」"""
+        rows = []
+        periods, _ = grid.shape
+        for period in range(periods):
+            formatted_row = []
+            for cell_id in grid.row(period):
+                course_name, counterparts = grid.decode(cell_id)
+                teachers = ", ".join(counterparts.keys())
+                cell_text = f"{course_name}\n{teachers}" if teachers else course_name
+                formatted_row.append(cell_text)
+            rows.append(formatted_row)
+        return rows
+
     def _display_class_table(self, grade: str, class_num: str) -> tuple[gr.Dataframe, str]:
         """顯示班級課表內容
 
@@ -401,19 +450,8 @@ class GradioInterface:
         try:
             grade_dict = {"高一": "1", "高二": "2", "高三": "3"}
             target = grade_dict[grade] + class_num
-            table = TNFSHClassTable(target)
-            rows = []
-            for period in table.table:
-                formatted_row = []
-                for course in period:
-                    if isinstance(course, dict):
-                        course_name = list(course.keys())[0]
-                        teachers = ", ".join(list(course[course_name].keys()))
-                        cell_text = f"{course_name}\n{teachers}" if teachers else course_name
-                        formatted_row.append(cell_text)
-                    else:
-                        formatted_row.append("")
-                rows.append(formatted_row)
+            table = class_table_cache.get(target)
+            rows = self._format_grid_rows(table.grid)
         
             headers = ["星期一", "星期二", "星期三", "星期四", "星期五"]
             message = f"成功載入 {grade}{class_num}班 的課表"
@@ -431,19 +469,8 @@ class GradioInterface:
             tuple[gr.Dataframe, str]: (課表資料框, 訊息)
         """
         try:
-            table = TNFSHClassTable(teacher)
-            rows = []
-            for period in table.table:
-                formatted_row = []
-                for course in period:
-                    if isinstance(course, dict):
-                        course_name = list(course.keys())[0]
-                        teachers = ", ".join(list(course[course_name].keys()))
-                        cell_text = f"{course_name}\n{teachers}" if teachers else course_name
-                        formatted_row.append(cell_text)
-                    else:
-                        formatted_row.append("")
-                rows.append(formatted_row)
+            table = class_table_cache.get(teacher)
+            rows = self._format_grid_rows(table.grid)
             
             headers = ["星期一", "星期二", "星期三", "星期四", "星期五"]
             message = f"成功載入 {teacher} 老師的課表"
@@ -466,8 +493,9 @@ class GradioInterface:
             grade_dict = {"高一": "1", "高二": "2", "高三": "3"}
             target = grade_dict[grade] + class_num
             format = format
-            table = TNFSHClassTable(target)
-            file_path = table.export(format)
+            table = class_table_cache.get(target)
+            # 由匯出快取寫入獨立的暫存檔，同時下載的使用者不會互相覆蓋
+            file_path = export_cache.export_file(table, format)
             message = f"成功儲存 {grade}{class_num}班 的課表"
             file_info = self._get_file_info(table, format)
             return gr.File(value=file_path), message, file_info
@@ -485,15 +513,64 @@ class GradioInterface:
             tuple[gr.File, str, str]: (檔案物件, 訊息, 檔案資訊)
         """
         try:
-            table = TNFSHClassTable(teacher)
+            table = class_table_cache.get(teacher)
             format = format.lower()
-            file_path = table.export(format)
+            file_path = export_cache.export_file(table, format)
             message = f"成功儲存 {teacher} 老師的課表"
             file_info = self._get_file_info(table, format)
             return gr.File(value=file_path), message, file_info
         except Exception as e:
             return gr.File(), f"錯誤: {str(e)}", ""
 
+    def _save_merged_file(self, targets: str) -> tuple[gr.File, str]:
+        """將多個課表合併為一個 ICS 檔案
+
+        Args:
+            targets (str): 以逗號、頓號或空白分隔的班級代碼或老師名稱
+
+        Returns:
+            tuple[gr.File, str]: (檔案物件, 訊息)
+        """
+        try:
+            names = [name for name in re.split(r"[,，、\s]+", targets) if name]
+            if not names:
+                return gr.File(), "錯誤: 請輸入至少一個班級或老師"
+            calendar = MergedCalendar(names)
+            os.makedirs(export_cache.directory, exist_ok=True)
+            file_path = os.path.join(tempfile.mkdtemp(dir=export_cache.directory), calendar.filename)
+            with open(file_path, "wb") as file:
+                file.write(calendar.render())
+            return gr.File(value=file_path), f"成功合併 {'、'.join(calendar.targets)} 的課表"
+        except Exception as e:
+            return gr.File(), f"錯誤: {str(e)}"
+
+    def _save_all_files(self, formats: List[str], progress: gr.Progress = gr.Progress()) -> tuple[gr.File, str]:
+        """由課表快照匯出全校課表的 zip 壓縮檔
+
+        Args:
+            formats (List[str]): 檔案格式
+            progress (gr.Progress): Gradio 的進度條
+
+        Returns:
+            tuple[gr.File, str]: (檔案物件, 訊息)
+        """
+        try:
+            if not formats:
+                return gr.File(), "錯誤: 請至少選擇一種格式"
+            os.makedirs(export_cache.directory, exist_ok=True)
+            file_path = os.path.join(tempfile.mkdtemp(dir=export_cache.directory), "全校課表.zip")
+            report = export_all(
+                file_path,
+                formats=formats,
+                progress=lambda state: progress(state.fraction, desc=f"已匯出 {state.done}/{state.total} 份課表"),
+            )
+            message = f"成功匯出 {report.summary()}"
+            if report.errors:
+                message += "\n" + "\n".join(f"{target}: {error}" for target, error in report.errors.items())
+            return gr.File(value=file_path), message
+        except Exception as e:
+            return gr.File(), f"錯誤: {str(e)}"
+
     def _get_file_info(self, table: TNFSHClassTable, format: str) -> str:
         """產生檔案相關資訊文字"""
         info = []
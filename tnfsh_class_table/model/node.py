@@ -0,0 +1,61 @@
+"""排課路徑上課程節點的精簡快照
+
+tnfsh_timetable_core 的 CourseNode 是 pydantic 模型，經由 teachers / classes 參照整張排課圖，
+== 比較會遞迴比較教師與班級的所有課程。輪調、對調的結果在進入 scheduling_cache 前
+先轉為此處的 CourseNode，只保留名稱與時段，比較與雜湊都是常數時間，
+同一批路徑中相同的節點也只建立一份。
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from tnfsh_class_table.new_backend.models import TimeSlot
+
+
+@dataclass(frozen=True, slots=True)
+class CourseNode:
+    """排課圖中一個課程節點的快照
+
+    Attributes:
+        time (TimeSlot): 上課時段
+        teachers (Tuple[str, ...]): 教師名稱，順序與原節點相同
+        classes (Tuple[str, ...]): 班級代碼，順序與原節點相同
+        is_free (bool): 是否為空堂
+        subject (str): 課程名稱（不參與比較）
+    """
+    time: TimeSlot
+    teachers: Tuple[str, ...]
+    classes: Tuple[str, ...]
+    is_free: bool = False
+    subject: str = field(default="", compare=False)
+
+    @classmethod
+    def from_core(cls, node: Any) -> CourseNode:
+        """由 tnfsh_timetable_core 的 CourseNode 建立"""
+        return cls(
+            TimeSlot.from_core(node.time),
+            tuple(teacher.teacher_name for teacher in node.teachers.values()),
+            tuple(class_node.class_code for class_node in node.classes.values()),
+            node.is_free,
+            node.subject,
+        )
+
+    @classmethod
+    def paths_from_core(cls, paths: Iterable[Iterable[Any]]) -> List[Tuple[CourseNode, ...]]:
+        """轉換 scheduling_rotation / scheduling_swap 的所有路徑，相同的原節點共用同一個快照"""
+        converted: Dict[int, CourseNode] = {}
+        result = []
+        for path in paths:
+            nodes = []
+            for node in path:
+                snapshot = converted.get(id(node))
+                if snapshot is None:
+                    snapshot = converted[id(node)] = cls.from_core(node)
+                nodes.append(snapshot)
+            result.append(tuple(nodes))
+        return result
+
+    @property
+    def teacher(self) -> Optional[str]:
+        """第一位教師，空堂時為 None"""
+        return self.teachers[0] if self.teachers else None
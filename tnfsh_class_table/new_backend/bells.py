@@ -0,0 +1,117 @@
+"""全校共用的節次時間表（鐘聲表）
+
+每份課表都有 {節次名稱: [開始時間, 結束時間]} 的節次時間，但全校只有少數幾種不同的鐘聲表。
+bell_schedules 依內容保存解析後的 BellSchedule，相同內容的課表共用同一個物件，
+時間只在第一次出現時轉為 datetime.time；匯出行事曆與「下一節」查詢都直接使用它，
+不需要每格、每次匯出都呼叫 strptime。
+
+Example:
+    >>> schedule = bell_schedules.get(table.lessons)
+    >>> schedule.at(date(2025, 9, 1), 0)  # 第一節的 (開始, 結束) datetime
+    >>> schedule.next_period(time(10, 5))
+"""
+from __future__ import annotations
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+LessonKey = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+def _parse_time(value: str) -> Optional[time]:
+    """將 "08:10" 轉為 time，格式不符時回傳 None"""
+    try:
+        return datetime.strptime(value, "%H:%M").time()
+    except (TypeError, ValueError):
+        return None
+
+
+class BellSchedule:
+    """解析後的一份鐘聲表（唯讀，由 BellScheduleRegistry 建立並共用）
+
+    Attributes:
+        names (Tuple[str, ...]): 依順序排列的節次名稱
+        times (Tuple[Optional[Tuple[time, time]], ...]): 各節的 (開始, 結束)，無法解析時為 None
+    """
+    __slots__ = ("key", "names", "times", "_starts", "_timed")
+
+    def __init__(self, key: LessonKey) -> None:
+        self.key = key
+        self.names = tuple(name for name, _ in key)
+        times = []
+        for _, values in key:
+            start, end = (_parse_time(value) for value in (values + ("", ""))[:2])
+            times.append((start, end) if start is not None and end is not None else None)
+        self.times = tuple(times)
+        # 依開始時間排序的 (開始時間, 節次索引)，供 bisect 查詢
+        self._timed = sorted((value[0], index) for index, value in enumerate(self.times) if value is not None)
+        self._starts = [start for start, _ in self._timed]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def as_dict(self) -> Dict[str, List[str]]:
+        """還原為 {節次名稱: [開始時間, 結束時間]}，每次回傳新的 dict"""
+        return {name: list(values) for name, values in self.key}
+
+    def at(self, day: date, period: int) -> Optional[Tuple[datetime, datetime]]:
+        """第 period 節（從 0 起算）在 day 的 (開始, 結束)，沒有此節或時間無法解析時回傳 None"""
+        if not 0 <= period < len(self.times) or self.times[period] is None:
+            return None
+        start, end = self.times[period]
+        return datetime.combine(day, start), datetime.combine(day, end)
+
+    def period_at(self, moment: time) -> Optional[int]:
+        """moment 正在上的節次索引，下課時間回傳 None"""
+        position = bisect_right(self._starts, moment) - 1
+        if position < 0:
+            return None
+        index = self._timed[position][1]
+        return index if moment < self.times[index][1] else None
+
+    def next_period(self, moment: time) -> Optional[int]:
+        """moment 之後第一個開始的節次索引，當天已經沒有課時回傳 None"""
+        position = bisect_left(self._starts, moment)
+        if position >= len(self._timed):
+            return None
+        if self._starts[position] == moment:
+            position += 1
+            if position >= len(self._timed):
+                return None
+        return self._timed[position][1]
+
+    def __repr__(self) -> str:
+        return f"BellSchedule({self.as_dict()!r})"
+
+
+class BellScheduleRegistry:
+    """依內容共用 BellSchedule 的登錄表（執行緒安全）"""
+    def __init__(self) -> None:
+        self._schedules: Dict[LessonKey, BellSchedule] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(lessons: Dict[str, List[str]]) -> LessonKey:
+        return tuple((name, tuple(values)) for name, values in lessons.items())
+
+    def get(self, lessons: Dict[str, List[str]]) -> BellSchedule:
+        """取得 lessons 對應的鐘聲表，內容相同時回傳同一個物件"""
+        key = self.key(lessons)
+        schedule = self._schedules.get(key)
+        if schedule is None:
+            with self._lock:
+                schedule = self._schedules.get(key)
+                if schedule is None:
+                    schedule = self._schedules[key] = BellSchedule(key)
+        return schedule
+
+    def __len__(self) -> int:
+        return len(self._schedules)
+
+
+# 全域鐘聲表
+bell_schedules = BellScheduleRegistry()
@@ -0,0 +1,286 @@
+"""課表網頁的分層快取（記憶體 → 磁碟）
+
+第一層是程序內以 LRU 限制數量的記憶體快取；第二層是磁碟上的快取，目錄結構如下：
+
+    pages/<sha1(url)>.json          網址對應的內容雜湊、ETag、Last-Modified 與抓取時間
+    raw/<sha256>.html               原始網頁，以內容雜湊命名，相同內容只存一份
+    parsed/v<版本>/<sha256>.json    TimetableExtractor 的解析結果
+
+解析結果以 TimetableExtractor.PARSER_VERSION 分版本存放，解析器更新時只有解析層失效，
+原始網頁仍可直接重新解析，不需要重新抓取。所有檔案都先寫入暫存檔再以 os.replace 取代。
+
+Example:
+    >>> cache = TieredPageCache()
+    >>> cache.put_crawl(asyncio.run(CourseSiteCrawler().crawl()))
+    >>> timetables = TieredPageCache().load_all()  # 新的程序不需連網即可重建所有課表
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urljoin
+
+from tnfsh_class_table.backend import TimetableExtractor, TimetableGrid, TNFSHClassTableIndex
+from tnfsh_class_table.new_backend.crawler import BASE_URL, INDEX_PAGES, CrawlResult
+
+CACHE_DIR = Path(os.getenv("TNFSH_CACHE_DIR", Path(__file__).resolve().parent / "page_cache"))
+
+
+@dataclass(frozen=True)
+class PageRecord:
+    """網址目前對應的網頁內容"""
+    url: str
+    sha256: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+
+@dataclass(frozen=True)
+class ParsedPage:
+    """TimetableExtractor 的解析結果，課表以 TimetableGrid 表示"""
+    lessons: Dict[str, List[str]]
+    grid: TimetableGrid
+    last_update: str
+
+
+class TieredPageCache:
+    """原始網頁與解析後課表的分層快取（執行緒安全）
+
+    Args:
+        root (Union[str, Path]): 磁碟快取的根目錄，預設為環境變數 TNFSH_CACHE_DIR 或模組旁的 page_cache
+        memory_size (int): 記憶體層最多保留的網址數
+        parser_version (int): 解析結果的版本，預設為 TimetableExtractor.PARSER_VERSION
+
+    Attributes:
+        memory_hits (int): 記憶體層命中的次數
+        disk_hits (int): 從磁碟解析層載入的次數
+        parses (int): 從磁碟上的原始網頁重新解析的次數
+        misses (int): 兩層都沒有資料的次數
+    """
+    def __init__(
+        self,
+        root: Union[str, Path] = CACHE_DIR,
+        memory_size: int = 256,
+        parser_version: int = TimetableExtractor.PARSER_VERSION,
+    ) -> None:
+        self.root = Path(root)
+        self.parser_version = parser_version
+        self._pages_dir = self.root / "pages"
+        self._raw_dir = self.root / "raw"
+        self._parsed_dir = self.root / "parsed" / f"v{parser_version}"
+        for directory in (self._pages_dir, self._raw_dir, self._parsed_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        # {url: {"record": PageRecord, "content": bytes, "parsed": ParsedPage}}，欄位可能缺少
+        self._memory: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._memory_size = memory_size
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.parses = 0
+        self.misses = 0
+
+    def _memory_get(self, url: str, field: str) -> Any:
+        """取得記憶體層的欄位，命中時更新 LRU 順序"""
+        with self._lock:
+            entry = self._memory.get(url)
+            if entry is None or field not in entry:
+                return None
+            self._memory.move_to_end(url)
+            return entry[field]
+
+    def _memory_put(self, url: str, replace: bool = False, **fields: Any) -> None:
+        """寫入記憶體層的欄位，replace 為 True 時捨棄該網址原有的所有欄位"""
+        with self._lock:
+            entry = self._memory.get(url)
+            if entry is None or replace:
+                entry = self._memory[url] = {}
+            entry.update(fields)
+            self._memory.move_to_end(url)
+            while len(self._memory) > self._memory_size:
+                self._memory.popitem(last=False)
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        """寫入同目錄的暫存檔後再取代，讀取者不會看到寫到一半的檔案"""
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _record_path(self, url: str) -> Path:
+        return self._pages_dir / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+
+    def _raw_path(self, sha256: str) -> Path:
+        return self._raw_dir / f"{sha256}.html"
+
+    def _parsed_path(self, sha256: str) -> Path:
+        return self._parsed_dir / f"{sha256}.json"
+
+    def put(self, url: str, content: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None) -> PageRecord:
+        """存入網頁原始內容，內容有變動時該網址舊的解析結果自然不再使用
+
+        Returns:
+            PageRecord: 網址目前對應的內容紀錄
+        """
+        sha256 = hashlib.sha256(content).hexdigest()
+        raw_path = self._raw_path(sha256)
+        if not raw_path.exists():
+            self._write_atomic(raw_path, content)
+        record = PageRecord(url, sha256, etag, last_modified, time.time())
+        self._write_atomic(self._record_path(url), json.dumps(asdict(record), ensure_ascii=False).encode("utf-8"))
+
+        previous = self._memory_get(url, "record")
+        parsed = self._memory_get(url, "parsed") if previous and previous.sha256 == sha256 else None
+        fields = {"record": record, "content": content}
+        if parsed is not None:
+            fields["parsed"] = parsed
+        self._memory_put(url, replace=True, **fields)
+        return record
+
+    def put_crawl(self, result: CrawlResult) -> int:
+        """存入 CourseSiteCrawler 抓取到的所有網頁（包含索引頁面）
+
+        抓取時取得的 ETag 與 Last-Modified 一併存入，之後的重新驗證可用條件式請求
+
+        Returns:
+            int: 存入的網頁數
+        """
+        base_url = result.index.get("base_url", BASE_URL)
+        for url, content in result.pages.items():
+            etag, last_modified = result.validators.get(url, (None, None))
+            self.put(urljoin(base_url, url), content, etag, last_modified)
+        return len(result.pages)
+
+    def record(self, url: str) -> Optional[PageRecord]:
+        """取得網址目前對應的內容紀錄"""
+        record = self._memory_get(url, "record")
+        if record is not None:
+            return record
+        try:
+            data = json.loads(self._record_path(url).read_bytes())
+        except FileNotFoundError:
+            return None
+        record = PageRecord(**data)
+        self._memory_put(url, record=record)
+        return record
+
+    def content(self, url: str) -> Optional[bytes]:
+        """取得網頁原始內容"""
+        content = self._memory_get(url, "content")
+        if content is not None:
+            return content
+        record = self.record(url)
+        if record is None:
+            return None
+        try:
+            content = self._raw_path(record.sha256).read_bytes()
+        except FileNotFoundError:
+            return None
+        self._memory_put(url, content=content)
+        return content
+
+    def parsed(self, url: str) -> Optional[ParsedPage]:
+        """取得解析後的課表，依序查詢記憶體層、磁碟解析層，最後由磁碟上的原始網頁重新解析"""
+        parsed = self._memory_get(url, "parsed")
+        if parsed is not None:
+            with self._lock:
+                self.memory_hits += 1
+            return parsed
+
+        record = self.record(url)
+        if record is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        parsed_path = self._parsed_path(record.sha256)
+        try:
+            data = json.loads(parsed_path.read_bytes())
+        except FileNotFoundError:
+            data = None
+        if data is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            content = self.content(url)
+            if content is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+            lessons, table, last_update = TimetableExtractor.extract(content)
+            data = {"lessons": lessons, "table": table, "last_update": last_update}
+            self._write_atomic(parsed_path, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+            with self._lock:
+                self.parses += 1
+
+        parsed = ParsedPage(data["lessons"], TimetableGrid.from_nested(data["table"]), data["last_update"])
+        self._memory_put(url, parsed=parsed)
+        return parsed
+
+    def urls(self) -> List[str]:
+        """列出磁碟上所有已快取的網址"""
+        return [json.loads(path.read_bytes())["url"] for path in self._pages_dir.glob("*.json")]
+
+    def load_index(self, base_url: str = BASE_URL) -> Optional[Dict[str, Any]]:
+        """由快取中的索引頁面重建與 TNFSHClassTableIndex.index 相同結構的索引
+
+        Returns:
+            Optional[Dict[str, Any]]: 任一索引頁面不在快取中時回傳 None
+        """
+        index: Dict[str, Any] = {"base_url": base_url, "root": "course.html"}
+        for data_type, url in INDEX_PAGES.items():
+            content = self.content(urljoin(base_url, url))
+            if content is None:
+                return None
+            index[data_type] = {"url": url, "data": TNFSHClassTableIndex._parse_index_page(content)}
+        return index
+
+    def load_all(self, base_url: str = BASE_URL) -> Dict[str, ParsedPage]:
+        """不連網，由磁碟快取重建所有班級與老師的課表
+
+        Returns:
+            Dict[str, ParsedPage]: {班級或老師: 解析後的課表}，索引不在快取中時回傳空字典
+        """
+        index = self.load_index(base_url)
+        if index is None:
+            return {}
+        targets: Dict[str, str] = {}
+        # 先老師後班級，同名時班級覆蓋老師，與 _build_reverse_index 相同
+        for data_type in ("teacher", "class"):
+            for entries in index[data_type]["data"].values():
+                targets.update(entries)
+        result = {}
+        for target, url in targets.items():
+            parsed = self.parsed(urljoin(base_url, url)) if url else None
+            if parsed is not None:
+                result[target] = parsed
+        return result
+
+    def clear_memory(self) -> None:
+        """清除記憶體層，磁碟上的資料不受影響"""
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """取得快取統計資訊"""
+        with self._lock:
+            return {
+                "memory_size": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "parses": self.parses,
+                "misses": self.misses,
+            }
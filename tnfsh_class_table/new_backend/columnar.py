@@ -0,0 +1,154 @@
+"""全校課表的長格式欄位資料
+
+由課表快照直接產生每一格課程一列（多位教師或班級時每位一列）的資料表，供教務處做授課負擔、
+教室使用等分析，不需要把各班的 CSV 貼在一起。
+
+欄位: target, type, weekday (1-5), period (1 起算), subject, counterpart, start, end
+
+快照中的課表格、課程格與字串都是整數陣列，此模組以 numpy 一次展開全部課表，
+字串欄位以快照的字串 ID 作為 pandas Categorical 的代碼，不需要逐列建立 dict。
+Parquet 需要 pyarrow；沒有安裝時可輸出 CSV。
+
+Example:
+    >>> frame = timetable_frame()  # pandas.DataFrame
+    >>> export_columnar("全校課表.parquet")
+    >>> export_columnar("全校課表.csv", format="csv")
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import IO, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from tnfsh_class_table.backend import data_generations
+from tnfsh_class_table.new_backend.snapshot import NONE_ID, TARGET_FIELDS, TYPES, SnapshotError, TimetableSnapshot, install_snapshot
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+COLUMNS = ("target", "type", "weekday", "period", "subject", "counterpart", "start", "end")
+FORMATS = ("parquet", "csv")
+
+
+def _field(targets: np.ndarray, name: str) -> np.ndarray:
+    return targets[:, TARGET_FIELDS.index(name)].astype(np.int64)
+
+
+def _categorical(codes: np.ndarray, categories: pd.Index) -> pd.Categorical:
+    """以字串 ID 建立 Categorical，NONE_ID 轉為缺失值"""
+    codes = np.where(codes == NONE_ID, -1, codes)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def slot_columns(snapshot: TimetableSnapshot) -> Dict[str, np.ndarray]:
+    """將快照展開為長格式的整數欄位
+
+    Returns:
+        Dict[str, np.ndarray]: target、subject、counterpart、start、end 為字串 ID，type 為 TYPES 的索引，
+            weekday 與 period 從 1 起算
+    """
+    targets = np.frombuffer(snapshot._targets, dtype=np.uint32).reshape(-1, len(TARGET_FIELDS))
+    grids = np.frombuffer(snapshot._grids, dtype=np.uint32).astype(np.int64)
+    cell_offsets = np.frombuffer(snapshot._cell_offsets, dtype=np.uint32).astype(np.int64)
+    cell_data = np.frombuffer(snapshot._cell_data, dtype=np.uint32).astype(np.int64)
+    lessons = np.frombuffer(snapshot._lessons, dtype=np.uint32).astype(np.int64).reshape(-1, 3)
+
+    # 每一個課表格: 所屬課表與在課表中的位置
+    weekdays = _field(targets, "weekdays")
+    sizes = _field(targets, "periods") * weekdays
+    owner = np.repeat(np.arange(len(targets)), sizes)
+    local = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    cells = grids[np.repeat(_field(targets, "grid_offset"), sizes) + local]
+    period = local // weekdays[owner]
+    weekday = local % weekdays[owner]
+
+    # 每一個課程格展開為 max(教師數, 1) 列，空堂為 0 列
+    cell_starts = cell_offsets[:-1]
+    counterparts = (cell_offsets[1:] - cell_starts - 1) // 2
+    subjects = cell_data[cell_starts]
+    rows_per_cell = np.where(subjects == 0, 0, np.maximum(counterparts, 1))
+
+    repeats = rows_per_cell[cells]
+    slot = np.repeat(np.arange(len(cells)), repeats)
+    nth = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    cell = cells[slot]
+    has_counterpart = nth < counterparts[cell]
+    counterpart = np.where(has_counterpart, cell_data[np.minimum(cell_starts[cell] + 1 + 2 * nth, len(cell_data) - 1)], NONE_ID)
+
+    # 節次時間: 超出節次表的格子沒有時間
+    row_owner = owner[slot]
+    row_period = period[slot]
+    has_time = row_period < _field(targets, "lesson_count")[row_owner]
+    lesson = np.where(has_time, _field(targets, "lessons_offset")[row_owner] + row_period, 0)
+    return {
+        "target": _field(targets, "name")[row_owner],
+        "type": _field(targets, "type")[row_owner],
+        "weekday": (weekday[slot] + 1).astype(np.uint8),
+        "period": (row_period + 1).astype(np.uint8),
+        "subject": subjects[cell],
+        "counterpart": counterpart,
+        "start": np.where(has_time, lessons[lesson, 1], NONE_ID) if len(lessons) else np.full(len(slot), NONE_ID),
+        "end": np.where(has_time, lessons[lesson, 2], NONE_ID) if len(lessons) else np.full(len(slot), NONE_ID),
+    }
+
+
+def timetable_frame(snapshot: Optional[TimetableSnapshot] = None) -> pd.DataFrame:
+    """全校課表的長格式 DataFrame，字串欄位為 Categorical
+
+    Args:
+        snapshot (TimetableSnapshot, optional): 課表快照，預設為目前資料世代的快照
+
+    Raises:
+        SnapshotError: 沒有可用的課表快照
+    """
+    snapshot = snapshot or data_generations.current().snapshot or install_snapshot()
+    if snapshot is None:
+        raise SnapshotError("沒有可用的課表快照，請先執行 refresh_snapshot()")
+    columns = slot_columns(snapshot)
+    categories = pd.Index([snapshot.string(i) for i in range(len(snapshot._string_offsets) - 1)], dtype=object)
+    data = {}
+    for name in COLUMNS:
+        if name == "type":
+            data[name] = pd.Categorical.from_codes(columns[name], categories=list(TYPES))
+        elif name in ("weekday", "period"):
+            data[name] = columns[name]
+        else:
+            data[name] = _categorical(columns[name], categories).remove_unused_categories()
+    return pd.DataFrame(data, columns=list(COLUMNS))
+
+
+def export_columnar(
+    destination: Union[str, Path, IO[bytes]],
+    format: str = "parquet",
+    snapshot: Optional[TimetableSnapshot] = None,
+) -> int:
+    """將全校課表寫成單一欄位式檔案
+
+    Args:
+        destination (Union[str, Path, IO[bytes]]): 檔案路徑或可寫入的檔案物件
+        format (str): "parquet" 或 "csv"（UTF-8 with BOM，可直接以 Excel 開啟）
+        snapshot (TimetableSnapshot, optional): 課表快照，預設為目前資料世代的快照
+
+    Returns:
+        int: 寫入的列數
+
+    Raises:
+        ValueError: 不支援的格式
+        ImportError: 輸出 Parquet 但沒有安裝 pyarrow
+        SnapshotError: 沒有可用的課表快照
+    """
+    format = format.lower()
+    if format not in FORMATS:
+        raise ValueError(f'沒有模式: {format}')
+    if format == "parquet" and not HAS_PYARROW:
+        raise ImportError("輸出 Parquet 需要 pyarrow，請執行 pip install pyarrow 或改用 CSV")
+    frame = timetable_frame(snapshot)
+    if format == "parquet":
+        frame.to_parquet(destination, engine="pyarrow", index=False)
+    else:
+        frame.to_csv(destination, index=False, encoding="utf-8-sig")
+    return len(frame)
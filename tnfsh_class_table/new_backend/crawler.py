@@ -0,0 +1,197 @@
+"""台南一中課表網站的非同步爬蟲
+
+一次抓取 _ClassIndex.html、_TeachIndex.html 與所有班級、老師的課表頁面：
+
+    - 共用一個 aiohttp.ClientSession，連線池並保持連線 (keep-alive)
+    - 以 asyncio.Semaphore 限制同時進行的請求數
+    - 同一主機的請求之間保留禮貌間隔
+    - 連線錯誤、逾時、429 與 5xx 以指數退避重試
+
+Example:
+    >>> result = asyncio.run(CourseSiteCrawler().crawl())
+    >>> print(result.report())
+"""
+from __future__ import annotations
+import asyncio
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import aiohttp
+
+from tnfsh_class_table.backend import TNFSHClassTableIndex
+
+BASE_URL = "http://w3.tnfsh.tn.edu.tw/deanofstudies/course/"
+
+# 索引頁面，順序與 TNFSHClassTableIndex 相同
+INDEX_PAGES = {"class": "_ClassIndex.html", "teacher": "_TeachIndex.html"}
+
+# 值得重試的 HTTP 狀態碼
+RETRY_STATUS = frozenset((429, 500, 502, 503, 504))
+
+Validators = Tuple[Optional[str], Optional[str]]  # (ETag, Last-Modified)
+
+
+class CrawlError(Exception):
+    """頁面在重試後仍無法取得"""
+
+
+@dataclass
+class CrawlResult:
+    """一次完整抓取的結果
+
+    Attributes:
+        index (Dict[str, Any]): 與 TNFSHClassTableIndex.index 相同結構的索引
+        targets (Dict[str, str]): {班級或老師: 連結}，同名時班級優先，與反查表一致
+        pages (Dict[str, bytes]): {連結: 網頁原始內容}，包含兩個索引頁面
+        validators (Dict[str, Validators]): {連結: (ETag, Last-Modified)}，之後重新驗證時使用
+        errors (Dict[str, str]): {連結: 錯誤訊息}
+        requests (int): 實際送出的請求數（包含重試）
+        elapsed (float): 總耗時（秒）
+    """
+    index: Dict[str, Any]
+    targets: Dict[str, str] = field(default_factory=dict)
+    pages: Dict[str, bytes] = field(default_factory=dict)
+    validators: Dict[str, Validators] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    requests: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return len(self.pages) / self.elapsed if self.elapsed else 0.0
+
+    def page(self, target: str) -> Optional[bytes]:
+        """取得班級或老師課表頁面的原始內容"""
+        url = self.targets.get(target)
+        return self.pages.get(url) if url else None
+
+    def report(self) -> str:
+        return (f"抓取 {len(self.pages)} 頁，失敗 {len(self.errors)} 頁，共 {self.requests} 次請求，"
+                f"耗時 {self.elapsed:.2f} 秒 ({self.pages_per_second:.1f} 頁/秒)")
+
+
+class CourseSiteCrawler:
+    """抓取整個課表網站的非同步爬蟲
+
+    Args:
+        base_url (str): 課表網站的根目錄
+        concurrency (int): 同時進行的請求數上限，也是連線池大小
+        delay (float): 同一主機兩次請求開始之間的最小間隔（秒）
+        retries (int): 失敗後的重試次數
+        backoff (float): 第一次重試前的等待秒數，之後每次加倍
+        timeout (float): 單次請求的逾時秒數
+    """
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        concurrency: int = 8,
+        delay: float = 0.05,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 10.0,
+    ) -> None:
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.delay = delay
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+    async def crawl(self) -> CrawlResult:
+        """抓取兩個索引頁面，再抓取索引中所有班級與老師的課表頁面"""
+        start = monotonic()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+        self._next_slot: Dict[str, float] = {}
+        self._requests = 0
+
+        result = CrawlResult(index={"base_url": self.base_url, "root": "course.html"})
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            contents = await asyncio.gather(
+                *(self._fetch_into(session, url, result) for url in INDEX_PAGES.values())
+            )
+            for (data_type, url), content in zip(INDEX_PAGES.items(), contents):
+                data = TNFSHClassTableIndex._parse_index_page(content) if content is not None else {}
+                result.index[data_type] = {"url": url, "data": data}
+
+            # 先老師後班級，同名時班級覆蓋老師，與 _build_reverse_index 相同
+            for data_type in ("teacher", "class"):
+                for entries in result.index[data_type]["data"].values():
+                    result.targets.update(entries)
+
+            urls = dict.fromkeys(url for url in result.targets.values() if url)
+            await asyncio.gather(*(self._fetch_into(session, url, result) for url in urls))
+
+        result.requests = self._requests
+        result.elapsed = monotonic() - start
+        return result
+
+    async def _fetch_into(self, session: aiohttp.ClientSession, url: str, result: CrawlResult) -> Optional[bytes]:
+        """抓取頁面並記錄到 result，失敗時記錄錯誤並回傳 None"""
+        try:
+            content, etag, last_modified = await self.fetch(session, url)
+        except CrawlError as e:
+            result.errors[url] = str(e)
+            return None
+        result.pages[url] = content
+        result.validators[url] = (etag, last_modified)
+        return content
+
+    async def fetch(self, session: aiohttp.ClientSession, url: str) -> Tuple[bytes, Optional[str], Optional[str]]:
+        """抓取單一頁面，遇到暫時性錯誤時以指數退避重試
+
+        Returns:
+            Tuple[bytes, Optional[str], Optional[str]]: (內容, ETag, Last-Modified)
+
+        Raises:
+            CrawlError: 當頁面回傳 4xx 或重試後仍失敗時
+        """
+        full_url = urljoin(self.base_url, url)
+        host = urlsplit(full_url).netloc
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+            async with self._semaphore:
+                await self._wait_politely(host)
+                self._requests += 1
+                try:
+                    async with session.get(full_url) as response:
+                        if response.status in RETRY_STATUS:
+                            last_error = f"HTTP {response.status}"
+                            continue
+                        if response.status >= 400:
+                            raise CrawlError(f"{url}: HTTP {response.status}")
+                        content = await response.read()
+                        return content, response.headers.get("ETag"), response.headers.get("Last-Modified")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    last_error = f"{type(e).__name__}: {e}"
+        raise CrawlError(f"{url}: 重試 {self.retries} 次後仍失敗 ({last_error})")
+
+    async def _wait_politely(self, host: str) -> None:
+        """讓同一主機的請求開始時間至少間隔 delay 秒"""
+        if self.delay <= 0:
+            return
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = monotonic()
+            slot = self._next_slot.get(host, now)
+            if slot > now:
+                await asyncio.sleep(slot - now)
+            self._next_slot[host] = max(slot, now) + self.delay
+
+
+async def crawl_course_site(**kwargs: Any) -> CrawlResult:
+    """以 CourseSiteCrawler 抓取整個課表網站，參數同 CourseSiteCrawler"""
+    return await CourseSiteCrawler(**kwargs).crawl()
+
+
+if __name__ == "__main__":
+    result = asyncio.run(crawl_course_site())
+    print(result.report())
+    for url, error in result.errors.items():
+        print(f"失敗 {url}: {error}")
@@ -0,0 +1,250 @@
+"""ICS / CSV 匯出事件描述的共享快取
+
+每個事件的描述包含對象（教師或班級）的課表連結、竹園 Wiki 連結與官網連結，
+只取決於課表類型、課表本身與該格的對象，event_descriptions 以這些資料為鍵讓所有匯出共用。
+backend 在載入時匯入此模組，因此兩個索引類別在使用時才由 backend 匯入。
+
+Example:
+    >>> event_descriptions.get("class", "307", url, {"王小明": "TA01.html"})
+    >>> event_descriptions.probe_pending()  # 背景確認索引中找不到的教師
+"""
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from tnfsh_class_table.new_backend.teachers import TeacherJoin, teacher_joins
+
+
+class EventDescriptionCache:
+    """ICS / CSV 匯出事件描述的共享快取（執行緒安全）
+
+    描述只取決於課表類型、課表本身與該格的對象（教師或班級），以
+    (教師對照表版本, 類型, target, url, 對象) 為鍵快取，所有匯出共用。
+    竹園 Wiki 連結由教師對照表（new_backend.teachers.TeacherJoin）提供。
+
+    匯出時不發送任何請求：索引中找不到的教師先記為待確認，
+    由 probe_pending() 在背景以 HEAD 確認頁面是否存在，確認後的描述才會加上連結。
+    竹園 Wiki 索引尚未載入時以空的索引建立描述，並在背景執行緒載入索引，載入後對照表版本改變、描述重新建立。
+
+    Args:
+        max_size (int): 最多快取的描述數
+        wiki_index (Any, optional): 具有 reverse_index 與 version 屬性的索引，預設為已初始化的 NewWikiTeacherIndex 單例
+        official_index (Any, optional): 具有 index 屬性的官網索引，預設為已初始化的 TNFSHClassTableIndex 單例
+
+    Attributes:
+        hits (int): 命中快取的次數
+        misses (int): 建立描述的次數
+    """
+    WIKI_BASE_URL = "https://tnfshwiki.tfcis.org"
+    OFFICIAL_URL = "https://www.tnfsh.tn.edu.tw"
+    LESSON_INFORMATION_URL = "https://www.tnfsh.tn.edu.tw/latestevent/index.aspx?Parser=22,4,25"
+    COURSE_URL = "http://w3.tnfsh.tn.edu.tw/deanofstudies/course/"
+
+    def __init__(self, max_size: int = 4096, wiki_index: Any = None, official_index: Any = None) -> None:
+        self._descriptions: OrderedDict[Tuple[Any, ...], str] = OrderedDict()
+        self._max_size = max_size
+        self._wiki_index = wiki_index
+        self._official_index = official_index
+        self._join_version: Any = None
+        self._wiki_links: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+        self._probed: Dict[str, bool] = {}  # {教師名稱: 竹園 Wiki 上是否有同名頁面}
+        self._pending: set = set()
+        self._lock = threading.Lock()
+        self._warming: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _a_href(url: str, text: str) -> str:
+        return f'<a href="{url}">{text}</a>'
+
+    def _wiki(self) -> Any:
+        """竹園 Wiki 索引；單例尚未初始化時在背景載入並回傳 None，不讓匯出等待抓取"""
+        if self._wiki_index is not None:
+            return self._wiki_index
+        from tnfsh_class_table.backend import NewWikiTeacherIndex
+        if NewWikiTeacherIndex._initialized:
+            return NewWikiTeacherIndex.get_instance()
+        with self._lock:
+            if self._warming is None or not self._warming.is_alive():
+                self._warming = threading.Thread(
+                    target=NewWikiTeacherIndex.get_instance, name="wiki-index-warm", daemon=True
+                )
+                self._warming.start()
+        return None
+
+    _NO_TEACHERS: Dict[str, Dict[str, str]] = {}
+    _NO_WIKI_TEACHERS: Dict[str, Dict[str, str]] = {}
+
+    def _join(self) -> TeacherJoin:
+        """目前的教師對照表；只使用已載入的索引，尚未載入的一方以空的資料比對，不發送請求"""
+        official = self._official_index
+        if official is None:
+            from tnfsh_class_table.backend import TNFSHClassTableIndex
+            if TNFSHClassTableIndex._initialized:
+                official = TNFSHClassTableIndex.get_instance()
+        teachers = official.index["teacher"]["data"] if official is not None else self._NO_TEACHERS
+        wiki = self._wiki()
+        if wiki is None:
+            return teacher_joins.get(teachers, self._NO_WIKI_TEACHERS, None)
+        return teacher_joins.get(teachers, wiki.reverse_index, wiki.version)
+
+    def _sync_join_version(self, version: Any) -> None:
+        """教師對照表版本變更時捨棄舊的連結與描述（需持有 self._lock）"""
+        if version != self._join_version:
+            self._join_version = version
+            self._wiki_links.clear()
+            self._descriptions.clear()
+
+    def _get_wiki_links(self, teacher_name: str, join: TeacherJoin) -> Tuple[Tuple[str, str], ...]:
+        """取得新竹園 Wiki 教師連結，返回 ((URL, 名稱), ...)（需持有 self._lock）"""
+        links = self._wiki_links.get(teacher_name)
+        if links is not None:
+            return links
+        # 完全相同、別名與部分比對都由教師對照表處理
+        links = join.wiki_links(teacher_name)
+        # 如果還是找不到，使用背景確認過的同名頁面
+        if not links:
+            if self._probed.get(teacher_name):
+                links = ((f"{self.WIKI_BASE_URL}/{teacher_name}", teacher_name),)
+            elif teacher_name not in self._probed:
+                self._pending.add(teacher_name)
+        self._wiki_links[teacher_name] = links
+        return links
+
+    def _build(self, type: str, target: str, url: str, counterparts: Dict[str, str], join: Optional[TeacherJoin]) -> str:
+        """建立事件描述（需持有 self._lock）"""
+        a_href = self._a_href
+        description = []
+        if type == "class":
+            if counterparts and counterparts != {"": ""}:  # 如果有教師資訊
+                # 課表連結
+                table_links = [
+                    a_href(self.COURSE_URL + teacher_link, f"{teacher_name}-課表")
+                    for teacher_name, teacher_link in counterparts.items()
+                ]
+                description.append(f"教師課表連結： {' | '.join(table_links)}")
+                description.append(f"本班課表連結： {a_href(url, f'{target}-課表')}")
+
+                # 竹園wiki連結
+                wiki_links = [
+                    a_href(link, f"{name}-wiki")
+                    for teacher_name in counterparts
+                    for link, name in self._get_wiki_links(teacher_name, join)
+                ]
+                if wiki_links:
+                    description.append(f"新竹園wiki： {' | '.join(wiki_links)}")
+                else:
+                    description.append("新竹園wiki： 無相關資料")
+            else:
+                description.append("教師： 無相關資料")
+                description.append(f"本班課表連結： {a_href(url, f'{target}-課表')}")
+        else:
+            if counterparts and counterparts != {"": ""}:  # 如果有班級資訊
+                table_links = [
+                    a_href(self.COURSE_URL + class_link, f"{class_code}-課表")
+                    for class_code, class_link in counterparts.items()
+                ]
+                description.append(f"任課班級課表連結： {' | '.join(table_links)}")
+                description.append(f"任課老師課表連結： {a_href(url, f'{target}-課表')}")
+            else:
+                description.append("班級： 無相關資料")
+                description.append(f"任教老師課表連結： {a_href(url, f'{target}-課表')}")
+
+        description.append("")
+        description.append(
+            f"南一中官網： {a_href(self.OFFICIAL_URL, '南一中官網')}"
+            f"\n南一中官網-課程資訊： {a_href(self.LESSON_INFORMATION_URL, '教學進度、總體計畫、多元選修等等')}"
+        )
+        return "\n".join(description)
+
+    def get(self, type: str, target: str, url: str, counterparts: Dict[str, str]) -> str:
+        """取得事件描述
+
+        Args:
+            type (str): 課表類型，"class" 時 counterparts 為教師，"teacher" 時為班級
+            target (str): 課表所屬的班級或老師
+            url (str): 課表網址
+            counterparts (Dict[str, str]): {教師或班級名稱: 課表連結}
+
+        Returns:
+            str: 事件描述
+        """
+        if type == "class":
+            join = self._join()
+            version = join.version
+        else:
+            # 老師課表的描述不包含竹園 Wiki 連結，不需要索引
+            version, join = None, None
+        key = (version, type, target, url, tuple(counterparts.items()))
+        with self._lock:
+            if type == "class":
+                self._sync_join_version(version)
+            description = self._descriptions.get(key)
+            if description is not None:
+                self._descriptions.move_to_end(key)
+                self.hits += 1
+                return description
+            description = self._build(type, target, url, counterparts, join)
+            self.misses += 1
+            self._descriptions[key] = description
+            while len(self._descriptions) > self._max_size:
+                self._descriptions.popitem(last=False)
+            return description
+
+    def probe_pending(self, timeout: float = 5) -> List[str]:
+        """以 HEAD 確認待確認的教師在竹園 Wiki 上是否有同名頁面
+
+        Returns:
+            List[str]: 新找到頁面的教師名稱
+        """
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        found = []
+        for teacher_name in pending:
+            try:
+                response = requests.head(f"{self.WIKI_BASE_URL}/{teacher_name}", timeout=timeout)
+                exists = response.status_code == 200
+            except requests.RequestException:
+                continue  # 下次再確認
+            with self._lock:
+                self._probed[teacher_name] = exists
+            if exists:
+                found.append(teacher_name)
+        if found:
+            with self._lock:
+                for teacher_name in found:
+                    self._wiki_links.pop(teacher_name, None)
+                self._descriptions.clear()
+        return found
+
+    def version(self, type: str) -> Any:
+        """目前描述所依據的資料版本，"class" 為 (教師對照表版本, 已確認的頁面數)，"teacher" 為 None"""
+        if type != "class":
+            return None
+        with self._lock:
+            confirmed = sum(self._probed.values())
+        return (self._join().version, confirmed)
+
+    def pending(self) -> List[str]:
+        """列出等待確認的教師名稱"""
+        with self._lock:
+            return sorted(self._pending)
+
+    def stats(self) -> Dict[str, int]:
+        """取得快取統計資訊"""
+        with self._lock:
+            return {
+                "size": len(self._descriptions),
+                "hits": self.hits,
+                "misses": self.misses,
+                "wiki_links": len(self._wiki_links),
+                "pending": len(self._pending),
+            }
+
+
+# 全域事件描述快取
+event_descriptions = EventDescriptionCache()
@@ -0,0 +1,135 @@
+"""匯出內容的共享快取
+
+export_cache 以 (target, 格式, 課表內容版本, 學期時間範圍, 事件描述版本, 事件序號) 為鍵
+保存 TNFSHClassTable.render() 的結果，內容相同的下載只匯出一次，
+export_file() 再把內容寫入各自獨立的暫存目錄。
+
+Example:
+    >>> data = export_cache.get(table, "ics")
+    >>> path = export_cache.export_file(table, "csv")
+"""
+from __future__ import annotations
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from tnfsh_class_table.new_backend.descriptions import event_descriptions
+
+if TYPE_CHECKING:
+    from tnfsh_class_table.backend import TNFSHClassTable
+
+
+class ExportCache:
+    """匯出內容的共享快取（執行緒安全）
+
+    以 (target, 格式, 課表內容版本, 學期時間範圍, 事件描述版本) 為鍵保存 render() 的結果，
+    內容相同的下載只匯出一次。export_file() 把內容寫入獨立的暫存目錄，
+    同時下載同一份課表的使用者不會互相覆蓋檔案。
+
+    Args:
+        max_bytes (int): 快取內容的總大小上限
+        directory (str, optional): 暫存檔的根目錄，預設為系統暫存目錄下的 tnfsh_exports
+        file_ttl (int): 暫存檔保留的秒數
+
+    Attributes:
+        hits (int): 命中快取的次數
+        misses (int): 重新匯出的次數
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, directory: Optional[str] = None, file_ttl: int = 3600) -> None:
+        self._entries: OrderedDict[Tuple[Any, ...], bytes] = OrderedDict()
+        self._size = 0
+        self._max_bytes = max_bytes
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "tnfsh_exports")
+        self._file_ttl = file_ttl
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[Any, ...], threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(table: TNFSHClassTable, type: str) -> Tuple[Any, ...]:
+        """取得匯出內容的快取鍵"""
+        type = type.lower()
+        window = None
+        sequences = None
+        if type in ("csv", "ics"):
+            monday, target_date, _ = table.semester_window()
+            window = (monday.date().isoformat(), target_date.date().isoformat())
+        if type == "ics":
+            sequences = table.sync_event_sequences()
+        return (table.target, type, table.data_version, window, event_descriptions.version(table.type), sequences)
+
+    def get(self, table: TNFSHClassTable, type: str) -> bytes:
+        """取得匯出內容，同一個鍵同時只會匯出一次"""
+        key = self.key(table, type)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            try:
+                with self._lock:
+                    data = self._entries.get(key)
+                    if data is not None:
+                        self.hits += 1
+                        return data
+                data = table.render(type)
+                with self._lock:
+                    self.misses += 1
+                    self._entries[key] = data
+                    self._size += len(data)
+                    while self._size > self._max_bytes and len(self._entries) > 1:
+                        _, evicted = self._entries.popitem(last=False)
+                        self._size -= len(evicted)
+                return data
+            finally:
+                # 匯出失敗時也要移除，否則每個失敗的鍵都會留下一個鎖
+                with self._lock:
+                    if self._key_locks.get(key) is key_lock:
+                        del self._key_locks[key]
+
+    def export_file(self, table: TNFSHClassTable, type: str) -> str:
+        """將匯出內容寫入獨立的暫存目錄，檔名與 export() 相同
+
+        Returns:
+            str: 暫存檔的路徑
+        """
+        data = self.get(table, type)
+        os.makedirs(self.directory, exist_ok=True)
+        self._remove_expired_files()
+        directory = tempfile.mkdtemp(dir=self.directory)
+        filepath = os.path.join(directory, f"{table.type}_{table.target}.{type.lower()}")
+        with open(filepath, 'wb') as f:
+            f.write(data)
+        return filepath
+
+    def _remove_expired_files(self) -> None:
+        """移除超過 file_ttl 的暫存目錄"""
+        now = datetime.now().timestamp()
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.is_dir() and now - entry.stat().st_mtime > self._file_ttl:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            except OSError:
+                continue
+
+    def stats(self) -> Dict[str, int]:
+        """取得快取統計資訊"""
+        with self._lock:
+            return {"size": len(self._entries), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+
+# 全域匯出快取
+export_cache = ExportCache()
@@ -0,0 +1,203 @@
+"""可訂閱的課表 ICS 行事曆
+
+在 Gradio 的 FastAPI 應用程式上掛載 GET /{target}.ics，行事曆軟體可以 webcal:// 訂閱。
+內容直接取自 export_cache 預先產生的 ICS，回應附帶強 ETag 與 Last-Modified，
+定期輪詢的行事曆軟體在課表沒有變動時只會收到 304，不需要重新產生內容。
+
+Last-Modified 取課表的 last_update（學校網站的臺灣時間）與本週一兩者中較晚的時間，
+因為匯出內容的起始週會隨著時間前進。
+
+Example:
+    >>> app, local_url, share_url = demo.launch(prevent_thread_lock=True)
+    >>> mount_calendar_feed(app)  # webcal://<host>/307.ics
+"""
+from __future__ import annotations
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import Request, Response
+
+from tnfsh_class_table.backend import ExportCache, TNFSHClassTable, class_table_cache, export_cache
+
+TAIPEI = timezone(timedelta(hours=8))
+
+
+@dataclass(frozen=True)
+class FeedEntry:
+    """一份行事曆的回應內容"""
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]
+
+    @property
+    def last_modified_header(self) -> Optional[str]:
+        return format_datetime(self.last_modified, usegmt=True) if self.last_modified else None
+
+
+def _parse_last_update(last_update: str) -> Optional[datetime]:
+    """將 "2025/02/03 18:59:34" 形式的臺灣時間轉為 UTC，無法解析時回傳 None"""
+    try:
+        return datetime.strptime(last_update, "%Y/%m/%d %H:%M:%S").replace(tzinfo=TAIPEI).astimezone(timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 是否包含 etag（弱比較，依 RFC 9110 用於 GET 的條件式請求）"""
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+class CalendarFeed:
+    """提供 ICS 訂閱內容與條件式請求的處理
+
+    Args:
+        tables (Any): 提供 get(target) 的課表快取，預設為 class_table_cache
+        exports (ExportCache): 匯出內容的快取，預設為 export_cache
+        max_size (int): 最多記住的 ETag 數
+
+    Attributes:
+        responses (int): 回應完整內容的次數
+        not_modified (int): 回應 304 的次數
+    """
+    def __init__(self, tables: Any = class_table_cache, exports: ExportCache = export_cache, max_size: int = 1024) -> None:
+        self.tables = tables
+        self.exports = exports
+        self._etags: OrderedDict[Tuple[Any, ...], str] = OrderedDict()
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self.responses = 0
+        self.not_modified = 0
+
+    def _lookup(self, target: str) -> Tuple[TNFSHClassTable, Tuple[Any, ...], Optional[str], Optional[datetime]]:
+        """取得課表、匯出內容的快取鍵、已記住的 ETag（沒有時為 None）與 Last-Modified，不產生匯出內容"""
+        table = self.tables.get(target)
+        key = self.exports.key(table, "ics")
+        with self._lock:
+            etag = self._etags.get(key)
+            if etag is not None:
+                self._etags.move_to_end(key)
+
+        monday, _, _ = TNFSHClassTable.semester_window()
+        window_start = monday.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=TAIPEI).astimezone(timezone.utc)
+        last_update = _parse_last_update(table.last_update)
+        last_modified = max(last_update, window_start) if last_update else window_start
+        return table, key, etag, last_modified
+
+    def _body(self, table: TNFSHClassTable, key: Tuple[Any, ...]) -> Tuple[bytes, str]:
+        """取得匯出內容與其 ETag，第一次遇到的快取鍵才計算雜湊並記住"""
+        body = self.exports.get(table, "ics")
+        with self._lock:
+            etag = self._etags.get(key)
+            if etag is None:
+                etag = self._etags[key] = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+                while len(self._etags) > self._max_size:
+                    self._etags.popitem(last=False)
+        return body, etag
+
+    def entry(self, target: str) -> FeedEntry:
+        """取得目前的行事曆內容，ETag 依匯出內容的快取鍵記住，不需每次重新計算雜湊
+
+        Raises:
+            ValueError: 找不到班級或老師時
+        """
+        table, key, _, last_modified = self._lookup(target)
+        body, etag = self._body(table, key)
+        return FeedEntry(body, etag, last_modified)
+
+    def respond(
+        self,
+        target: str,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[str] = None,
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """處理一次請求
+
+        已記住 ETag 的快取鍵在條件式請求成立時直接回應 304，不取得匯出內容；
+        只有需要回應內容或第一次遇到的快取鍵才會取得匯出內容。
+
+        Args:
+            target (str): 班級代碼或老師名稱
+            if_none_match (str, optional): If-None-Match 標頭
+            if_modified_since (str, optional): If-Modified-Since 標頭，只在沒有 If-None-Match 時使用
+
+        Returns:
+            Tuple[int, Dict[str, str], bytes]: (狀態碼, 標頭, 內容)
+        """
+        try:
+            table, key, etag, last_modified = self._lookup(target)
+        except ValueError as e:
+            return 404, {"Content-Type": "text/plain; charset=utf-8"}, str(e).encode("utf-8")
+
+        body = b""
+        fresh = etag is not None and self._fresh(etag, last_modified, if_none_match, if_modified_since)
+        if not fresh:
+            body, etag = self._body(table, key)
+            fresh = self._fresh(etag, last_modified, if_none_match, if_modified_since)
+
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "public, max-age=3600",
+        }
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+        with self._lock:
+            if fresh:
+                self.not_modified += 1
+            else:
+                self.responses += 1
+        if fresh:
+            return 304, headers, b""
+
+        filename = quote(f"{target}.ics")
+        headers["Content-Type"] = "text/calendar; charset=utf-8"
+        headers["Content-Disposition"] = f"inline; filename*=UTF-8''{filename}"
+        return 200, headers, body
+
+    @staticmethod
+    def _fresh(
+        etag: str,
+        last_modified: Optional[datetime],
+        if_none_match: Optional[str],
+        if_modified_since: Optional[str],
+    ) -> bool:
+        """條件式請求是否成立（可回應 304）"""
+        if if_none_match is not None:
+            return _etag_matches(if_none_match, etag)
+        if if_modified_since is not None and last_modified is not None:
+            try:
+                return last_modified.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def stats(self) -> Dict[str, int]:
+        """取得統計資訊"""
+        with self._lock:
+            return {"responses": self.responses, "not_modified": self.not_modified, "etags": len(self._etags)}
+
+
+# 全域行事曆訂閱
+calendar_feed = CalendarFeed()
+
+
+def mount_calendar_feed(app: Any, feed: CalendarFeed = calendar_feed) -> None:
+    """在 FastAPI 應用程式（例如 Gradio launch() 回傳的 app）上加入 GET/HEAD /{target}.ics"""
+    def calendar(target: str, request: Request) -> Response:
+        status, headers, body = feed.respond(
+            target,
+            request.headers.get("if-none-match"),
+            request.headers.get("if-modified-since"),
+        )
+        return Response(content=body, status_code=status, headers=headers)
+
+    app.add_api_route("/{target}.ics", calendar, methods=["GET", "HEAD"], include_in_schema=False)
@@ -0,0 +1,67 @@
+"""資料世代（雙緩衝）
+
+背景更新時先在旁邊建立完整的新資料（例如新的快照），再以 data_generations.publish() 一次切換。
+請求開始時以 data_generations.current() 取得世代並一路使用它，
+class_table_cache、export_cache 與排課快取都以世代編號作為鍵的一部分。
+
+Example:
+    >>> generation = data_generations.current()
+    >>> data_generations.publish(TimetableSnapshot.open(path))
+"""
+from __future__ import annotations
+import threading
+from datetime import datetime
+from typing import Any
+
+
+class DataGeneration:
+    """一個世代的資料，建立後不再變動
+
+    Attributes:
+        number (int): 世代編號，每次發布新資料時遞增
+        snapshot (Any): 此世代的 TimetableSnapshot，None 表示沒有快照
+        created (float): 發布時間（time.time()）
+    """
+    __slots__ = ("number", "snapshot", "created")
+
+    def __init__(self, number: int, snapshot: Any = None, created: float = 0.0) -> None:
+        self.number = number
+        self.snapshot = snapshot
+        self.created = created
+
+    def __repr__(self) -> str:
+        return f"DataGeneration(number={self.number}, snapshot={self.snapshot!r})"
+
+
+class DataGenerations:
+    """全程序共用的資料世代（雙緩衝）
+
+    背景更新時先在旁邊建立完整的新資料（例如新的快照），再以 publish() 一次切換。
+    請求開始時以 current() 取得世代並一路使用它，切換後仍在進行中的請求繼續使用原本的世代；
+    各個快取以世代編號作為鍵的一部分，因此切換時不需要清除快取。
+    """
+    def __init__(self) -> None:
+        self._current = DataGeneration(0)
+        self._lock = threading.Lock()
+
+    def current(self) -> DataGeneration:
+        """取得目前的世代（單一屬性讀取，不需要鎖）"""
+        return self._current
+
+    def publish(self, snapshot: Any = None) -> DataGeneration:
+        """發布新的世代，之後的請求都會使用它
+
+        Args:
+            snapshot (Any): 新世代的 TimetableSnapshot
+
+        Returns:
+            DataGeneration: 新的世代
+        """
+        with self._lock:
+            generation = DataGeneration(self._current.number + 1, snapshot, datetime.now().timestamp())
+            self._current = generation
+        return generation
+
+
+# 全域資料世代
+data_generations = DataGenerations()
@@ -0,0 +1,155 @@
+"""以整數陣列儲存的精簡課表
+
+TimetableGrid 以 array("I") 依 (節次, 星期) 順序存放課程格 ID，
+科目、教師、班級、連結字串與課程格都在全程序共用的 intern 表中只存一份，
+列、欄與轉置都是共用同一陣列的檢視。TNFSHClassTable.grid 與快照中的課表都使用它。
+
+Example:
+    >>> grid = TimetableGrid.from_nested(table)
+    >>> grid.course(0, 2)  # 第一節、星期三
+    ("國文", {"王小明": "TK07.HTML"})
+"""
+from __future__ import annotations
+import threading
+from array import array
+from typing import Any, Dict, List, Tuple
+
+
+class _InternTable:
+    """執行緒安全的 intern 表，將可雜湊的值對應到從 0 開始的小整數 ID"""
+    def __init__(self) -> None:
+        self._ids: Dict[Any, int] = {}
+        self._values: List[Any] = []
+        self._lock = threading.Lock()
+
+    def intern(self, value: Any) -> int:
+        try:
+            return self._ids[value]
+        except KeyError:
+            pass
+        with self._lock:
+            if value not in self._ids:
+                self._ids[value] = len(self._values)
+                self._values.append(value)
+            return self._ids[value]
+
+    def get(self, id_: int) -> Any:
+        return self._values[id_]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class TimetableGrid:
+    """以整數陣列儲存的精簡課表 (節次 × 星期)
+
+    每一格是一個課程格 ID，課程格由 (科目 ID, ((名稱 ID, 連結 ID), ...)) 組成，
+    科目、教師、班級、連結字串與課程格都在全程序共用的 intern 表中只存一份。
+    row()、column() 回傳 memoryview，transpose() 回傳共用同一陣列的轉置檢視，都不複製資料。
+    cells 也可以是其他提供 buffer 的物件（例如 mmap 上的 memoryview），
+    此時由 cell_table.decode() 解讀課程格 ID，而不使用全程序的 intern 表。
+
+    全程序的 intern 表只會增加、不會移除：已建立的課表可能仍在使用舊的 ID，無法安全回收。
+    表的大小等於程序啟動以來出現過的不同字串與課程格數（全校約數千個），只有課表內容改變時才會增加；
+    由快照建立的課表（TimetableSnapshot.grid）使用快照自己的字串表，隨資料世代一起替換，不會增加這兩個表。
+    intern_stats() 可以檢查目前的大小，benchmarks/bench_grid_memory.py 量測每份課表的記憶體用量。
+
+    Example:
+        >>> grid = TimetableGrid.from_nested(table)
+        >>> subject, counterparts = grid.course(0, 2)  # 第一節、星期三
+        >>> ("國文", {"王小明": "TK07.HTML"})
+    """
+    __slots__ = ("cells", "periods", "weekdays", "transposed", "cell_table")
+
+    # 全程序共用的字串表與課程格表
+    strings = _InternTable()
+    course_cells = _InternTable()
+
+    def __init__(self, cells: array, periods: int, weekdays: int, transposed: bool = False, cell_table: Any = None) -> None:
+        self.cells = cells
+        self.periods = periods
+        self.weekdays = weekdays
+        self.transposed = transposed
+        self.cell_table = cell_table  # None 表示使用全程序共用的 intern 表
+
+    @classmethod
+    def intern_stats(cls) -> Dict[str, int]:
+        """全程序 intern 表目前的大小 {"strings": 字串數, "course_cells": 課程格數}"""
+        return {"strings": len(cls.strings), "course_cells": len(cls.course_cells)}
+
+    @classmethod
+    def from_nested(cls, table: List[List[Dict[str, Dict[str, str]]]], weekdays: int = 5) -> TimetableGrid:
+        """由 [[{課程名稱: {教師名稱: 連結}}, ...], ...] 建立精簡課表"""
+        intern = cls.strings.intern
+        cells = array("I")
+        for row in table:
+            for course in row[:weekdays]:
+                subject, counterparts = next(iter(course.items()))
+                cell = (intern(subject), tuple((intern(name), intern(link)) for name, link in counterparts.items()))
+                cells.append(cls.course_cells.intern(cell))
+            # 不足的星期補空堂
+            for _ in range(weekdays - len(row)):
+                cells.append(cls.course_cells.intern((intern(""), ((intern(""), intern("")),))))
+        return cls(cells, len(table), weekdays)
+
+    def decode(self, cell_id: int) -> Tuple[str, Dict[str, str]]:
+        """將課程格 ID 還原為 (課程名稱, {教師或班級名稱: 連結})"""
+        if self.cell_table is not None:
+            return self.cell_table.decode(cell_id)
+        get = self.strings.get
+        subject_id, counterparts = self.course_cells.get(cell_id)
+        return get(subject_id), {get(name_id): get(link_id) for name_id, link_id in counterparts}
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """目前方向的 (列數, 欄數)，未轉置時為 (節次, 星期)"""
+        if self.transposed:
+            return self.weekdays, self.periods
+        return self.periods, self.weekdays
+
+    def row(self, index: int) -> memoryview:
+        """第 index 列的課程格 ID（未轉置時為第 index 節的星期一到五）"""
+        if self.transposed:
+            return self._column(index)
+        return self._row(index)
+
+    def column(self, index: int) -> memoryview:
+        """第 index 欄的課程格 ID（未轉置時為星期 index 的各節）"""
+        if self.transposed:
+            return self._row(index)
+        return self._column(index)
+
+    def _row(self, period: int) -> memoryview:
+        if not 0 <= period < self.periods:
+            raise IndexError(f"節次超出範圍: {period}")
+        start = period * self.weekdays
+        return memoryview(self.cells)[start:start + self.weekdays]
+
+    def _column(self, weekday: int) -> memoryview:
+        if not 0 <= weekday < self.weekdays:
+            raise IndexError(f"星期超出範圍: {weekday}")
+        return memoryview(self.cells)[weekday::self.weekdays]
+
+    def cell(self, row: int, column: int) -> int:
+        """取得目前方向第 row 列、第 column 欄的課程格 ID"""
+        return self.row(row)[column]
+
+    def course(self, row: int, column: int) -> Tuple[str, Dict[str, str]]:
+        """取得目前方向第 row 列、第 column 欄的 (課程名稱, {教師或班級名稱: 連結})"""
+        return self.decode(self.cell(row, column))
+
+    def transpose(self) -> TimetableGrid:
+        """共用同一陣列的轉置檢視"""
+        return TimetableGrid(self.cells, self.periods, self.weekdays, not self.transposed, self.cell_table)
+
+    def to_nested(self) -> List[List[Dict[str, Dict[str, str]]]]:
+        """轉回 [[{課程名稱: {教師或班級名稱: 連結}}, ...], ...] 格式"""
+        rows, _ = self.shape
+        result = []
+        for index in range(rows):
+            row = []
+            for cell_id in self.row(index):
+                subject, counterparts = self.decode(cell_id)
+                row.append({subject: counterparts})
+            result.append(row)
+        return result
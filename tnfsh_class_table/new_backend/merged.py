@@ -0,0 +1,170 @@
+"""合併多個班級或老師課表的個人行事曆
+
+選修課的學生或同時關注多個班級的老師可以把數份課表合併成一個 ICS。
+每份課表的 VEVENT 區塊由 target_events 依匯出快取鍵保存，合併時只需要串接字串；
+加入新的課表只會產生該課表的事件，其他課表沿用快取的區塊。
+
+同一時段、相同課程名稱的事件（例如學生同時加入原班與選修班級）只保留先加入的課表的事件，
+時段相同但課程不同的事件會全部保留，在行事曆上顯示為衝堂。
+
+Example:
+    >>> calendar = MergedCalendar(["307", "顏永進"])
+    >>> calendar.add("308")  # 只產生 308 的事件
+    >>> data = calendar.render()
+"""
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from tnfsh_class_table.backend import ExportCache, TNFSHClassTable, class_table_cache
+from tnfsh_class_table.new_backend.ics import assemble_calendar, serialize_event
+
+SlotKey = Tuple[datetime, datetime, str]  # (開始時間, 結束時間, 課程名稱)
+
+
+@dataclass(frozen=True)
+class TargetEvents:
+    """一份課表序列化後的事件
+
+    Attributes:
+        target (str): 班級代碼或老師名稱
+        key (Tuple[Any, ...]): 產生時的匯出快取鍵，鍵改變表示需要重新產生
+        events (Tuple[Tuple[SlotKey, str], ...]): 依節次、星期排列的 (時段, VEVENT 區塊)
+    """
+    target: str
+    key: Tuple[Any, ...]
+    events: Tuple[Tuple[SlotKey, str], ...]
+
+
+class TargetEventCache:
+    """各課表事件的 LRU 快取（執行緒安全）
+
+    Args:
+        max_size (int): 最多保存的課表數
+
+    Attributes:
+        hits (int): 快取命中次數
+        misses (int): 重新產生事件的次數
+    """
+    def __init__(self, max_size: int = 512) -> None:
+        self._entries: OrderedDict[Tuple[Any, ...], TargetEvents] = OrderedDict()
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, table: TNFSHClassTable) -> TargetEvents:
+        """取得課表的事件，課表內容、學期範圍、事件描述或 SEQUENCE 改變時重新產生"""
+        key = ExportCache.key(table, "ics")
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        events = tuple(
+            ((event.start, event.end, event.summary), serialize_event(event))
+            for event in table._calendar_events()
+        )
+        entry = TargetEvents(table.target, key, events)
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+    def stats(self) -> Dict[str, int]:
+        """取得統計資訊"""
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# 全域課表事件快取
+target_events = TargetEventCache()
+
+
+class MergedCalendar:
+    """多份課表合併而成的行事曆
+
+    Args:
+        targets (Iterable[str]): 依優先順序排列的班級代碼或老師名稱
+        tables (Any): 提供 get(target) 的課表快取，預設為 class_table_cache
+        cache (TargetEventCache): 各課表事件的快取，預設為 target_events
+
+    Raises:
+        ValueError: 找不到班級或老師時
+    """
+    def __init__(
+        self,
+        targets: Iterable[str] = (),
+        tables: Any = class_table_cache,
+        cache: TargetEventCache = target_events,
+    ) -> None:
+        self.tables = tables
+        self.cache = cache
+        self._entries: OrderedDict[str, TargetEvents] = OrderedDict()
+        for target in targets:
+            self.add(target)
+
+    @property
+    def targets(self) -> List[str]:
+        return list(self._entries)
+
+    def add(self, target: str) -> None:
+        """加入一份課表，已加入的課表不受影響
+
+        Raises:
+            ValueError: 找不到班級或老師時
+        """
+        if target not in self._entries:
+            self._entries[target] = self.cache.get(self.tables.get(target))
+
+    def remove(self, target: str) -> None:
+        """移除一份課表"""
+        self._entries.pop(target, None)
+
+    def refresh(self) -> List[str]:
+        """課表有更新時只重新取得該份課表的事件
+
+        Returns:
+            List[str]: 事件有更新的課表
+        """
+        changed = []
+        for target, entry in self._entries.items():
+            table = self.tables.get(target)
+            if ExportCache.key(table, "ics") != entry.key:
+                self._entries[target] = self.cache.get(table)
+                changed.append(target)
+        return changed
+
+    def blocks(self) -> List[str]:
+        """依加入順序排列、去除重複時段後的 VEVENT 區塊"""
+        seen = set()
+        blocks = []
+        for entry in self._entries.values():
+            for slot, block in entry.events:
+                if slot in seen:
+                    continue
+                seen.add(slot)
+                blocks.append(block)
+        return blocks
+
+    def render(self, filename: Optional[str] = None) -> bytes:
+        """產生合併後的 ICS 內容
+
+        Args:
+            filename (str, optional): 寫入 PRODID 的檔名，預設為 "merged_{target}_{target}....ics"
+        """
+        self.refresh()
+        if filename is None:
+            filename = self.filename
+        return assemble_calendar(f'-//{filename}_台南一中課表//TW', self.blocks())
+
+    @property
+    def filename(self) -> str:
+        return f"merged_{'_'.join(self._entries)}.ics"
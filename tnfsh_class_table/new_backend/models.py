@@ -0,0 +1,26 @@
+"""課表資料的精簡模型
+
+熱路徑上使用 __slots__ 的 frozen dataclass 取代 pydantic 模型與巢狀字典。
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+@dataclass(frozen=True, slots=True, order=True)
+class TimeSlot:
+    """上課時段，比較與雜湊只看星期與節次，與 tnfsh_timetable_core 的 StreakTime 相同
+
+    Attributes:
+        weekday (int): 星期幾 (1-5)
+        period (int): 第幾節 (1-8)
+        streak (Optional[int]): 連堂節數
+    """
+    weekday: int
+    period: int
+    streak: Optional[int] = field(default=None, compare=False)
+
+    @classmethod
+    def from_core(cls, time: Any) -> TimeSlot:
+        """由 StreakTime 等具有 weekday、period、streak 屬性的物件建立"""
+        return cls(time.weekday, time.period, time.streak)
@@ -0,0 +1,156 @@
+"""教師名稱的模糊查詢索引
+
+AI 助手與行事曆描述常以不完整或打錯的教師名稱查詢（例如「永進」、「顏永近」），
+原本每次查詢都以 `target in name` 掃過整份反查表。NameIndex 在索引版本第一次使用時
+建立字元 1-gram / 2-gram 的倒排表，之後：
+
+- 完全相同：dict 查詢
+- 包含查詢字串：取查詢字串各個 2-gram 倒排表的交集，再確認子字串
+- 編輯距離：以共同字元數過濾候選，再計算有上限的 Levenshtein 距離
+
+結果依原本反查表的順序排列，與線性掃描的結果相同。
+name_indexes 依來源物件與版本共用 NameIndex，同一份反查表只建立一次。
+
+Example:
+    >>> index = name_indexes.get("wiki", reverse_index, version)
+    >>> index.lookup("永進")
+    ('顏永進',)
+    >>> index.similar("顏永近")
+    ('顏永進',)
+"""
+from __future__ import annotations
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def _grams(name: str) -> Iterable[str]:
+    """name 的所有字元 1-gram 與 2-gram"""
+    yield from name
+    for i in range(len(name) - 1):
+        yield name[i:i + 2]
+
+
+def _distance(a: str, b: str, limit: int) -> int:
+    """a 與 b 的 Levenshtein 距離，超過 limit 時提早回傳 limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char != other),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class NameIndex:
+    """一組名稱的完全、子字串與編輯距離查詢（唯讀，建立後可在執行緒間共用）
+
+    Attributes:
+        names (Tuple[str, ...]): 依原本順序排列的名稱
+    """
+    __slots__ = ("names", "_ids", "_postings")
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self.names: Tuple[str, ...] = tuple(dict.fromkeys(names))
+        self._ids: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        postings: Dict[str, List[int]] = {}
+        for i, name in enumerate(self.names):
+            for gram in set(_grams(name)):
+                postings.setdefault(gram, []).append(i)
+        self._postings: Dict[str, Tuple[int, ...]] = {gram: tuple(ids) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def contains(self, query: str) -> Tuple[str, ...]:
+        """所有包含 query 的名稱（與 `[name for name in names if query in name]` 相同）"""
+        if not query:
+            return self.names
+        grams = [query] if len(query) == 1 else [query[i:i + 2] for i in range(len(query) - 1)]
+        lists = sorted((self._postings.get(gram, ()) for gram in set(grams)), key=len)
+        if not lists[0]:
+            return ()
+        ids = set(lists[0])
+        for other in lists[1:]:
+            ids.intersection_update(other)
+            if not ids:
+                return ()
+        names = self.names
+        # 2-gram 都出現不代表相鄰，長度 3 以上的查詢需要再確認一次
+        return tuple(names[i] for i in sorted(ids) if query in names[i])
+
+    def similar(self, query: str, max_distance: int = 1) -> Tuple[str, ...]:
+        """與 query 的編輯距離不超過 max_distance 的名稱，距離近的在前"""
+        if not query:
+            return ()
+        chars = set(query)
+        # 每次編輯最多讓一個不同的字元消失，至少仍要有一個共同字元
+        required = max(1, len(chars) - max_distance)
+        counts: Dict[int, int] = {}
+        for char in chars:
+            for i in self._postings.get(char, ()):
+                counts[i] = counts.get(i, 0) + 1
+        found = []
+        for i, count in counts.items():
+            if count < required:
+                continue
+            distance = _distance(query, self.names[i], max_distance)
+            if distance <= max_distance:
+                found.append((distance, i))
+        found.sort()
+        return tuple(self.names[i] for _, i in found)
+
+    def lookup(self, query: str, max_distance: int = 1) -> Tuple[str, ...]:
+        """依序嘗試完全相同、包含 query、編輯距離相近，回傳第一個有結果的查詢"""
+        if query in self._ids:
+            return (query,)
+        return self.contains(query) or self.similar(query, max_distance)
+
+    def resolve(self, query: str, max_distance: int = 1) -> Optional[str]:
+        """query 只對應到一個名稱時回傳該名稱，否則回傳 None"""
+        matches = self.lookup(query, max_distance)
+        return matches[0] if len(matches) == 1 else None
+
+
+class NameIndexRegistry:
+    """依來源物件與版本共用 NameIndex 的登錄表（執行緒安全）
+
+    每個名稱（例如 "wiki"、"official"）只保留最新一份索引；來源物件或版本改變時重新建立。
+    登錄表持有來源物件的參考，因此以 `is` 比較不會誤用被回收後重複的 id。
+    """
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[Any, Any, NameIndex]] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def get(self, name: str, source: Iterable[str], version: Any = None) -> NameIndex:
+        """取得 source（名稱的可迭代物件，例如反查表）對應的 NameIndex"""
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] is source and entry[1] == version:
+            return entry[2]
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] is source and entry[1] == version:
+                return entry[2]
+            index = NameIndex(source)
+            self._entries[name] = (source, version, index)
+            self.builds += 1
+        return index
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# 全域名稱索引
+name_indexes = NameIndexRegistry()
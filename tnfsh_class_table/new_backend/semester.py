@@ -0,0 +1,92 @@
+"""學期的上課日曆
+
+匯出行事曆時需要「本週一到學期結束共幾週」，依日期查詢課程時需要「某天是學期中的星期幾」。
+SemesterCalendar 在每個學期第一次使用時列出所有上課日（星期一到五），之後都以 dict 查詢，
+不需要每次匯出或查詢都重新計算學期結束日與週數。
+
+學期範圍：8 到 12 月的學期結束於隔年 2/1，1 到 7 月的學期結束於 7/1，結束日本身不上課；
+週數從學期第一天（或查詢的那個週一）所在的週一起算，到學期結束日前一天所在的那一週為止，
+因此結束日是星期一時（例如 2027/2/1）不會多算結束日所在的那一週。
+TNFSHClassTable.semester_window 原本以 (結束日 - 本週一).days // 7 + 1 計算，
+本週一帶有當下時刻時結果相同，但在午夜整點時會多算結束日所在的那一週。
+
+Example:
+    >>> calendar = semester_calendar(date(2025, 9, 3))
+    >>> calendar.slot(date(2025, 9, 3))  # (週次, 星期索引)
+    (5, 2)
+    >>> calendar.weeks_from(date(2025, 9, 1))
+"""
+from __future__ import annotations
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Union
+
+WEEKDAYS = 5  # 星期一到五
+
+
+class SemesterCalendar:
+    """一個學期的上課日（唯讀，由 semester_calendar() 建立並共用）
+
+    Attributes:
+        start (date): 學期第一天
+        end (date): 學期結束日
+        first_monday (date): 學期第一天所在週的星期一
+        weeks (int): 從 first_monday 到學期結束日前一天所在週的週數
+        dates (Tuple[date, ...]): 依順序排列的所有上課日
+    """
+    __slots__ = ("start", "end", "first_monday", "weeks", "dates", "_slots")
+
+    def __init__(self, start: date, end: date) -> None:
+        self.start = start
+        self.end = end
+        self.first_monday = start - timedelta(days=start.weekday())
+        self.weeks = self._count_weeks(self.first_monday)
+        self.dates = tuple(
+            self.first_monday + timedelta(days=week * 7 + weekday)
+            for week in range(self.weeks)
+            for weekday in range(WEEKDAYS)
+        )
+        self._slots: Dict[date, Tuple[int, int]] = {
+            day: divmod(index, WEEKDAYS) for index, day in enumerate(self.dates)
+        }
+
+    def _count_weeks(self, monday: date) -> int:
+        return ((self.end - monday).days - 1) // 7 + 1
+
+    def slot(self, day: date) -> Optional[Tuple[int, int]]:
+        """day 的 (週次, 星期索引 0-4)，週次從 0 起算；週末或不在學期內時回傳 None"""
+        return self._slots.get(day)
+
+    def __contains__(self, day: date) -> bool:
+        return day in self._slots
+
+    def weeks_from(self, monday: date) -> int:
+        """從 monday 所在週到學期結束的週數，即每週重複事件的 COUNT"""
+        found = self._slots.get(monday)
+        if found is not None:
+            return self.weeks - found[0]
+        return self._count_weeks(monday)
+
+    def __repr__(self) -> str:
+        return f"SemesterCalendar({self.start.isoformat()} ~ {self.end.isoformat()}, {self.weeks} 週)"
+
+
+def semester_bounds(day: date) -> Tuple[date, date]:
+    """day 所屬學期的 (第一天, 結束日)"""
+    if day.month >= 8:
+        return date(day.year, 8, 1), date(day.year + 1, 2, 1)
+    return date(day.year, 1, 1), date(day.year, 7, 1)
+
+
+@lru_cache(maxsize=8)
+def _calendar(start: date, end: date) -> SemesterCalendar:
+    return SemesterCalendar(start, end)
+
+
+def semester_calendar(day: Optional[Union[date, datetime]] = None) -> SemesterCalendar:
+    """取得 day（預設為今天）所屬學期的上課日曆，同一學期共用同一個物件"""
+    if day is None:
+        day = date.today()
+    elif isinstance(day, datetime):
+        day = day.date()
+    return _calendar(*semester_bounds(day))
@@ -0,0 +1,163 @@
+"""課表行事曆事件的固定 UID 與 SEQUENCE
+
+每一格課程以 (target, 星期, 節次) 產生固定的 UID，重新匯入或訂閱更新時行事曆軟體會取代原本的事件，
+不會重複新增。每格另外記錄內容指紋（課程名稱、上下課時間、教師或班級），
+資料更新時以 update() 比對指紋，只有內容改變的格子 SEQUENCE 才會遞增，DTSTAMP 也只在此時更新，
+因此訂閱者只需要同步有變動的課程。
+
+紀錄以 JSON 保存在快取目錄的 event_sequences.json，先寫入暫存檔再以 os.replace 取代：
+
+    {target: {"<星期>-<節次>": [指紋, SEQUENCE, DTSTAMP (ISO 8601, UTC)]}}
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+Slot = Tuple[int, int]  # (星期 1-5, 節次 1-8)
+
+UID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_DNS, "w3.tnfsh.tn.edu.tw")
+UID_DOMAIN = "tnfsh-class-table"
+
+
+def event_uid(target: str, weekday: int, period: int) -> str:
+    """(target, 星期, 節次) 對應的固定 UID"""
+    return f"{uuid.uuid5(UID_NAMESPACE, f'{target}/{weekday}/{period}')}@{UID_DOMAIN}"
+
+
+def slot_fingerprints(grid: Any, lessons: Dict[str, List[str]]) -> Dict[Slot, str]:
+    """計算課表中每一格課程的內容指紋，空堂不列入
+
+    Args:
+        grid (TimetableGrid): 節次 × 星期的課表
+        lessons (Dict[str, List[str]]): {節次名稱: [開始時間, 結束時間]}
+
+    Returns:
+        Dict[Slot, str]: {(星期, 節次): 指紋}
+    """
+    times = list(lessons.values())
+    fingerprints = {}
+    for period_index in range(grid.periods):
+        for day_index, cell_id in enumerate(grid.row(period_index)):
+            subject, counterparts = grid.decode(cell_id)
+            if subject == "":
+                continue
+            time = times[period_index] if period_index < len(times) else None
+            data = json.dumps([subject, time, sorted(counterparts.items())], ensure_ascii=False)
+            fingerprints[(day_index + 1, period_index + 1)] = hashlib.sha1(data.encode("utf-8")).hexdigest()[:16]
+    return fingerprints
+
+
+class EventSequences:
+    """每格課程的 SEQUENCE 紀錄（執行緒安全）
+
+    Args:
+        path (Union[str, Path], optional): 紀錄檔路徑，預設為 new_backend.cache.CACHE_DIR 下的 event_sequences.json
+
+    Attributes:
+        bumps (int): 本程序中遞增 SEQUENCE 的次數
+    """
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        self._path = Path(path) if path is not None else None
+        self._records: Optional[Dict[str, Dict[str, List[Any]]]] = None
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.bumps = 0
+
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            from tnfsh_class_table.new_backend.cache import CACHE_DIR
+            self._path = CACHE_DIR / "event_sequences.json"
+        return self._path
+
+    def _load(self) -> Dict[str, Dict[str, List[Any]]]:
+        """第一次使用時載入紀錄檔（需持有 self._lock）"""
+        if self._records is None:
+            try:
+                self._records = json.loads(self.path.read_bytes())
+            except FileNotFoundError:
+                self._records = {}
+            except (OSError, ValueError) as e:
+                print(f"無法讀取事件紀錄 {self.path}，重新建立: {e}")
+                self._records = {}
+        return self._records
+
+    def _save(self) -> None:
+        """以原子方式寫入紀錄檔（需持有 self._lock）"""
+        path = self.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(json.dumps(self._records, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def update_many(self, timetables: Dict[str, Dict[Slot, str]], now: Optional[datetime] = None) -> Dict[str, List[Slot]]:
+        """比對指紋，內容改變的格子遞增 SEQUENCE 並更新 DTSTAMP
+
+        第一次出現的格子 SEQUENCE 為 0；沒有出現在 timetables 中的格子保留原本的紀錄。
+
+        Args:
+            timetables (Dict[str, Dict[Slot, str]]): {target: slot_fingerprints() 的結果}
+            now (datetime, optional): 新的 DTSTAMP，預設為現在時間
+
+        Returns:
+            Dict[str, List[Slot]]: {target: 內容改變的格子}，不包含第一次出現的格子
+        """
+        stamp = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(microsecond=0).isoformat()
+        changed: Dict[str, List[Slot]] = {}
+        with self._lock:
+            records = self._load()
+            dirty = False
+            for target, fingerprints in timetables.items():
+                slots = records.setdefault(target, {})
+                for (weekday, period), fingerprint in fingerprints.items():
+                    key = f"{weekday}-{period}"
+                    record = slots.get(key)
+                    if record is None:
+                        slots[key] = [fingerprint, 0, stamp]
+                    elif record[0] != fingerprint:
+                        slots[key] = [fingerprint, record[1] + 1, stamp]
+                        changed.setdefault(target, []).append((weekday, period))
+                        self.bumps += 1
+                    else:
+                        continue
+                    self._versions[target] = self._versions.get(target, 0) + 1
+                    dirty = True
+            if dirty:
+                try:
+                    self._save()
+                except OSError as e:
+                    print(f"無法寫入事件紀錄 {self.path}: {e}")
+        return changed
+
+    def update(self, target: str, fingerprints: Dict[Slot, str]) -> List[Slot]:
+        """比對單一課表的指紋，回傳內容改變的格子"""
+        return self.update_many({target: fingerprints}).get(target, [])
+
+    def get(self, target: str, weekday: int, period: int) -> Tuple[int, Optional[datetime]]:
+        """取得格子目前的 (SEQUENCE, DTSTAMP)，沒有紀錄時為 (0, None)"""
+        with self._lock:
+            record = self._load().get(target, {}).get(f"{weekday}-{period}")
+        if record is None:
+            return 0, None
+        return record[1], datetime.fromisoformat(record[2])
+
+    def version(self, target: str) -> int:
+        """target 的紀錄在本程序中變動的次數，供匯出快取判斷內容是否需要重新產生"""
+        with self._lock:
+            return self._versions.get(target, 0)
+
+
+# 全域事件紀錄
+event_sequences = EventSequences()
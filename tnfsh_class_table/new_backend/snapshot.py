@@ -0,0 +1,416 @@
+"""全校課表的二進位快照
+
+把索引與所有班級、老師的課表寫成單一檔案，新的程序以 mmap 開啟後即可查詢，
+不需要解析 HTML 或 JSON。課表格直接以 mmap 上的 memoryview 作為 TimetableGrid 的陣列，
+字串只在被讀取時才解碼。
+
+檔案結構（整數皆為 little-endian）：
+
+    標頭        magic、格式版本、解析器版本、建立時間、base_url 字串 ID、各區段的 (位移, 長度)
+    字串區      string_offsets (u32) + string_data (UTF-8)，ID 0 為空字串
+    課程格區    cell_offsets (u32) + cell_data (u32: 科目, 名稱, 連結, 名稱, 連結, ...)
+    索引區      index_entries (u32 × 4: 類型, 分類, 名稱, 連結)，順序與原索引相同
+    課表區      targets (u32 × TARGET_FIELDS)、grids (課程格 ID)、lessons (u32 × 3: 節次, 開始, 結束)
+
+寫入時先寫暫存檔再以 os.replace 取代，正在讀取舊快照的程序不受影響。
+
+Example:
+    >>> snapshot = install_snapshot()  # 開啟快照並讓 class_table_cache 使用它
+    >>> snapshot.grid("307").course(0, 0)
+"""
+from __future__ import annotations
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urljoin
+
+from tnfsh_class_table.backend import (
+    TimetableExtractor,
+    TimetableGrid,
+    TNFSHClassTableIndex,
+    class_table_cache,
+    data_generations,
+)
+from tnfsh_class_table.new_backend.cache import CACHE_DIR, PageRecord, ParsedPage, TieredPageCache
+from tnfsh_class_table.new_backend.crawler import BASE_URL, INDEX_PAGES, CourseSiteCrawler
+from tnfsh_class_table.new_backend.sequence import event_sequences, slot_fingerprints
+
+SNAPSHOT_PATH = Path(os.getenv("TNFSH_SNAPSHOT_PATH", CACHE_DIR / "timetables.snapshot"))
+
+MAGIC = b"TNFSHSNP"
+FORMAT_VERSION = 1
+NONE_ID = 0xFFFFFFFF  # 代表 None 的字串 ID
+
+SECTIONS = ("string_offsets", "string_data", "cell_offsets", "cell_data", "index_entries", "targets", "grids", "lessons")
+TARGET_FIELDS = (
+    "name", "type", "category", "url", "last_update", "etag", "last_modified",
+    "grid_offset", "periods", "weekdays", "lessons_offset", "lesson_count",
+)
+TYPES = ("class", "teacher")
+
+_HEADER = struct.Struct("<8sIId" + "I" + "QQ" * len(SECTIONS))
+
+
+class SnapshotError(Exception):
+    """快照檔案無法讀取或格式不符"""
+
+
+class _SnapshotBuilder:
+    """依序加入索引與課表，最後序列化為快照"""
+    def __init__(self) -> None:
+        self._string_ids: Dict[str, int] = {"": 0}
+        self._strings: List[str] = [""]
+        self._cell_ids: Dict[Tuple[int, ...], int] = {}
+        self.cell_offsets = array("I", [0])
+        self.cell_data = array("I")
+        self.index_entries = array("I")
+        self.targets = array("I")
+        self.grids = array("I")
+        self.lessons = array("I")
+
+    def string(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE_ID
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self._strings)
+            self._strings.append(value)
+        return string_id
+
+    def cell(self, subject: str, counterparts: Dict[str, str]) -> int:
+        key = (self.string(subject),) + tuple(
+            string_id for name, link in counterparts.items() for string_id in (self.string(name), self.string(link))
+        )
+        cell_id = self._cell_ids.get(key)
+        if cell_id is None:
+            cell_id = self._cell_ids[key] = len(self.cell_offsets) - 1
+            self.cell_data.extend(key)
+            self.cell_offsets.append(len(self.cell_data))
+        return cell_id
+
+    def add_index_entry(self, type: str, category: str, name: str, link: str) -> None:
+        self.index_entries.extend((TYPES.index(type), self.string(category), self.string(name), self.string(link)))
+
+    def add_target(self, name: str, type: str, category: str, url: str, parsed: ParsedPage, record: Optional[PageRecord]) -> None:
+        grid = parsed.grid
+        grid_offset = len(self.grids)
+        # cells 一律依 (節次, 星期) 排列，與檢視方向無關
+        for cell_id in grid.cells:
+            self.grids.append(self.cell(*grid.decode(cell_id)))
+        lessons_offset = len(self.lessons) // 3
+        for lesson, (start, end) in parsed.lessons.items():
+            self.lessons.extend((self.string(lesson), self.string(start), self.string(end)))
+        self.targets.extend((
+            self.string(name), TYPES.index(type), self.string(category), self.string(url),
+            self.string(parsed.last_update),
+            self.string(record.etag if record else None), self.string(record.last_modified if record else None),
+            grid_offset, grid.periods, grid.weekdays, lessons_offset, len(parsed.lessons),
+        ))
+
+    def serialize(self, base_url: str, parser_version: int) -> bytes:
+        base_url_id = self.string(base_url)
+        encoded = [value.encode("utf-8") for value in self._strings]
+        string_offsets = array("I", [0])
+        for value in encoded:
+            string_offsets.append(string_offsets[-1] + len(value))
+        payloads = (
+            string_offsets.tobytes(), b"".join(encoded), self.cell_offsets.tobytes(), self.cell_data.tobytes(),
+            self.index_entries.tobytes(), self.targets.tobytes(), self.grids.tobytes(), self.lessons.tobytes(),
+        )
+        sections = []
+        body = bytearray()
+        offset = _HEADER.size
+        for payload in payloads:
+            padding = -offset % 8  # 每個區段對齊 8 bytes
+            body += b"\0" * padding
+            offset += padding
+            sections.extend((offset, len(payload)))
+            body += payload
+            offset += len(payload)
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, parser_version, time.time(), base_url_id, *sections)
+        return header + bytes(body)
+
+
+class TimetableSnapshot:
+    """以 mmap 開啟的全校課表快照（唯讀，執行緒安全）
+
+    提供與 TieredPageCache 相同的 parsed(url) / record(url)，
+    可作為 TNFSHClassTableCache 的 snapshot 來源。
+
+    Args:
+        path (Union[str, Path]): 快照檔案路徑
+
+    Raises:
+        SnapshotError: 檔案格式、解析器版本或位元組順序不符時
+        OSError: 無法開啟檔案時
+    """
+    def __init__(self, path: Union[str, Path] = SNAPSHOT_PATH) -> None:
+        if sys.byteorder != "little" or array("I").itemsize != 4:
+            raise SnapshotError("快照僅支援 little-endian 且 unsigned int 為 4 bytes 的平台")
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            raise SnapshotError(f"快照檔案過短: {self.path}")
+        magic, format_version, parser_version, created, base_url_id, *sections = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise SnapshotError(f"不支援的快照格式: {self.path}")
+        if parser_version != TimetableExtractor.PARSER_VERSION:
+            raise SnapshotError(f"快照的解析器版本 {parser_version} 與目前版本不同: {self.path}")
+        self.parser_version = parser_version
+        self.created = created
+
+        buffer = memoryview(self._mmap)
+        views = {}
+        for name, offset, length in zip(SECTIONS, sections[0::2], sections[1::2]):
+            if offset + length > len(self._mmap):
+                raise SnapshotError(f"快照檔案不完整: {self.path}")
+            view = buffer[offset:offset + length]
+            views[name] = view if name == "string_data" else view.cast("I")
+        self._string_offsets = views["string_offsets"]
+        self._string_data = views["string_data"]
+        self._cell_offsets = views["cell_offsets"]
+        self._cell_data = views["cell_data"]
+        self._index_entries = views["index_entries"]
+        self._targets = views["targets"]
+        self._grids = views["grids"]
+        self._lessons = views["lessons"]
+
+        self._decoded: Dict[int, str] = {}
+        self._by_name: Optional[Dict[str, int]] = None
+        self._by_url: Optional[Dict[str, int]] = None
+        self.base_url = self.string(base_url_id)
+
+    @classmethod
+    def open(cls, path: Union[str, Path] = SNAPSHOT_PATH) -> Optional[TimetableSnapshot]:
+        """開啟快照，檔案不存在或無法使用時回傳 None"""
+        try:
+            return cls(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, SnapshotError, ValueError) as e:
+            print(f"無法開啟課表快照 {path}: {e}")
+            return None
+
+    def string(self, string_id: int) -> Optional[str]:
+        """取得字串，第一次讀取時才解碼"""
+        if string_id == NONE_ID:
+            return None
+        value = self._decoded.get(string_id)
+        if value is None:
+            start, end = self._string_offsets[string_id], self._string_offsets[string_id + 1]
+            value = self._decoded[string_id] = str(self._string_data[start:end], "utf-8")
+        return value
+
+    def decode(self, cell_id: int) -> Tuple[str, Dict[str, str]]:
+        """將課程格 ID 還原為 (課程名稱, {教師或班級名稱: 連結})，供 TimetableGrid 使用"""
+        values = self._cell_data[self._cell_offsets[cell_id]:self._cell_offsets[cell_id + 1]]
+        string = self.string
+        return string(values[0]), {string(values[i]): string(values[i + 1]) for i in range(1, len(values), 2)}
+
+    def __len__(self) -> int:
+        return len(self._targets) // len(TARGET_FIELDS)
+
+    def _field(self, position: int, field: str) -> int:
+        return self._targets[position * len(TARGET_FIELDS) + TARGET_FIELDS.index(field)]
+
+    def _position(self, target: str) -> Optional[int]:
+        if self._by_name is None:
+            self._by_name = {self.string(self._field(i, "name")): i for i in range(len(self))}
+        return self._by_name.get(target)
+
+    def _position_by_url(self, url: str) -> Optional[int]:
+        if self._by_url is None:
+            self._by_url = {urljoin(self.base_url, self.string(self._field(i, "url"))): i for i in range(len(self))}
+        return self._by_url.get(url)
+
+    def __contains__(self, target: str) -> bool:
+        return self._position(target) is not None
+
+    def targets(self) -> List[str]:
+        """所有班級與老師，順序與反查表相同"""
+        return [self.string(self._field(i, "name")) for i in range(len(self))]
+
+    def index(self) -> Dict[str, Any]:
+        """重建與 TNFSHClassTableIndex.index 相同結構的索引"""
+        index: Dict[str, Any] = {"base_url": self.base_url, "root": "course.html"}
+        for type in TYPES:
+            index[type] = {"url": INDEX_PAGES[type], "data": {}}
+        entries = self._index_entries
+        for i in range(0, len(entries), 4):
+            type_id, category, name, link = entries[i:i + 4]
+            data = index[TYPES[type_id]]["data"]
+            data.setdefault(self.string(category), {})[self.string(name)] = self.string(link)
+        return index
+
+    def grid(self, target: str) -> Optional[TimetableGrid]:
+        """以 mmap 上的課程格陣列建立 TimetableGrid，不複製資料"""
+        position = self._position(target)
+        return None if position is None else self._grid_at(position)
+
+    def _grid_at(self, position: int) -> TimetableGrid:
+        offset = self._field(position, "grid_offset")
+        periods, weekdays = self._field(position, "periods"), self._field(position, "weekdays")
+        return TimetableGrid(self._grids[offset:offset + periods * weekdays], periods, weekdays, cell_table=self)
+
+    def _lessons_at(self, position: int) -> Dict[str, List[str]]:
+        offset, count = self._field(position, "lessons_offset"), self._field(position, "lesson_count")
+        lessons = {}
+        for i in range(offset * 3, (offset + count) * 3, 3):
+            name, start, end = self._lessons[i:i + 3]
+            lessons[self.string(name)] = [self.string(start), self.string(end)]
+        return lessons
+
+    def _parsed_at(self, position: int) -> ParsedPage:
+        return ParsedPage(self._lessons_at(position), self._grid_at(position), self.string(self._field(position, "last_update")))
+
+    def lookup(self, target: str) -> Optional[ParsedPage]:
+        """以班級代碼或老師名稱取得課表"""
+        position = self._position(target)
+        return None if position is None else self._parsed_at(position)
+
+    def parsed(self, url: str) -> Optional[ParsedPage]:
+        """以網址取得課表，介面同 TieredPageCache.parsed"""
+        position = self._position_by_url(url)
+        return None if position is None else self._parsed_at(position)
+
+    def record(self, url: str) -> Optional[PageRecord]:
+        """以網址取得 ETag 與 Last-Modified，介面同 TieredPageCache.record"""
+        position = self._position_by_url(url)
+        if position is None:
+            return None
+        return PageRecord(
+            url, "",
+            self.string(self._field(position, "etag")),
+            self.string(self._field(position, "last_modified")),
+            self.created,
+        )
+
+    @staticmethod
+    def write(
+        index: Dict[str, Any],
+        timetables: Dict[str, ParsedPage],
+        records: Optional[Dict[str, PageRecord]] = None,
+        path: Union[str, Path] = SNAPSHOT_PATH,
+        parser_version: int = TimetableExtractor.PARSER_VERSION,
+    ) -> Path:
+        """寫入快照，先寫入同目錄的暫存檔再以 os.replace 取代
+
+        Args:
+            index (Dict[str, Any]): 與 TNFSHClassTableIndex.index 相同結構的索引
+            timetables (Dict[str, ParsedPage]): {班級或老師: 解析後的課表}，不在索引中的會被略過
+            records (Dict[str, PageRecord], optional): {班級或老師: 網頁紀錄}，用來保存 ETag 與 Last-Modified
+            path (Union[str, Path]): 快照檔案路徑
+
+        Returns:
+            Path: 快照檔案路徑
+        """
+        records = records or {}
+        builder = _SnapshotBuilder()
+        reverse_index: Dict[str, Tuple[str, str, str]] = {}
+        for type in TYPES:
+            for category, entries in index.get(type, {}).get("data", {}).items():
+                for name, link in entries.items():
+                    builder.add_index_entry(type, category, name, link)
+        # 先老師後班級，同名時班級覆蓋老師，與 _build_reverse_index 相同
+        for type in ("teacher", "class"):
+            for category, entries in index.get(type, {}).get("data", {}).items():
+                for name, link in entries.items():
+                    reverse_index[name] = (type, category, link)
+        for name, (type, category, link) in reverse_index.items():
+            if name in timetables:
+                builder.add_target(name, type, category, link, timetables[name], records.get(name))
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(builder.serialize(index["base_url"], parser_version))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return path
+
+    @classmethod
+    def write_from_page_cache(
+        cls,
+        page_cache: TieredPageCache,
+        path: Union[str, Path] = SNAPSHOT_PATH,
+        base_url: str = BASE_URL,
+    ) -> Optional[Path]:
+        """由 TieredPageCache 中的索引與課表寫入快照，索引不在快取中時不寫入並回傳 None"""
+        index = page_cache.load_index(base_url)
+        if index is None:
+            return None
+        timetables = page_cache.load_all(base_url)
+        reverse_index = {}
+        for type in ("teacher", "class"):
+            for entries in index[type]["data"].values():
+                reverse_index.update(entries)
+        records = {name: page_cache.record(urljoin(base_url, reverse_index[name])) for name in timetables}
+        return cls.write(index, timetables, records, path, page_cache.parser_version)
+
+
+def install_snapshot(snapshot: Optional[TimetableSnapshot] = None, path: Union[str, Path] = SNAPSHOT_PATH) -> Optional[TimetableSnapshot]:
+    """以快照發布新的資料世代，並讓 TNFSHClassTableIndex 改用快照中的索引，不發送任何請求
+
+    class_table_cache 只移除上上個世代的項目，切換前開始的請求仍可使用上個世代。
+    發布前會比對快照中所有課表與 event_sequences 的紀錄，內容改變的格子 SEQUENCE 遞增。
+
+    Args:
+        snapshot (TimetableSnapshot, optional): 已開啟的快照，未指定時開啟 path
+        path (Union[str, Path]): 快照檔案路徑
+
+    Returns:
+        Optional[TimetableSnapshot]: 快照不存在或無法使用時回傳 None
+    """
+    snapshot = snapshot or TimetableSnapshot.open(path)
+    if snapshot is None:
+        return None
+    TNFSHClassTableIndex.from_index(snapshot.index(), loaded_at=snapshot.created)
+    changed = event_sequences.update_many({
+        target: slot_fingerprints(parsed.grid, parsed.lessons)
+        for target in snapshot.targets()
+        if (parsed := snapshot.lookup(target)) is not None
+    })
+    if changed:
+        print(f"課表異動: {len(changed)} 份課表、{sum(map(len, changed.values()))} 堂課")
+    previous = data_generations.current()
+    data_generations.publish(snapshot)
+    class_table_cache.prune(previous)
+    return snapshot
+
+
+async def refresh_snapshot(
+    path: Union[str, Path] = SNAPSHOT_PATH,
+    page_cache: Optional[TieredPageCache] = None,
+    **crawler_options: Any,
+) -> Optional[TimetableSnapshot]:
+    """抓取整個課表網站、存入 page_cache，再以原子方式寫入新的快照
+
+    Args:
+        path (Union[str, Path]): 快照檔案路徑
+        page_cache (TieredPageCache, optional): 網頁快取，未指定時使用預設目錄
+        **crawler_options: 傳給 CourseSiteCrawler 的參數
+
+    Returns:
+        Optional[TimetableSnapshot]: 新的快照，索引無法取得時回傳 None
+    """
+    page_cache = page_cache or TieredPageCache()
+    result = await CourseSiteCrawler(**crawler_options).crawl()
+    print(f"課表網站抓取完成: {result.report()}")
+    for url, error in result.errors.items():
+        print(f"抓取失敗 {url}: {error}")
+    page_cache.put_crawl(result)
+    written = TimetableSnapshot.write_from_page_cache(page_cache, path, result.index["base_url"])
+    return TimetableSnapshot.open(written) if written else None
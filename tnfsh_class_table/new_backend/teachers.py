@@ -0,0 +1,216 @@
+"""官網課表與竹園 Wiki 的教師對照表
+
+代課（wiki 模式）、行事曆描述的竹園 Wiki 連結與 get_wiki_link 都需要把官網課表上的
+教師對應到竹園 Wiki 的頁面與科目。原本各自在每次呼叫時以 dict 推導式或線性掃描比對，
+TeacherJoin 在官網索引或 Wiki 索引版本改變時建立一次，之後都只是 dict 查詢。
+
+每位官網教師依序以下列方式對應 Wiki 頁面：
+1. 名稱完全相同
+2. 別名（TEACHER_ALIASES，例如「朱蒙」對應官網課表上的「吳銘」）
+3. 名稱索引的子字串比對（可能有多個候選）
+
+Example:
+    >>> join = teacher_joins.get(official_teachers, wiki_reverse_index, wiki_version)
+    >>> join.get("王小明").wiki_category
+    '國文科'
+    >>> join.substitutes("王小明", "wiki")  # {同 Wiki 科目的其他教師: 官網課表連結}
+"""
+from __future__ import annotations
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from tnfsh_class_table.new_backend.names import name_indexes
+
+WIKI_BASE_URL = "https://tnfshwiki.tfcis.org"
+
+# {別名: 官網課表上的名稱}
+TEACHER_ALIASES: Dict[str, str] = {"朱蒙": "吳銘"}
+
+WikiLinks = Tuple[Tuple[str, str], ...]  # ((竹園 Wiki 網址, 頁面名稱), ...)
+
+
+def wiki_url(path: str) -> str:
+    """由反查表中的相對路徑（"/王小明" 或 "王小明"）組成竹園 Wiki 網址"""
+    return f"{WIKI_BASE_URL}/{path.strip('/')}"
+
+
+@dataclass(frozen=True)
+class TeacherRecord:
+    """一位官網教師的對照資料
+
+    Attributes:
+        name (str): 官網課表上的名稱
+        official_url (str): 官網課表的相對連結，例如 "TA01.html"
+        official_category (str): 官網的科目
+        wiki_links (WikiLinks): 對應的竹園 Wiki 頁面，可能有多個候選
+        wiki_category (Optional[str]): 唯一對應的 Wiki 頁面所屬的科目，沒有或有多個候選時為 None
+    """
+    name: str
+    official_url: str
+    official_category: str
+    wiki_links: WikiLinks = ()
+    wiki_category: Optional[str] = None
+
+    @property
+    def wiki_url(self) -> Optional[str]:
+        """唯一對應的竹園 Wiki 網址"""
+        return self.wiki_links[0][0] if len(self.wiki_links) == 1 else None
+
+
+class TeacherJoin:
+    """官網教師與竹園 Wiki 教師的對照表（唯讀，由 TeacherJoinRegistry 建立並共用）
+
+    Args:
+        official_teachers (Dict[str, Dict[str, str]]): 官網索引的 {科目: {教師: 連結}}
+        wiki_reverse_index (Dict[str, Dict[str, str]]): Wiki 的 {教師: {url, category}}
+        wiki_version (Any): Wiki 索引版本
+        aliases (Dict[str, str]): {別名: 官網名稱}
+
+    Attributes:
+        version (int): 對照表編號，每次重新建立時遞增，可作為快取鍵的一部分
+    """
+    def __init__(
+        self,
+        official_teachers: Dict[str, Dict[str, str]],
+        wiki_reverse_index: Dict[str, Dict[str, str]],
+        wiki_version: Any = None,
+        aliases: Optional[Dict[str, str]] = None,
+        version: int = 0,
+    ) -> None:
+        self.version = version
+        self.aliases = dict(TEACHER_ALIASES if aliases is None else aliases)
+        self._wiki = wiki_reverse_index
+        self._wiki_names = name_indexes.get("wiki", wiki_reverse_index, wiki_version)
+        # {官網名稱: [別名, ...]}，以別名尋找 Wiki 頁面
+        self._alias_names: Dict[str, List[str]] = {}
+        for alias, name in self.aliases.items():
+            self._alias_names.setdefault(name, []).append(alias)
+
+        self.records: Dict[str, TeacherRecord] = {}
+        by_official: Dict[str, List[str]] = {}
+        by_wiki: Dict[str, List[str]] = {}
+        for category, teachers in official_teachers.items():
+            for name, url in teachers.items():
+                links = self.wiki_links(name)
+                wiki_category = self._wiki_category(links)
+                self.records[name] = TeacherRecord(name, url, category, links, wiki_category)
+                by_official.setdefault(category, []).append(name)
+                if wiki_category is not None:
+                    by_wiki.setdefault(wiki_category, []).append(name)
+        self.by_official_category: Dict[str, Tuple[str, ...]] = {k: tuple(v) for k, v in by_official.items()}
+        self.by_wiki_category: Dict[str, Tuple[str, ...]] = {k: tuple(v) for k, v in by_wiki.items()}
+
+    def _wiki_category(self, links: WikiLinks) -> Optional[str]:
+        if len(links) != 1:
+            return None
+        return self._wiki[links[0][1]].get("category")
+
+    def wiki_links(self, name: str) -> WikiLinks:
+        """name 對應的竹園 Wiki 頁面，官網教師直接使用建立時的結果"""
+        record = self.records.get(name)
+        if record is not None:
+            return record.wiki_links
+        wiki = self._wiki
+        for candidate in (name, *self._alias_names.get(name, ()), self.aliases.get(name)):
+            if candidate and candidate in wiki:
+                return ((wiki_url(wiki[candidate]["url"]), candidate),)
+        return tuple((wiki_url(wiki[match]["url"]), match) for match in self._wiki_names.contains(name))
+
+    def similar_wiki_links(self, name: str, max_distance: int = 1) -> WikiLinks:
+        """與 name 編輯距離不超過 max_distance 的竹園 Wiki 頁面，距離近的在前"""
+        wiki = self._wiki
+        return tuple((wiki_url(wiki[match]["url"]), match) for match in self._wiki_names.similar(name, max_distance))
+
+    def resolve(self, name: str) -> Optional[str]:
+        """name（官網名稱或別名）對應的官網名稱，找不到時回傳 None"""
+        if name in self.records:
+            return name
+        name = self.aliases.get(name, name)
+        return name if name in self.records else None
+
+    def get(self, name: str) -> Optional[TeacherRecord]:
+        """以官網名稱或別名取得對照資料"""
+        name = self.resolve(name)
+        return self.records[name] if name is not None else None
+
+    def substitutes(self, name: str, source: str) -> Dict[str, str]:
+        """與 name 同科目的其他教師 {官網名稱: 官網課表連結}
+
+        Args:
+            name (str): 教師名稱或別名
+            source (str): "official_website" 依官網科目（且課表代碼字首相同），"wiki" 依竹園 Wiki 科目
+
+        Raises:
+            ValueError: source 不合法時
+        """
+        record = self.get(name)
+        if record is None:
+            return {}
+        if source == "official_website":
+            prefix = record.official_url[1:2]
+            candidates = (
+                self.records[other] for other in self.by_official_category.get(record.official_category, ())
+                if self.records[other].official_url[1:2] == prefix
+            )
+        elif source == "wiki":
+            if record.wiki_category is None:
+                return {}
+            candidates = (self.records[other] for other in self.by_wiki_category.get(record.wiki_category, ()))
+        else:
+            raise ValueError(f"無效的資料來源：{source}")
+        return {other.name: other.official_url for other in candidates if other.name != record.name}
+
+    def __iter__(self) -> Iterator[TeacherRecord]:
+        return iter(self.records.values())
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def stats(self) -> Dict[str, int]:
+        """對照的統計資訊"""
+        return {
+            "teachers": len(self.records),
+            "with_wiki_page": sum(1 for record in self.records.values() if record.wiki_url),
+            "ambiguous": sum(1 for record in self.records.values() if len(record.wiki_links) > 1),
+            "wiki_categories": len(self.by_wiki_category),
+        }
+
+
+class TeacherJoinRegistry:
+    """依官網與 Wiki 索引共用 TeacherJoin 的登錄表（執行緒安全）
+
+    只保留最新一份對照表；官網教師資料物件、Wiki 反查表物件或 Wiki 版本任一改變時重新建立。
+    """
+    def __init__(self) -> None:
+        self._entry: Optional[Tuple[Any, Any, Any, TeacherJoin]] = None
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def _current(self, official: Any, wiki: Any, version: Any) -> Optional[TeacherJoin]:
+        entry = self._entry
+        if entry is not None and entry[0] is official and entry[1] is wiki and entry[2] == version:
+            return entry[3]
+        return None
+
+    def get(
+        self,
+        official_teachers: Dict[str, Dict[str, str]],
+        wiki_reverse_index: Dict[str, Dict[str, str]],
+        wiki_version: Any = None,
+    ) -> TeacherJoin:
+        """取得目前索引對應的對照表"""
+        join = self._current(official_teachers, wiki_reverse_index, wiki_version)
+        if join is not None:
+            return join
+        with self._lock:
+            join = self._current(official_teachers, wiki_reverse_index, wiki_version)
+            if join is None:
+                self.builds += 1
+                join = TeacherJoin(official_teachers, wiki_reverse_index, wiki_version, version=self.builds)
+                self._entry = (official_teachers, wiki_reverse_index, wiki_version, join)
+        return join
+
+
+# 全域教師對照表
+teacher_joins = TeacherJoinRegistry()
@@ -0,0 +1,300 @@
+"""竹園 Wiki 教師分類頁面的非同步爬蟲
+
+NewWikiTeacherIndex 需要「分類:科目」頁面與每個「分類:<科目>老師」頁面。
+原本每次建立或 refresh() 都開一個新的 ThreadPoolExecutor 與新的 requests 連線，並重新抓取、解析所有科目。
+
+WikiTeacherCrawler：
+    - 在自己的背景事件迴圈上保留一個 aiohttp.ClientSession，多次重新整理共用連線池 (keep-alive)
+    - 每個頁面記錄 ETag / Last-Modified 與內容的 SHA-256 指紋 (PageFingerprint)
+    - 重新整理時以 If-None-Match / If-Modified-Since 發送條件請求，
+      304 或指紋相同的科目沿用上次的教師列表，只有內容改變的科目才重新解析
+    - 連線錯誤、逾時、429 與 5xx 以指數退避重試；重試後仍失敗的科目沿用上次的結果
+
+Example:
+    >>> crawler = WikiTeacherCrawler()
+    >>> result = crawler.crawl_sync()               # 完整抓取
+    >>> result = crawler.crawl_sync(result.pages)   # 增量更新
+    >>> print(result.report())
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any, Coroutine, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+import aiohttp
+
+from tnfsh_class_table.utils.html_parser import make_soup
+
+WIKI_BASE_URL = "https://tnfshwiki.tfcis.org"
+SUBJECTS_TITLE = "分類:科目"
+
+# 不列入教師索引的科目
+EXCLUDED_SUBJECTS = frozenset(("藝術與人文科",))
+
+# 竹園 Wiki 頁面不在 golden 測試範圍內，維持與原本相同的解析器
+WIKI_PARSER = "html.parser"
+
+# 值得重試的 HTTP 狀態碼
+RETRY_STATUS = frozenset((429, 500, 502, 503, 504))
+
+
+def parse_subjects(content: bytes) -> Dict[str, Dict[str, str]]:
+    """解析「分類:科目」頁面，返回 {科目: {"url": 連結}}"""
+    categories = make_soup(content, WIKI_PARSER).find_all("div", class_="mw-category")
+    if len(categories) < 2:
+        return {}
+    subjects = {}
+    for subject in categories[1].find_all("a"):
+        name = subject.text.strip()
+        url = subject.get("href")
+        if name in EXCLUDED_SUBJECTS:
+            continue
+        if name and url:
+            subjects[name] = {"url": unquote(url)}
+    return subjects
+
+
+def parse_teachers(content: bytes) -> Dict[str, str]:
+    """解析「分類:<科目>老師」頁面，返回 {教師: 連結}"""
+    category = make_soup(content, WIKI_PARSER).find("div", class_="mw-category")
+    if not category:
+        return {}
+    return {teacher.text: unquote(teacher.get("href")) for teacher in category.find_all("a")}
+
+
+@dataclass(frozen=True)
+class PageFingerprint:
+    """一個分類頁面的驗證資訊與解析結果
+
+    Attributes:
+        digest (str): 頁面內容的 SHA-256
+        etag (Optional[str]): 伺服器回傳的 ETag
+        last_modified (Optional[str]): 伺服器回傳的 Last-Modified
+        data (Any): 解析後的資料，內容沒有改變時直接沿用
+    """
+    digest: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    data: Any = None
+
+    def headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class WikiCrawlResult:
+    """一次抓取的結果
+
+    Attributes:
+        index (Dict[str, Dict[str, Any]]): 與 NewWikiTeacherIndex.index 相同結構的 {科目: {"url", "teachers"}}
+        pages (Dict[str, PageFingerprint]): {頁面標題: 指紋}，下次增量更新時傳回 crawl()
+        incremental (bool): 是否以上次的指紋進行增量更新
+        subjects_changed (bool): 科目列表是否改變（完整抓取時為 True）
+        changed (List[str]): 內容改變而重新解析的科目
+        not_modified (int): 伺服器回應 304 或內容指紋相同、不需解析的頁面數
+        errors (Dict[str, str]): {頁面標題: 錯誤訊息}
+        requests (int): 實際送出的請求數（包含重試）
+        elapsed (float): 總耗時（秒）
+    """
+    index: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    pages: Dict[str, PageFingerprint] = field(default_factory=dict)
+    incremental: bool = False
+    subjects_changed: bool = True
+    changed: List[str] = field(default_factory=list)
+    not_modified: int = 0
+    errors: Dict[str, str] = field(default_factory=dict)
+    requests: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def modified(self) -> bool:
+        """科目列表或任何科目的教師列表是否改變"""
+        return self.subjects_changed or bool(self.changed)
+
+    def report(self) -> str:
+        mode = "增量更新" if self.incremental else "完整抓取"
+        return (f"竹園 Wiki {mode}：{len(self.index)} 個科目，重新解析 {len(self.changed)} 個，"
+                f"未改變 {self.not_modified} 頁，失敗 {len(self.errors)} 頁，"
+                f"共 {self.requests} 次請求，耗時 {self.elapsed:.2f} 秒")
+
+
+class WikiTeacherCrawler:
+    """抓取竹園 Wiki 教師分類頁面的非同步爬蟲，連線池在多次抓取間共用（執行緒安全）
+
+    Args:
+        base_url (str): 竹園 Wiki 的網址
+        concurrency (int): 同時進行的請求數上限，也是連線池大小
+        retries (int): 失敗後的重試次數
+        backoff (float): 第一次重試前的等待秒數，之後每次加倍
+        timeout (float): 單次請求的逾時秒數
+    """
+    def __init__(
+        self,
+        base_url: str = WIKI_BASE_URL,
+        concurrency: int = 10,
+        retries: int = 2,
+        backoff: float = 0.5,
+        timeout: float = 5.0,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    def normal_url(self, title: str) -> str:
+        """標準版頁面網址"""
+        return f"{self.base_url}/{title}"
+
+    def mobile_url(self, title: str) -> str:
+        """行動版頁面網址，分類頁面較精簡"""
+        return f"{self.base_url}/index.php?title={title}&mobileaction=toggle_view_mobile"
+
+    def _submit(self, coroutine: Coroutine[Any, Any, Any]) -> Future:
+        """在爬蟲自己的事件迴圈上執行 coroutine，第一次呼叫時啟動迴圈"""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="wiki-crawler", daemon=True).start()
+                self._loop = loop
+            loop = self._loop
+        return asyncio.run_coroutine_threadsafe(coroutine, loop)
+
+    async def crawl(self, previous: Optional[Dict[str, PageFingerprint]] = None) -> WikiCrawlResult:
+        """抓取科目列表與所有科目的教師列表，實際在爬蟲的事件迴圈上執行，呼叫端只等待結果
+
+        Args:
+            previous (Dict[str, PageFingerprint], optional): 上次的 WikiCrawlResult.pages，提供時進行增量更新
+
+        Returns:
+            WikiCrawlResult: 抓取結果；科目列表無法取得時 index 為空
+        """
+        return await asyncio.wrap_future(self._submit(self._crawl(previous)))
+
+    def crawl_sync(self, previous: Optional[Dict[str, PageFingerprint]] = None) -> WikiCrawlResult:
+        """同步版本的 crawl()，不可在爬蟲自己的事件迴圈中呼叫"""
+        return self._submit(self._crawl(previous)).result()
+
+    def close(self) -> None:
+        """關閉連線池與背景事件迴圈"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+
+        async def shutdown() -> None:
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def _crawl(self, previous: Optional[Dict[str, PageFingerprint]]) -> WikiCrawlResult:
+        start = monotonic()
+        previous = previous or {}
+        result = WikiCrawlResult(incremental=bool(previous))
+        session = await self._get_session()
+
+        subjects_page = await self._fetch_page(session, SUBJECTS_TITLE, self.normal_url(SUBJECTS_TITLE),
+                                               previous.get(SUBJECTS_TITLE), parse_subjects, result)
+        if subjects_page is None or not subjects_page.data:
+            result.elapsed = monotonic() - start
+            return result
+        result.pages[SUBJECTS_TITLE] = subjects_page
+        result.subjects_changed = subjects_page is not previous.get(SUBJECTS_TITLE)
+
+        titles = {subject: f"分類:{subject}老師" for subject in subjects_page.data}
+        pages = await asyncio.gather(*(
+            self._fetch_page(session, title, self.mobile_url(title), previous.get(title), parse_teachers, result)
+            for title in titles.values()
+        ))
+        for (subject, title), page in zip(titles.items(), pages):
+            if page is not None:
+                result.pages[title] = page
+                if page is not previous.get(title):
+                    result.changed.append(subject)
+            result.index[subject] = {
+                "url": subjects_page.data[subject]["url"],
+                "teachers": dict(page.data) if page is not None else {},
+            }
+        result.elapsed = monotonic() - start
+        return result
+
+    async def _fetch_page(
+        self,
+        session: aiohttp.ClientSession,
+        title: str,
+        url: str,
+        previous: Optional[PageFingerprint],
+        parse: Any,
+        result: WikiCrawlResult,
+    ) -> Optional[PageFingerprint]:
+        """抓取並解析一個頁面；內容沒有改變時回傳 previous 本身，失敗時回傳 previous（可能為 None）"""
+        try:
+            status, content, etag, last_modified = await self._fetch(session, url, previous, result)
+        except Exception as e:
+            result.errors[title] = f"{type(e).__name__}: {e}"
+            return previous
+        if status == 304 and previous is not None:
+            result.not_modified += 1
+            return previous
+        digest = hashlib.sha256(content).hexdigest()
+        if previous is not None and previous.digest == digest:
+            result.not_modified += 1
+            return previous
+        return PageFingerprint(digest, etag, last_modified, parse(content))
+
+    async def _fetch(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        previous: Optional[PageFingerprint],
+        result: WikiCrawlResult,
+    ) -> Tuple[int, bytes, Optional[str], Optional[str]]:
+        """發送條件請求，遇到暫時性錯誤時以指數退避重試，返回 (狀態碼, 內容, ETag, Last-Modified)"""
+        headers = previous.headers() if previous is not None else {}
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+            async with self._semaphore:
+                result.requests += 1
+                try:
+                    async with session.get(url, headers=headers) as response:
+                        if response.status in RETRY_STATUS:
+                            last_error = f"HTTP {response.status}"
+                            continue
+                        if response.status == 304:
+                            return 304, b"", None, None
+                        response.raise_for_status()
+                        content = await response.read()
+                        return (response.status, content,
+                                response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    last_error = f"{type(e).__name__}: {e}"
+        raise ConnectionError(f"{url}: 重試 {self.retries} 次後仍失敗 ({last_error})")
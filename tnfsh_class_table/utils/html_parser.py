@@ -0,0 +1,195 @@
+"""HTML 解析器後端
+
+課表網頁與竹園 Wiki 頁面都需要解析 HTML，此模組依安裝情況選擇較快的解析器：
+
+    - "lxml": libxml2 (C 實作)，需要安裝 lxml
+    - "selectolax": Lexbor (C 實作)，需要安裝 selectolax，僅支援事件式解析
+    - "html.parser": 標準函式庫，永遠可用
+
+可以用環境變數 TNFSH_HTML_PARSER 強制指定後端。
+"""
+import os
+from html.parser import HTMLParser
+from typing import Any, List, Optional, Protocol, Tuple
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+
+# 與 BeautifulSoup 相同，不會有結束標籤的元素
+VOID_ELEMENTS = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link",
+    "menuitem", "meta", "param", "source", "track", "wbr",
+    "basefont", "bgsound", "command", "frame", "image", "isindex", "nextid", "spacer",
+))
+
+# 可以建立 BeautifulSoup 樹的後端
+SOUP_BACKENDS = ("lxml", "html.parser")
+
+
+class EventTarget(Protocol):
+    """事件式解析的接收端，介面與 lxml 的 parser target 相同"""
+    def start(self, tag: str, attrs: dict) -> None: ...
+    def end(self, tag: str) -> None: ...
+    def data(self, text: str) -> None: ...
+    def comment(self, text: str) -> None: ...
+    def close(self) -> Any: ...
+
+
+def available_backends() -> List[str]:
+    """依速度由快到慢列出目前可用的後端"""
+    backends = []
+    if etree is not None:
+        backends.append("lxml")
+    if LexborHTMLParser is not None:
+        backends.append("selectolax")
+    backends.append("html.parser")
+    return backends
+
+
+def get_backend(backend: Optional[str] = None, soup: bool = False) -> str:
+    """決定要使用的後端
+
+    Args:
+        backend (str, optional): 指定後端，未指定時依序參考環境變數 TNFSH_HTML_PARSER 與可用後端
+        soup (bool): 是否需要建立 BeautifulSoup 樹（selectolax 不支援）
+
+    Returns:
+        str: 後端名稱
+
+    Raises:
+        ValueError: 當指定的後端不存在或未安裝時
+    """
+    backends = available_backends()
+    if soup:
+        backends = [name for name in backends if name in SOUP_BACKENDS]
+
+    backend = backend or os.getenv("TNFSH_HTML_PARSER")
+    if not backend:
+        return backends[0]
+    if backend not in backends:
+        raise ValueError(f"無法使用解析器 {backend}，可用的解析器: {', '.join(backends)}")
+    return backend
+
+
+def make_soup(markup: Any, backend: Optional[str] = None) -> BeautifulSoup:
+    """以可用的最快後端建立 BeautifulSoup 物件，取代 BeautifulSoup(markup, 'html.parser')"""
+    return BeautifulSoup(markup, get_backend(backend, soup=True))
+
+
+def feed(markup: str, target: EventTarget, backend: Optional[str] = None) -> Any:
+    """以事件方式解析 HTML，並回傳 target.close() 的結果
+
+    Args:
+        markup (str): 已解碼的 HTML
+        target (EventTarget): 接收 start / end / data / comment 事件的物件
+        backend (str, optional): 指定後端
+
+    Returns:
+        Any: target.close() 的回傳值
+    """
+    backend = get_backend(backend)
+    if backend == "lxml":
+        parser = etree.HTMLParser(target=_LxmlTarget(target))
+        parser.feed(markup)
+        return parser.close()
+    if backend == "selectolax":
+        _walk_lexbor(LexborHTMLParser(markup).root, target)
+        return target.close()
+    parser = _StdlibParser(target)
+    parser.feed(markup)
+    parser.close()
+    return target.close()
+
+
+class _StdlibParser(HTMLParser):
+    """以標準函式庫 html.parser 產生事件，結束標籤的處理同 BeautifulSoup"""
+    def __init__(self, target: EventTarget) -> None:
+        super().__init__(convert_charrefs=True)
+        self._target = target
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self._target.start(tag, dict(attrs))
+        if tag in VOID_ELEMENTS:
+            self._target.end(tag)
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self._target.start(tag, dict(attrs))
+        self._target.end(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag not in VOID_ELEMENTS:
+            self._target.end(tag)
+
+    def handle_data(self, data: str) -> None:
+        self._target.data(data)
+
+    def handle_comment(self, data: str) -> None:
+        self._target.comment(data)
+
+    def handle_decl(self, decl: str) -> None:
+        self._target.comment(decl)
+
+    def unknown_decl(self, data: str) -> None:
+        self._target.comment(data)
+
+    def handle_pi(self, data: str) -> None:
+        self._target.comment(data)
+
+
+class _LxmlTarget:
+    """轉接 lxml 的 parser target，close() 交由 feed 統一呼叫"""
+    def __init__(self, target: EventTarget) -> None:
+        self._target = target
+
+    def start(self, tag: str, attrib: Any) -> None:
+        self._target.start(tag, dict(attrib))
+
+    def end(self, tag: str) -> None:
+        self._target.end(tag)
+
+    def data(self, text: str) -> None:
+        self._target.data(text)
+
+    def comment(self, text: str) -> None:
+        self._target.comment(text)
+
+    def pi(self, target: str, data: str) -> None:
+        self._target.comment(data)
+
+    def close(self) -> Any:
+        return self._target.close()
+
+
+def _walk_lexbor(root: Any, target: EventTarget) -> None:
+    """依文件順序走訪 selectolax 的節點樹並產生事件"""
+    stack = [(root, False)]
+    while stack:
+        node, closing = stack.pop()
+        tag = node.tag
+        if closing:
+            target.end(tag)
+            continue
+        if tag == "-text":
+            target.data(node.text_content or "")
+            continue
+        if tag.startswith("-") or tag.startswith("_"):
+            target.comment("")
+            continue
+        target.start(tag, node.attributes)
+        stack.append((node, True))
+        children = []
+        child = node.child
+        while child is not None:
+            children.append(child)
+            child = child.next
+        stack.extend((child, False) for child in reversed(children))